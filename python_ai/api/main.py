@@ -6,33 +6,71 @@ FastAPI backend for resume upload and job matching
 import os
 import sys
 import json
-import tempfile
-import sqlite3
+import time
+import heapq
+import asyncio
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Query
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
+from starlette.formparsers import MultiPartParser
 
 from models.resume_parser import ResumeParser, ParsedResume
 from models.job_matcher import JobMatcher, MatchResult, IndustryClassifier
 from data.data_generator import JobDatabase, generate_training_data, populate_sample_database
+from data.async_database import AsyncJobDatabase
+from data.retention import JobRetention
+from data.write_behind import WriteBehindQueue
+from data.job_store import ColumnarJobStore
+from data.snapshots import SnapshotManager
+from data.match_cache import MatchCache, profile_key
+from data.resume_cache import ResumeCache, content_key
+from data.shared_cache import SharedCacheStore, SharedCache, SharedDict
+from data.shared_state import SharedState
+from data.facets import region_for
 from config.settings import settings
 from services.job_api_service import JobAPIOrchestrator
 from services.gemini_analyzer import GeminiResumeAnalyzer
 from services.linkedin_scraper import LinkedInScraper
+from services.blocking_pool import BlockingPool, IntegrationTimeout
+from services.fetch_tasks import FetchTaskManager, FetchTask
+from services.single_flight import SingleFlight, flight_key
+from services.metrics import metrics
+from services.tracing import tracer
+from services.log import get_logger, configure_logging, stop_logging, log_stats
+
+log = get_logger('api')
+
+
+@contextmanager
+def stage(name: str):
+    """One stage of handling a request: timed for /metrics and Server-Timing, and traced as a span"""
+    with metrics.stage(name), tracer.span(name):
+        yield
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that times rendering its body as the 'serialize' stage"""
+
+    def render(self, content) -> bytes:
+        with stage('serialize'):
+            return super().render(content)
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Job Matcher AI",
     description="AI-powered job matching based on resume skills",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=TimedJSONResponse
 )
 
 # Add CORS middleware
@@ -44,14 +82,144 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Endpoints that take a resume upload, and slack for the multipart framing around the file
+RESUME_UPLOAD_PATHS = {'/parse-resume', '/match-resume', '/match-resume/stream', '/analyze-resume-file'}
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+UPLOAD_READ_CHUNK = 64 * 1024
+
+# Uploads under the cap stay in memory instead of rolling over to a temp file (Starlette's default is 1 MB)
+MultiPartParser.spool_max_size = settings.RESUME_MAX_UPLOAD_BYTES
+
+
+class UploadTooLarge(Exception):
+    """Raised from the request body stream once a resume upload passes the limit"""
+
+
+class ResumeUploadLimit:
+    """
+    Reject oversize resume uploads while they are received.
+
+    A Content-Length over the limit is answered with 413 before the body is
+    read. Otherwise (including chunked uploads without a Content-Length) body
+    bytes are counted as the multipart parser pulls them, and the read is cut
+    off as soon as the limit is crossed, so an oversize upload is never spooled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in RESUME_UPLOAD_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.RESUME_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
+        length = dict(scope['headers']).get(b'content-length', b'')
+        if length.isdigit() and int(length) > limit:
+            await self.reject(scope, send)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    exceeded = True
+                    raise UploadTooLarge()
+            return message
+
+        async def guarded_send(message):
+            # Whatever the app answers to the aborted body read (a parse error) is replaced by the 413
+            if not exceeded:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            pass
+        if exceeded:
+            await self.reject(scope, send)
+
+    @staticmethod
+    async def reject(scope, send):
+        await JSONResponse(status_code=413, content={"detail": upload_too_large_message()})(scope, None, send)
+
+
+app.add_middleware(ResumeUploadLimit)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency histograms per endpoint and stage, and a Server-Timing header with this request's stages"""
+    timer = metrics.start_request()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    endpoint = getattr(route, 'path', None) or 'unmatched'  # Route templates keep label cardinality bounded
+    response.headers['Server-Timing'] = metrics.finish_request(timer, request.method, endpoint, response.status_code)
+    return response
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Root span of each request's trace (continuing an incoming traceparent); its id is returned as X-Trace-Id"""
+    attributes = {'http.request.method': request.method, 'url.path': request.url.path}
+    with tracer.span(f"{request.method} {request.url.path}", kind='server', root=True,
+                     traceparent=request.headers.get('traceparent'), **attributes) as span:
+        response = await call_next(request)
+        route = request.scope.get('route')
+        if route is not None:
+            span.update_name(f"{request.method} {route.path}")
+            span.set_attribute('http.route', route.path)
+        span.set_attribute('http.response.status_code', response.status_code)
+        if response.status_code >= 500:
+            span.set_error(f"HTTP {response.status_code}")
+        if span.trace_id:
+            response.headers['X-Trace-Id'] = span.trace_id
+        return response
+
 # Global instances
 resume_parser = ResumeParser()
 job_matcher = JobMatcher()
-db: Optional[JobDatabase] = None
+db: Optional[AsyncJobDatabase] = None
+write_queue: Optional[WriteBehindQueue] = None
+job_store: Optional[ColumnarJobStore] = None
+match_cache = MatchCache(max_entries=settings.MATCH_CACHE_SIZE, ttl_seconds=settings.MATCH_CACHE_TTL)
+resume_cache: Optional[ResumeCache] = None
+store_refresh_task: Optional[asyncio.Task] = None
 is_trained = False
 job_api_orchestrator: Optional[JobAPIOrchestrator] = None
 gemini_analyzer: Optional[GeminiResumeAnalyzer] = None
 linkedin_scraper: Optional[LinkedInScraper] = None
+job_retention: Optional[JobRetention] = None
+retention_task: Optional[asyncio.Task] = None
+snapshot_manager: Optional[SnapshotManager] = None
+snapshot_task: Optional[asyncio.Task] = None
+
+# Multi-worker serving (SHARED_STATE_DIR): published model/job store image this worker has applied
+shared_state: Optional[SharedState] = None
+shared_cache_store: Optional[SharedCacheStore] = None
+applied_model_id: Optional[str] = None
+applied_catalog_path: Optional[str] = None
+catalog_publish_task: Optional[asyncio.Task] = None
+
+# Blocking integrations, each on its own bounded pool so a slow one cannot stall the server
+job_api_pool = BlockingPool('job_api', settings.JOB_API_CONCURRENCY, settings.JOB_API_CALL_TIMEOUT)
+linkedin_pool = BlockingPool('linkedin', settings.LINKEDIN_CONCURRENCY, settings.LINKEDIN_CALL_TIMEOUT)
+gemini_pool = BlockingPool('gemini', settings.GEMINI_CONCURRENCY, settings.GEMINI_CALL_TIMEOUT)
+parser_pool = BlockingPool('resume_parser', settings.PARSER_CONCURRENCY, settings.PARSER_CALL_TIMEOUT)
+# CPU-bound batch scoring and cache file I/O also run off the event loop
+scoring_pool = BlockingPool('batch_scoring', settings.BATCH_SCORING_WORKERS)
+cache_pool = BlockingPool('cache_io', 2)
+integration_pools = (job_api_pool, linkedin_pool, gemini_pool, parser_pool, scoring_pool, cache_pool)
+fetch_tasks: Optional[FetchTaskManager] = None
+
+# Identical concurrent fetches/scrapes share one in-flight call (and one paid Apify run)
+job_api_flights = SingleFlight('job_api')
+linkedin_flights = SingleFlight('linkedin')
 
 
 # Pydantic models for API
@@ -71,6 +239,35 @@ class MatchRequest(BaseModel):
     target_industry: Optional[str] = None
     limit: int = 20
     linkedin_url: Optional[str] = None  # Optional LinkedIn profile URL
+    candidate_id: Optional[str] = None  # When set, returned matches are logged
+    # Extra catalog filters (combine with city/target_industry)
+    region: Optional[str] = None
+    job_source: Optional[str] = None
+    education_required: Optional[str] = None
+    min_salary: Optional[float] = None
+    max_salary: Optional[float] = None
+    qualified_only: bool = False  # Skip jobs asking for more experience than experience_years
+
+
+class BatchCandidate(BaseModel):
+    candidate_id: Optional[str] = None  # When set, returned matches are logged
+    skills: List[str]
+    experience_years: float = 0
+    education: List[dict] = []
+    industries: List[str] = []
+
+
+class MatchBatchRequest(BaseModel):
+    candidates: List[BatchCandidate]
+    # Filters shared by every candidate (same meaning as in MatchRequest)
+    city: Optional[str] = None
+    target_industry: Optional[str] = None
+    region: Optional[str] = None
+    job_source: Optional[str] = None
+    education_required: Optional[str] = None
+    min_salary: Optional[float] = None
+    max_salary: Optional[float] = None
+    limit: int = 20
 
 
 class LinkedInRequest(BaseModel):
@@ -96,118 +293,478 @@ class HealthResponse(BaseModel):
     timestamp: str
 
 
+@app.exception_handler(IntegrationTimeout)
+async def integration_timeout_handler(request, exc: IntegrationTimeout):
+    """An external integration did not answer in time"""
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and train model on startup"""
     global db, job_matcher, is_trained, job_api_orchestrator, gemini_analyzer, linkedin_scraper
+    global job_retention, write_queue, job_store, store_refresh_task
+    global snapshot_manager, fetch_tasks, resume_cache, match_cache
+    global shared_state, shared_cache_store, applied_model_id, applied_catalog_path
+
+    configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, max_chars=settings.LOG_MAX_FIELD_CHARS)
+
+    # With several workers, startup runs one worker at a time; later workers reuse what the first published
+    if settings.SHARED_STATE_DIR:
+        shared_state = SharedState(settings.SHARED_STATE_DIR)
+        shared_cache_store = SharedCacheStore(str(Path(settings.SHARED_STATE_DIR) / 'cache.db'))
+        match_cache = SharedCache(
+            shared_cache_store, 'match', max_entries=settings.MATCH_CACHE_SIZE, ttl_seconds=settings.MATCH_CACHE_TTL
+        )
+        log.info("Multi-worker mode", shared_state_dir=settings.SHARED_STATE_DIR)
+    startup_lock = shared_state.lock('startup') if shared_state else nullcontext()
+
+    if settings.TRACE_PATH:
+        trace_path = Path(settings.TRACE_PATH)
+        if shared_state:
+            # One file per worker; rotation is not safe across processes
+            trace_path = trace_path.with_name(f"{trace_path.stem}-{os.getpid()}{trace_path.suffix}")
+        tracer.configure(
+            str(trace_path),
+            sample_rate=settings.TRACE_SAMPLE_RATE,
+            slow_ms=settings.TRACE_SLOW_MS,
+            max_bytes=settings.TRACE_MAX_MB * 1024 * 1024,
+            backups=settings.TRACE_BACKUPS
+        )
 
-    # Initialize database
-    db_path = settings.DB_PATH
-    db = JobDatabase(db_path)
+    with startup_lock:
+        # Initialize database (applies pending migrations; a single PRAGMA read when up to date)
+        db_path = settings.DB_PATH
+        db = AsyncJobDatabase(JobDatabase(db_path), max_workers=settings.DB_MAX_WORKERS)
+        resume_cache = ResumeCache(settings.RESUME_CACHE_PATH, max_bytes=settings.RESUME_CACHE_MAX_MB * 1024 * 1024)
+
+        # Request-path writes (cached jobs, match logs, feedback) go through one batching writer
+        write_queue = WriteBehindQueue(
+            db.db,
+            max_size=settings.WRITE_QUEUE_SIZE,
+            batch_size=settings.WRITE_BATCH_SIZE,
+            flush_interval=settings.WRITE_FLUSH_INTERVAL
+        )
 
-    # Run database migration inline
-    print("Running database migrations...")
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(jobs)")
-        columns = [col[1] for col in cursor.fetchall()]
-
-        if 'job_url' not in columns:
-            cursor.execute('ALTER TABLE jobs ADD COLUMN job_url TEXT')
-            print("[OK] Added job_url column")
-
-        if 'job_source' not in columns:
-            cursor.execute('ALTER TABLE jobs ADD COLUMN job_source TEXT DEFAULT "synthetic"')
-            print("[OK] Added job_source column")
-
-        cursor.execute("UPDATE jobs SET job_source = 'synthetic' WHERE job_source IS NULL")
-        conn.commit()
-        conn.close()
-        print("[SUCCESS] Migration completed successfully!")
-    except Exception as e:
-        print(f"[WARNING] Migration warning: {e}")
-
-    # Initialize Gemini analyzer if API key is available
-    if settings.GEMINI_API_KEY:
-        print("[DEBUG] Initializing Gemini Resume Analyzer...")
-        gemini_analyzer = GeminiResumeAnalyzer(settings.GEMINI_API_KEY)
-        if gemini_analyzer.is_available():
-            print("[SUCCESS] Gemini Resume Analyzer initialized!")
-        else:
-            print("[WARNING] Gemini API key provided but initialization failed")
-    else:
-        print("[INFO] No Gemini API key configured, using fallback analysis")
+        # Expire stale jobs on a schedule
+        job_retention = JobRetention(
+            db.db,
+            default_ttl_days=settings.JOB_TTL_DAYS,
+            source_ttl_days=settings.JOB_SOURCE_TTL_DAYS
+        )
 
-    # Initialize LinkedIn scraper (uses same Apify API key)
-    if settings.APIFY_API_KEY:
-        print("[DEBUG] Initializing LinkedIn Scraper...")
-        linkedin_scraper = LinkedInScraper(settings.APIFY_API_KEY)
-        print("[SUCCESS] LinkedIn Scraper initialized!")
-    else:
-        print("[INFO] No Apify API key configured, LinkedIn scraping disabled")
+        # Keep a fresh read-only copy of the database for training jobs
+        snapshot_manager = SnapshotManager(db_path, settings.SNAPSHOT_DIR, keep=settings.SNAPSHOT_KEEP)
 
-    # Initialize job API orchestrator if real jobs are enabled
-    if settings.USE_REAL_JOBS:
-        print(f"[DEBUG] USE_REAL_JOBS={settings.USE_REAL_JOBS}, Initializing job API orchestrator...")
-        job_api_orchestrator = JobAPIOrchestrator(settings)
-        print(f"[DEBUG] job_api_orchestrator initialized: {job_api_orchestrator is not None}")
-        print(f"[DEBUG] Available clients: {list(job_api_orchestrator.clients.keys()) if job_api_orchestrator else 'None'}")
+        # Initialize Gemini analyzer if API key is available
+        if settings.GEMINI_API_KEY:
+            gemini_analyzer = GeminiResumeAnalyzer(settings.GEMINI_API_KEY)
+            if gemini_analyzer.is_available():
+                log.info("Gemini Resume Analyzer initialized")
+            else:
+                log.warning("Gemini API key provided but initialization failed")
+        else:
+            log.info("No Gemini API key configured, using fallback analysis")
 
-    # Check if we need to populate sample data
-    jobs = db.get_all_jobs(limit=1)
-    if not jobs:
-        if settings.USE_REAL_JOBS and job_api_orchestrator:
-            print("Fetching real Philippine jobs...")
-            await fetch_and_cache_real_jobs()
+        # Initialize LinkedIn scraper (uses same Apify API key)
+        if settings.APIFY_API_KEY:
+            linkedin_scraper = LinkedInScraper(settings.APIFY_API_KEY)
+            log.info("LinkedIn Scraper initialized")
         else:
-            print("Populating sample job database...")
-            populate_sample_database(db_path, num_jobs=500)
+            log.info("No Apify API key configured, LinkedIn scraping disabled")
+
+        # Initialize job API orchestrator if real jobs are enabled
+        if settings.USE_REAL_JOBS:
+            job_api_orchestrator = JobAPIOrchestrator(settings)
+            if shared_cache_store:
+                job_api_orchestrator.cache = SharedDict(SharedCache(
+                    shared_cache_store, 'job_api', max_entries=1000, ttl_seconds=settings.JOB_CACHE_TTL
+                ))
+            log.info("Job API orchestrator initialized", clients=list(job_api_orchestrator.clients))
+            fetch_tasks = FetchTaskManager(
+                fetch_segment,
+                shared=SharedCache(shared_cache_store, 'fetch_tasks', max_entries=500, ttl_seconds=86400)
+                if shared_cache_store else None,
+                pool=cache_pool
+            )
+
+        # Check if we need to populate sample data
+        if await db.count_jobs() == 0:
+            if settings.USE_REAL_JOBS and job_api_orchestrator:
+                log.info("Fetching real Philippine jobs")
+                await fetch_and_cache_real_jobs()
+            else:
+                log.info("Populating sample job database")
+                populate_sample_database(db_path, num_jobs=500)
+
+        state = shared_state.read() if shared_state else {}
+
+        # Serve matching from an in-memory snapshot, kept current from the change feed
+        job_store = None
+        if state.get('catalog_path'):
+            job_store = await open_shared_job_store(state)
+        if job_store is None:
+            job_store = ColumnarJobStore(db.db)
+            loaded = await db.run(job_store.load)
+            log.info("Job store loaded", jobs=loaded)
+            if shared_state:
+                # Publish the image and serve from it too, so this worker's pages are shared as well
+                state = await db.run(shared_state.publish_catalog, job_store, db_path)
+                job_store = await open_shared_job_store(state)
+        if shared_state:
+            applied_catalog_path = state['catalog_path']
+        store_refresh_task = asyncio.create_task(store_refresh_loop())
+
+        # Load the model another worker published, or train (and publish) one
+        if state.get('model_path'):
+            try:
+                job_matcher.load(state['model_path'])
+                applied_model_id = job_matcher.model_id
+                log.info("Loaded published model", model_id=job_matcher.model_id)
+            except Exception as e:
+                log.warning("Could not load published model", error=str(e))
+        if applied_model_id is None:
+            # Train the model
+            log.info("Training job matcher model")
+            training_data = generate_training_data(num_samples=500)
+            job_matcher.train(training_data)
+            log.info("Model training complete", model_id=job_matcher.model_id)
+            if shared_state:
+                # Serve from the published copy as well, so its arrays are mapped like every other worker's
+                state = shared_state.publish_model(job_matcher)
+                job_matcher.load(state['model_path'])
+                applied_model_id = job_matcher.model_id
+        is_trained = True
+
+    # Retention, snapshots and image publishing run in one worker only
+    if shared_state is None or shared_state.try_lead():
+        start_leader_tasks()
+
 
-    # Train the model
-    print("Training job matcher model...")
-    training_data = generate_training_data(num_samples=500)
-    job_matcher.train(training_data)
-    is_trained = True
-    print("Model training complete!")
+async def open_shared_job_store(state: dict) -> Optional[ColumnarJobStore]:
+    """Map the published job store image and catch up on changes since it was saved"""
+    if state.get('catalog_db') != str(Path(settings.DB_PATH).resolve()):
+        return None
+    try:
+        store = await db.run(ColumnarJobStore.open_image, db.db, state['catalog_path'])
+        if store.seq > await db.run(db.db.get_change_seq):
+            return None  # Image of a database that has since been replaced
+        await db.run(store.refresh)
+        log.info("Mapped shared job store image", jobs=len(store), path=state['catalog_path'])
+        return store
+    except Exception as e:
+        log.warning("Could not open shared job store image", path=state['catalog_path'], error=str(e))
+        return None
+
+
+def start_leader_tasks():
+    """Start singleton background work: retention, snapshots and job store image publishing"""
+    global retention_task, snapshot_task, catalog_publish_task
+    if settings.ENABLE_RETENTION:
+        retention_task = asyncio.create_task(retention_loop())
+    if settings.SNAPSHOT_INTERVAL > 0:
+        snapshot_task = asyncio.create_task(snapshot_loop())
+    if shared_state and settings.SHARED_CATALOG_INTERVAL > 0:
+        catalog_publish_task = asyncio.create_task(catalog_publish_loop())
+    if shared_state:
+        log.info("This worker is the leader", pid=os.getpid())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks, flush pending writes and release the database thread pool"""
+    if retention_task:
+        retention_task.cancel()
+    if store_refresh_task:
+        store_refresh_task.cancel()
+    if snapshot_task:
+        snapshot_task.cancel()
+    if catalog_publish_task:
+        catalog_publish_task.cancel()
+    if fetch_tasks:
+        fetch_tasks.close()
+    for pool in integration_pools:
+        pool.close()
+    if write_queue:
+        write_queue.close()
+    if db:
+        db.close()
+    if resume_cache:
+        resume_cache.close()
+    if shared_cache_store:
+        shared_cache_store.close()
+    if shared_state:
+        shared_state.close()
+    tracer.close()
+    stop_logging()
+
+
+async def retention_loop():
+    """Expire, archive and vacuum jobs every RETENTION_INTERVAL seconds"""
+    while True:
+        try:
+            result = await db.run(job_retention.run, consumed_seq=await consumed_change_seq())
+            if result['expired'] or result['pruned_changes'] or result['reclaimed_bytes']:
+                log.info(
+                    "Retention run", expired=result['expired'],
+                    pruned_changes=result['pruned_changes'], reclaimed_bytes=result['reclaimed_bytes']
+                )
+        except Exception:
+            log.exception("Retention run failed")
+        await asyncio.sleep(settings.RETENTION_INTERVAL)
+
+
+async def consumed_change_seq() -> int:
+    """
+    Oldest change sequence the job stores may still refresh from: this
+    worker's store and the published image new workers start from. Other
+    workers that fall further behind reload in full on their next refresh.
+    """
+    seqs = [job_store.seq if job_store else await db.run(db.db.get_change_seq)]
+    if shared_state:
+        seqs.append(shared_state.read().get('catalog_seq', 0))
+    return min(seqs)
+
+
+async def snapshot_loop():
+    """Snapshot the database for training every SNAPSHOT_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(settings.SNAPSHOT_INTERVAL)
+        try:
+            info = await db.run(snapshot_manager.refresh)
+            log.info("Snapshot refreshed", path=info['path'], jobs=info['jobs'], duration_ms=info['duration_ms'])
+        except Exception:
+            log.exception("Snapshot refresh failed")
+
+
+async def store_refresh_loop():
+    """Apply database changes to the in-memory job store every JOB_STORE_REFRESH_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(settings.JOB_STORE_REFRESH_INTERVAL)
+        try:
+            await db.run(job_store.refresh)
+        except Exception:
+            log.exception("Job store refresh failed")
+        if shared_state:
+            await sync_shared_state()
+
+
+async def sync_shared_state():
+    """Pick up the model and job store image other workers published, and take over as leader if it exited"""
+    global job_matcher, job_store, applied_model_id, applied_catalog_path
+    if not shared_state.is_leader and shared_state.try_lead():
+        start_leader_tasks()
+
+    try:
+        state = shared_state.read()
+    except Exception as e:
+        log.warning("Could not read shared state", error=str(e))
+        return
+
+    if state.get('model_id') and state['model_id'] != applied_model_id:
+        try:
+            matcher = JobMatcher()
+            await scoring_pool.run(matcher.load, state['model_path'])
+            job_matcher = matcher
+            applied_model_id = matcher.model_id
+            log.info("Switched to published model", model_id=matcher.model_id)
+        except Exception as e:
+            log.warning("Could not load published model", error=str(e))
+
+    if state.get('catalog_path') and state['catalog_path'] != applied_catalog_path:
+        store = await open_shared_job_store(state)
+        if store is not None:
+            job_store = store
+        # Remember the attempt either way so a bad image is not retried every cycle
+        applied_catalog_path = state['catalog_path']
+
+
+async def catalog_publish_loop():
+    """Republish the job store image every SHARED_CATALOG_INTERVAL seconds if the catalog changed (leader only)"""
+    global applied_catalog_path
+    while True:
+        await asyncio.sleep(settings.SHARED_CATALOG_INTERVAL)
+        try:
+            if job_store.seq == shared_state.read().get('catalog_seq'):
+                continue
+            state = await db.run(shared_state.publish_catalog, job_store, settings.DB_PATH)
+            log.info("Published job store image", seq=state['catalog_seq'])
+        except Exception:
+            log.exception("Publishing job store image failed")
 
 
 async def fetch_and_cache_real_jobs():
     """Fetch real jobs from API and cache in database"""
     if not job_api_orchestrator:
-        print("Job API orchestrator not initialized")
+        log.warning("Job API orchestrator not initialized")
         return False
 
     try:
         # Fetch jobs for top Philippine cities
         for city in settings.PHILIPPINE_CITIES[:5]:  # Top 5 cities
-            print(f"Fetching jobs for {city}...")
-            jobs = job_api_orchestrator.fetch_jobs(
+            jobs = await fetch_jobs_shared(
                 location=city,
                 keywords=['software', 'technology', 'data', 'business'],
                 limit=20
             )
 
-            # Insert into database
-            for job in jobs:
-                db.insert_job(job)
+            # Upsert into database (unchanged jobs are skipped)
+            await db.insert_jobs_bulk(jobs)
 
-            print(f"Cached {len(jobs)} jobs for {city}")
+            log.info("Cached real jobs", city=city, jobs=len(jobs))
 
         return True
-    except Exception as e:
-        print(f"Error fetching real jobs: {e}")
+    except Exception:
+        log.exception("Fetching real jobs failed")
         return False
 
 
+# Broad search terms per industry; a single simple term finds more jobs than combined ones
+INDUSTRY_SEARCH_KEYWORDS = {
+    'Technology': ['software developer', 'IT specialist', 'programmer'],
+    'Finance': ['accountant', 'financial analyst', 'bookkeeper'],
+    'Healthcare': ['nurse', 'medical assistant', 'healthcare'],
+    'Consulting': ['consultant', 'business analyst', 'advisor'],
+    'Retail': ['sales associate', 'retail', 'customer service'],
+    'Manufacturing': ['production', 'manufacturing', 'operations'],
+    'Education': ['teacher', 'instructor', 'tutor'],
+    'Marketing': ['marketing', 'digital marketing', 'social media'],
+    'Media': ['marketing', 'media', 'advertising'],
+    'BPO': ['customer service', 'call center', 'technical support'],
+    'Engineering': ['engineer', 'civil engineer', 'mechanical engineer'],
+    'Hospitality': ['hotel', 'restaurant', 'hospitality'],
+    'Legal': ['paralegal', 'legal assistant', 'lawyer'],
+    'HR': ['human resources', 'recruiter', 'HR specialist'],
+    'Human Resources': ['human resources', 'recruiter', 'HR specialist'],
+    'Administrative': ['admin assistant', 'office manager', 'secretary'],
+    'Fine Arts & Design': ['graphic designer', 'UI UX designer', 'illustrator', 'creative designer'],
+}
+
+
+def search_keywords_for(industry: Optional[str], skills: List[str]) -> List[str]:
+    """One search term for an on-demand fetch: the industry's first keyword, else the industry, else a skill"""
+    if industry and industry in INDUSTRY_SEARCH_KEYWORDS:
+        return [INDUSTRY_SEARCH_KEYWORDS[industry][0]]
+    if industry:
+        return [industry.lower()]
+    if skills:
+        return [skills[0]]
+    return ['job']
+
+
+async def fetch_jobs_shared(**params) -> List[dict]:
+    """JobAPIOrchestrator.fetch_jobs on the job API pool, shared with identical calls in flight"""
+    with stage('external_fetch'):
+        return await job_api_flights.do(
+            flight_key('fetch_jobs', **params),
+            lambda: job_api_pool.run(job_api_orchestrator.fetch_jobs, **params)
+        )
+
+
+async def scrape_profile_shared(linkedin_url: str) -> dict:
+    """LinkedInScraper.scrape_profile on the LinkedIn pool, shared with scrapes of the same profile in flight"""
+    # LinkedIn profile URLs are case-insensitive; the query string and fragment do not change the profile
+    profile = linkedin_url.split('#')[0].split('?')[0].rstrip('/').lower()
+    with stage('linkedin'):
+        return await linkedin_flights.do(
+            flight_key('scrape_profile', profile),
+            lambda: linkedin_pool.run(linkedin_scraper.scrape_profile, linkedin_url)
+        )
+
+
+async def fetch_segment(city: Optional[str], industry: Optional[str], keywords: List[str], limit: int) -> int:
+    """Fetch a (city, industry) segment and make it matchable right away (runs as a fetch task)"""
+    jobs = await fetch_jobs_shared(
+        location=city or 'Philippines',
+        keywords=keywords,
+        limit=limit
+    )
+    if jobs:
+        await db.insert_jobs_bulk(jobs)
+        await db.run(job_store.refresh)
+    log.info("Fetch task stored jobs", city=city, industry=industry, jobs=len(jobs))
+    return len(jobs)
+
+
+def fetch_task_info(task: Optional[FetchTask]) -> Optional[dict]:
+    """Task state plus the URLs a client can follow it on"""
+    if task is None:
+        return None
+    return {
+        **task.to_dict(),
+        "status_url": f"/fetch-tasks/{task.id}",
+        "events_url": f"/fetch-tasks/{task.id}/events",
+    }
+
+
+def upload_too_large_message() -> str:
+    return f"Resume exceeds the {settings.RESUME_MAX_UPLOAD_BYTES // 1024} KB upload limit"
+
+
+async def read_resume_upload(file: UploadFile) -> bytes:
+    """
+    Read an uploaded resume into memory, up to RESUME_MAX_UPLOAD_BYTES.
+    
+    ResumeUploadLimit already stops bodies much larger than the limit; the
+    multipart overhead it allows for is checked here against the file itself.
+    """
+    limit = settings.RESUME_MAX_UPLOAD_BYTES
+    if file.size is not None and file.size > limit:
+        raise HTTPException(413, upload_too_large_message())
+    
+    chunks = []
+    total = 0
+    while True:
+        chunk = await file.read(UPLOAD_READ_CHUNK)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > limit:
+            raise HTTPException(413, upload_too_large_message())
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+async def cached_resume_result(kind: str, key: str, version: str) -> Optional[Dict]:
+    """Stored parse or analysis result for resume content seen before"""
+    if resume_cache is None or not resume_cache.enabled:
+        return None
+    result = await cache_pool.run(resume_cache.get, kind, key, version)
+    metrics.cache(f'resume_{kind}', result is not None)
+    return result
+
+
+async def store_resume_result(kind: str, key: str, version: str, value: Dict):
+    if resume_cache is not None and resume_cache.enabled:
+        await cache_pool.run(resume_cache.put, kind, key, version, value)
+
+
+async def parse_resume_cached(content: Union[bytes, str], file_type: Optional[str] = None) -> ParsedResume:
+    """
+    Parse resume bytes (or text) on the parser pool, reusing the stored
+    result when the same content was parsed by the same parser version.
+    """
+    key = content_key(content, file_type)
+    cached = await cached_resume_result('parsed', key, resume_parser.version)
+    if cached is not None:
+        return ParsedResume(**cached)
+    
+    with stage('parse'):
+        if isinstance(content, str):
+            parsed = await parser_pool.run(resume_parser.parse_text, content)
+        else:
+            parsed = await parser_pool.run(resume_parser.parse, content, file_type)
+    await store_resume_result('parsed', key, resume_parser.version, parsed.to_dict())
+    return parsed
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    jobs = db.get_all_jobs(limit=1) if db else []
     return HealthResponse(
         status="healthy",
         is_trained=is_trained,
-        num_jobs=len(db.get_all_jobs(limit=10000)) if db else 0,
+        num_jobs=(await db.count_jobs()) if db else 0,
         timestamp=datetime.now().isoformat()
     )
 
@@ -229,24 +786,19 @@ async def parse_resume(file: UploadFile = File(...)):
             detail=f"Unsupported file type. Allowed: {', '.join(allowed_types)}"
         )
     
-    # Save to temp file and parse
+    content = await read_resume_upload(file)
+    
+    # Parse from memory off the event loop
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        # Parse resume
-        parsed = resume_parser.parse(tmp_path)
-        
-        # Clean up
-        os.unlink(tmp_path)
+        parsed = await parse_resume_cached(content, file_ext)
         
         return {
             "success": True,
             "data": parsed.to_dict()
         }
         
+    except IntegrationTimeout:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -255,127 +807,112 @@ async def parse_resume(file: UploadFile = File(...)):
 async def parse_resume_text(text: str):
     """Parse resume from raw text"""
     try:
-        parsed = resume_parser.parse_text(text)
+        parsed = await parse_resume_cached(text)
         return {
             "success": True,
             "data": parsed.to_dict()
         }
+    except IntegrationTimeout:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/match")
-async def match_jobs(request: MatchRequest):
-    """
-    Match candidate skills to available jobs.
-    
-    Returns jobs ranked by confidence score.
-    """
-    if not is_trained:
-        raise HTTPException(
-            status_code=503,
-            detail="Model not yet trained. Please wait."
-        )
-    
-    # Build candidate profile
-    candidate = {
+def candidate_profile(request: MatchRequest) -> dict:
+    """Candidate profile scored by the matcher"""
+    return {
         'skills': request.skills,
         'experience_years': request.experience_years,
         'education': request.education,
         'industries': request.industries,
     }
+
+
+def match_filters(request: MatchRequest) -> dict:
+    """Job store filters of a match request"""
+    return {
+        'city': request.city,
+        'industry': request.target_industry,
+        'region': request.region,
+        'job_source': request.job_source,
+        'education_required': request.education_required,
+        'min_salary': request.min_salary,
+        'max_salary': request.max_salary,
+        'experience_years': request.experience_years if request.qualified_only else None,
+    }
+
+
+async def select_match_jobs(request: MatchRequest, filters: dict):
+    """
+    Jobs to score for a match request, from the in-memory store.
     
-    # Get jobs from database
-    if request.city and request.target_industry:
-        jobs = db.get_jobs_by_industry(request.target_industry, request.city)
-    elif request.city:
-        jobs = db.get_jobs_by_city(request.city)
-    elif request.target_industry:
-        jobs = db.get_jobs_by_industry(request.target_industry)
-    else:
-        jobs = db.get_all_jobs(limit=200)
-    
-    # If no jobs found locally and real jobs are enabled, fetch from API on-demand
-    if not jobs and settings.USE_REAL_JOBS and job_api_orchestrator:
-        print(f"[DEBUG] No local jobs found for {request.city}/{request.target_industry}. Fetching from Apify...")
+    Returns:
+        (jobs, segment_empty, nearby_region, fetch_task)
+    """
+    with stage('db_load'):
+        if any(value is not None for value in filters.values()):
+            jobs = job_store.get_jobs(filters)
+        else:
+            jobs = job_store.get_jobs(limit=200)
         
-        # Build search keywords from candidate skills and target industry
-        search_keywords = []
+        # No local jobs for this segment: answer from nearby cities now, fetch the segment in the background
+        segment_empty = not jobs
+        nearby_region = None
+        if segment_empty and request.city:
+            region = region_for(request.city)
+            jobs = job_store.get_jobs({**filters, 'city': None, 'region': region})
+            if jobs:
+                nearby_region = region
+                log.debug("No local jobs, using region", city=request.city, region=region, jobs=len(jobs), sample=0.1)
         
-        # Add industry-related keywords - use simpler, broader search terms
-        industry_keywords = {
-            'Technology': ['software developer', 'IT specialist', 'programmer'],
-            'Finance': ['accountant', 'financial analyst', 'bookkeeper'],
-            'Healthcare': ['nurse', 'medical assistant', 'healthcare'],
-            'Consulting': ['consultant', 'business analyst', 'advisor'],
-            'Retail': ['sales associate', 'retail', 'customer service'],
-            'Manufacturing': ['production', 'manufacturing', 'operations'],
-            'Education': ['teacher', 'instructor', 'tutor'],
-            'Marketing': ['marketing', 'digital marketing', 'social media'],
-            'Media': ['marketing', 'media', 'advertising'],
-            'BPO': ['customer service', 'call center', 'technical support'],
-            'Engineering': ['engineer', 'civil engineer', 'mechanical engineer'],
-            'Hospitality': ['hotel', 'restaurant', 'hospitality'],
-            'Legal': ['paralegal', 'legal assistant', 'lawyer'],
-            'HR': ['human resources', 'recruiter', 'HR specialist'],
-            'Human Resources': ['human resources', 'recruiter', 'HR specialist'],
-            'Administrative': ['admin assistant', 'office manager', 'secretary'],
-            'Fine Arts & Design': ['graphic designer', 'UI UX designer', 'illustrator', 'creative designer'],
-        }
-        
-        # Use industry-specific search term (just ONE good keyword, not combined)
-        if request.target_industry and request.target_industry in industry_keywords:
-            # Use just the first keyword for the industry - more effective search
-            search_keywords = [industry_keywords[request.target_industry][0]]
-        elif request.target_industry:
-            # If industry not in our list, use the industry name itself
-            search_keywords = [request.target_industry.lower()]
-        
-        # Only add skills if no industry keywords found
-        if not search_keywords and request.skills:
-            # Use just one skill for cleaner search
-            search_keywords = [request.skills[0]]
-        
-        # Default fallback
-        if not search_keywords:
-            search_keywords = ['job']
-        
-        # Fetch jobs from API
-        fetched_jobs = job_api_orchestrator.fetch_jobs(
-            location=request.city or 'Philippines',
-            keywords=search_keywords,
+        await attach_descriptions(jobs)
+    
+    fetch_task = None
+    if segment_empty and settings.USE_REAL_JOBS and job_api_orchestrator and fetch_tasks:
+        fetch_task = fetch_tasks.submit(
+            request.city,
+            request.target_industry,
+            search_keywords_for(request.target_industry, request.skills),
             limit=request.limit or 20
         )
-        
-        if fetched_jobs:
-            print(f"[DEBUG] Fetched {len(fetched_jobs)} jobs from API")
-            # Cache jobs in database for future use
-            for job in fetched_jobs:
-                db.insert_job(job)
-            jobs = fetched_jobs
-        else:
-            print(f"[DEBUG] No jobs returned from API")
+        log.info("No local jobs, fetching in background", city=request.city, industry=request.target_industry, task=fetch_task.id)
     
-    if not jobs:
-        return {
-            "success": True,
-            "matches": [],
-            "candidate_skills": request.skills,
-            "total_jobs_analyzed": 0,
-            "industry_summary": {},
-            "message": "No jobs found for the specified criteria"
-        }
+    return jobs, segment_empty, nearby_region, fetch_task
+
+
+async def attach_descriptions(jobs: List[dict]):
+    """Descriptions are only needed to score jobs that list no skills"""
+    skill_less = [job['id'] for job in jobs if not job['required_skills']]
+    if skill_less:
+        descriptions = await db.get_descriptions(skill_less)
+        for job in jobs:
+            if job['id'] in descriptions:
+                job['description'] = descriptions[job['id']]
+
+
+async def linkedin_adjustment(request: MatchRequest, candidate: dict):
+    """
+    Confidence boost from the candidate's LinkedIn profile; merges its skills into candidate.
     
-    # Calculate LinkedIn boost if provided
+    Returns:
+        (boost, linkedin_data, timed_out)
+    """
     linkedin_boost = 0
     linkedin_data = None
+    timed_out = False
     if request.linkedin_url and linkedin_scraper:
         if linkedin_scraper.is_valid_linkedin_url(request.linkedin_url):
-            print(f"[LinkedIn] Scraping profile for match boost: {request.linkedin_url}")
-            linkedin_data = linkedin_scraper.scrape_profile(request.linkedin_url)
+            log.debug("Scraping LinkedIn profile for match boost", url=request.linkedin_url)
+            try:
+                linkedin_data = await scrape_profile_shared(request.linkedin_url)
+            except IntegrationTimeout as e:
+                log.warning("LinkedIn scrape timed out, matching without profile boost", error=str(e))
+                timed_out = True
+        
+        if linkedin_data is not None:
             boost_info = linkedin_scraper.calculate_profile_boost(linkedin_data)
             linkedin_boost = boost_info.get("boost_percentage", 0)
-            print(f"[LinkedIn] Boost calculated: {linkedin_boost}%")
+            log.debug("LinkedIn boost calculated", boost=linkedin_boost)
             
             # Merge LinkedIn skills with resume skills
             if linkedin_data.get("skills"):
@@ -386,69 +923,377 @@ async def match_jobs(request: MatchRequest):
     elif not request.linkedin_url:
         # Small penalty for no LinkedIn
         linkedin_boost = -3
-        print("[LinkedIn] No profile provided, applying -3% penalty")
+        log.debug("No LinkedIn profile provided, applying -3% penalty", sample=0.01)
     
-    # Match against all jobs
+    return linkedin_boost, linkedin_data, timed_out
+
+
+def score_jobs(candidate: dict, jobs: List[dict], linkedin_boost: float = 0) -> List[dict]:
+    """Match results for every job, unsorted, with the LinkedIn boost applied"""
     matches = []
-    for job in jobs:
-        result = job_matcher.match(candidate, job)
-        result_dict = result.to_dict()
-        
-        # Apply LinkedIn boost to confidence
-        if linkedin_boost != 0:
-            original_confidence = result_dict['confidence']
-            result_dict['confidence'] = max(5, min(99, original_confidence + linkedin_boost))
-            result_dict['linkedin_boost'] = linkedin_boost
-        
-        matches.append(result_dict)
-    
-    # Sort by confidence
-    matches.sort(key=lambda x: x['confidence'], reverse=True)
-    
-    # Group by industry
-    industry_summary = {}
-    for match in matches:
-        ind = match['industry']
-        if ind not in industry_summary:
-            industry_summary[ind] = {
-                'count': 0,
-                'avg_confidence': 0,
-                'top_companies': []
-            }
-        industry_summary[ind]['count'] += 1
-        industry_summary[ind]['avg_confidence'] += match['confidence']
-        if len(industry_summary[ind]['top_companies']) < 3:
-            industry_summary[ind]['top_companies'].append(match['company'])
-    
-    # Calculate averages
-    for ind in industry_summary:
-        industry_summary[ind]['avg_confidence'] = round(
-            industry_summary[ind]['avg_confidence'] / industry_summary[ind]['count'], 1
+    with stage('score'):
+        for job in jobs:
+            result = job_matcher.match(candidate, job)
+            result_dict = result.to_dict()
+            
+            # Apply LinkedIn boost to confidence
+            if linkedin_boost != 0:
+                original_confidence = result_dict['confidence']
+                result_dict['confidence'] = max(5, min(99, original_confidence + linkedin_boost))
+                result_dict['linkedin_boost'] = linkedin_boost
+            
+            matches.append(result_dict)
+    return matches
+
+
+def summarize_industries(matches: List[dict]) -> dict:
+    """Match count, average confidence and top companies per industry"""
+    with stage('summarize'):
+        industry_summary = {}
+        for match in matches:
+            ind = match['industry']
+            if ind not in industry_summary:
+                industry_summary[ind] = {
+                    'count': 0,
+                    'avg_confidence': 0,
+                    'top_companies': []
+                }
+            industry_summary[ind]['count'] += 1
+            industry_summary[ind]['avg_confidence'] += match['confidence']
+            if len(industry_summary[ind]['top_companies']) < 3:
+                industry_summary[ind]['top_companies'].append(match['company'])
+        
+        # Calculate averages
+        for ind in industry_summary:
+            industry_summary[ind]['avg_confidence'] = round(
+                industry_summary[ind]['avg_confidence'] / industry_summary[ind]['count'], 1
+            )
+    return industry_summary
+
+
+async def match_cache_get(key: str, version):
+    """Cached /match response; the shared cache is a SQLite file, so it is read off the event loop"""
+    with stage('cache'):
+        if getattr(match_cache, 'shared', False):
+            cached = await cache_pool.run(match_cache.get, key, version)
+        else:
+            cached = match_cache.get(key, version)
+    metrics.cache('match', cached is not None)
+    return cached
+
+
+async def match_cache_put(key: str, version, response: dict):
+    if getattr(match_cache, 'shared', False):
+        await cache_pool.run(match_cache.put, key, version, response)
+    else:
+        match_cache.put(key, version, response)
+
+
+@app.post("/match")
+async def match_jobs(request: MatchRequest):
+    """
+    Match candidate skills to available jobs.
+    
+    Returns jobs ranked by confidence score.
+    """
+    if not is_trained:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not yet trained. Please wait."
         )
     
-    return {
+    candidate = candidate_profile(request)
+    filters = match_filters(request)
+    
+    # Identical profiles against an unchanged catalog and model score identically
+    cache_key = profile_key(candidate, {**filters, 'limit': request.limit, 'linkedin_url': request.linkedin_url})
+    cache_version = (job_store.seq, job_matcher.model_id)
+    cached = await match_cache_get(cache_key, cache_version)
+    if cached is not None:
+        if request.candidate_id:
+            for match in cached['matches']:
+                write_queue.enqueue_match(request.candidate_id, match)
+        # The key normalizes skills (case, order, duplicates); echo this request's list, not the first caller's
+        return {**cached, "candidate_skills": request.skills, "cached": True}
+    
+    jobs, segment_empty, nearby_region, fetch_task = await select_match_jobs(request, filters)
+    
+    # Responses waiting on a background fetch or built after a timed-out integration are not cached
+    cacheable = fetch_task is None
+    
+    if not jobs:
+        response = {
+            "success": True,
+            "matches": [],
+            "candidate_skills": request.skills,
+            "total_jobs_analyzed": 0,
+            "industry_summary": {},
+            "message": "No jobs found yet; fresh jobs are being fetched" if fetch_task
+                       else "No jobs found for the specified criteria",
+            "fetch_task": fetch_task_info(fetch_task),
+        }
+        if cacheable:
+            await match_cache_put(cache_key, cache_version, response)
+        return response
+    
+    linkedin_boost, linkedin_data, linkedin_timed_out = await linkedin_adjustment(request, candidate)
+    cacheable = cacheable and not linkedin_timed_out
+    
+    # Match against all jobs, best first
+    matches = score_jobs(candidate, jobs, linkedin_boost)
+    with stage('sort'):
+        matches.sort(key=lambda x: x['confidence'], reverse=True)
+    
+    # Log returned matches for the candidate
+    if request.candidate_id:
+        for match in matches[:request.limit]:
+            write_queue.enqueue_match(request.candidate_id, match)
+    
+    response = {
         "success": True,
         "total_jobs_analyzed": len(jobs),
         "matches": matches[:request.limit],
-        "industry_summary": industry_summary,
+        "industry_summary": summarize_industries(matches),
         "candidate_skills": request.skills,
         "linkedin_boost": linkedin_boost,
         "linkedin_skills": linkedin_data.get("skills", []) if linkedin_data else [],
         "linkedin_profile": linkedin_data if linkedin_data and linkedin_data.get("scraped") else None,
+        "nearby_region": nearby_region,  # Set when the city had no jobs and nearby ones were used
+        "fetch_task": fetch_task_info(fetch_task),
     }
+    if cacheable:
+        await match_cache_put(cache_key, cache_version, response)
+    return response
 
 
-@app.post("/match-resume")
-async def match_resume(
-    file: UploadFile = File(...),
-    city: Optional[str] = Query(None),
-    industry: Optional[str] = Query(None),
-    limit: int = Query(20)
+def stream_frame(event: str, data, fmt: str) -> str:
+    """One streamed event as an NDJSON line or an SSE frame"""
+    if fmt == 'sse':
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+STREAM_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+SCORE_CHUNK_SIZE = 256  # Jobs scored between yields to the event loop
+
+
+async def match_events(request: MatchRequest, fmt: str, fetch_wait: float, parsed_resume: Optional[dict] = None):
+    """
+    Event stream of one match:
+    parsed_resume (resume uploads only), meta, match x top-k (best first), summary,
+    then fetch updates and fresh_match events if a background fetch was started, then done.
+    """
+    started = time.perf_counter()
+    if parsed_resume is not None:
+        yield stream_frame("parsed_resume", parsed_resume, fmt)
+    
+    candidate = candidate_profile(request)
+    filters = match_filters(request)
+    jobs, segment_empty, nearby_region, fetch_task = await select_match_jobs(request, filters)
+    yield stream_frame("meta", {
+        "total_jobs": len(jobs),
+        "nearby_region": nearby_region,
+        "fetch_task": fetch_task_info(fetch_task),
+    }, fmt)
+    
+    linkedin_boost, linkedin_data, _ = await linkedin_adjustment(request, candidate)
+    
+    # Score in chunks so other requests keep being served on large catalogs
+    matches = []
+    for i in range(0, len(jobs), SCORE_CHUNK_SIZE):
+        matches.extend(score_jobs(candidate, jobs[i:i + SCORE_CHUNK_SIZE], linkedin_boost))
+        await asyncio.sleep(0)
+    
+    # The top-k are final once every job is scored; send them before the summary
+    with stage('sort'):
+        matches.sort(key=lambda x: x['confidence'], reverse=True)
+    top = matches[:request.limit]
+    for rank, match in enumerate(top, 1):
+        yield stream_frame("match", {"rank": rank, **match}, fmt)
+    if request.candidate_id:
+        for match in top:
+            write_queue.enqueue_match(request.candidate_id, match)
+    
+    yield stream_frame("summary", {
+        "total_jobs_analyzed": len(jobs),
+        "industry_summary": summarize_industries(matches),
+        "candidate_skills": request.skills,
+        "linkedin_boost": linkedin_boost,
+        "linkedin_skills": linkedin_data.get("skills", []) if linkedin_data else [],
+    }, fmt)
+    
+    # Follow the background fetch and stream the best of the freshly fetched jobs
+    if fetch_task and fetch_wait > 0:
+        deadline = time.perf_counter() + fetch_wait
+        async for state in fetch_tasks.events(fetch_task.id, keepalive=max(0.1, deadline - time.perf_counter())):
+            if state is not None:
+                yield stream_frame("fetch", state, fmt)
+            if time.perf_counter() >= deadline:
+                break
+        
+        if fetch_task.status == 'done' and fetch_task.jobs_fetched:
+            seen = {job['id'] for job in jobs}
+            fresh = [job for job in job_store.get_jobs(filters) if job['id'] not in seen]
+            await attach_descriptions(fresh)
+            fresh_matches = score_jobs(candidate, fresh, linkedin_boost)
+            fresh_top = heapq.nlargest(request.limit, fresh_matches, key=lambda x: x['confidence'])
+            for rank, match in enumerate(fresh_top, 1):
+                yield stream_frame("fresh_match", {"rank": rank, **match}, fmt)
+    
+    yield stream_frame("done", {"elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}, fmt)
+
+
+@app.post("/match/stream")
+async def match_jobs_stream(
+    request: MatchRequest,
+    format: str = Query('ndjson', pattern='^(ndjson|sse)$'),
+    fetch_wait: float = Query(60, ge=0, le=300, description="Seconds to follow a background fetch for fresh matches")
 ):
     """
-    Upload a resume and get job matches in one step.
+    Streaming /match: top matches are sent as soon as scoring finishes,
+    followed by the industry summary and any background-fetched matches.
+    """
+    if not is_trained:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not yet trained. Please wait."
+        )
+    
+    return StreamingResponse(
+        match_events(request, format, fetch_wait),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def batch_match_chunk(candidates: List[dict], jobs: List[dict], limit: int, features: dict) -> List[List[dict]]:
+    """Top matches for a chunk of candidates (runs on the scoring pool)"""
+    return [
+        [result.to_dict() for result in results]
+        for results in job_matcher.match_batch(candidates, jobs, top_k=limit, features=features)
+    ]
+
+
+async def batch_match_results(request: MatchBatchRequest):
+    """
+    Load the catalog once, then score candidates against it chunk by chunk.
+    
+    Yields ('jobs', count) first, then ('candidate', result) per candidate.
+    """
+    filters = {
+        'city': request.city,
+        'industry': request.target_industry,
+        'region': request.region,
+        'job_source': request.job_source,
+        'education_required': request.education_required,
+        'min_salary': request.min_salary,
+        'max_salary': request.max_salary,
+    }
+    with stage('db_load'):
+        if any(value is not None for value in filters.values()):
+            jobs = job_store.get_jobs(filters)
+        else:
+            jobs = job_store.get_jobs(limit=200)
+        await attach_descriptions(jobs)
+    with stage('features'):
+        features = await scoring_pool.run(job_matcher.job_features, jobs)
+    yield 'jobs', len(jobs)
+    
+    chunk_size = max(1, settings.BATCH_CHUNK_SIZE)
+    for start in range(0, len(request.candidates), chunk_size):
+        chunk = request.candidates[start:start + chunk_size]
+        profiles = [
+            {
+                'skills': c.skills,
+                'experience_years': c.experience_years,
+                'education': c.education,
+                'industries': c.industries,
+            }
+            for c in chunk
+        ]
+        with stage('score'):
+            chunk_matches = await scoring_pool.run(batch_match_chunk, profiles, jobs, request.limit, features)
+        for offset, (candidate, matches) in enumerate(zip(chunk, chunk_matches)):
+            if candidate.candidate_id:
+                for match in matches:
+                    write_queue.enqueue_match(candidate.candidate_id, match)
+            yield 'candidate', {
+                "index": start + offset,
+                "candidate_id": candidate.candidate_id,
+                "matches": matches,
+            }
+
+
+def batch_throughput(candidates: int, jobs: int, started: float) -> dict:
+    elapsed = time.perf_counter() - started
+    return {
+        "candidates": candidates,
+        "jobs": jobs,
+        "pairs_scored": candidates * jobs,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "candidates_per_second": round(candidates / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+@app.post("/match-batch")
+async def match_batch(
+    request: MatchBatchRequest,
+    stream: bool = Query(False, description="Stream one NDJSON line per candidate"),
+):
     """
-    # Parse resume
+    Match a cohort of candidates against one catalog load.
+    
+    Every candidate is scored against the same job matrix; results keep the
+    order of request.candidates. LinkedIn boosts are not applied.
+    """
+    if not is_trained:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not yet trained. Please wait."
+        )
+    if len(request.candidates) > settings.BATCH_MAX_CANDIDATES:
+        raise HTTPException(413, f"At most {settings.BATCH_MAX_CANDIDATES} candidates per batch")
+    
+    started = time.perf_counter()
+    
+    if stream:
+        async def lines():
+            job_count = 0
+            async for kind, value in batch_match_results(request):
+                if kind == 'jobs':
+                    job_count = value
+                    yield stream_frame("meta", {"candidates": len(request.candidates), "jobs": value}, 'ndjson')
+                else:
+                    yield stream_frame("candidate", value, 'ndjson')
+            yield stream_frame("done", batch_throughput(len(request.candidates), job_count, started), 'ndjson')
+        
+        return StreamingResponse(lines(), media_type=STREAM_MEDIA_TYPES['ndjson'])
+    
+    job_count = 0
+    results = []
+    async for kind, value in batch_match_results(request):
+        if kind == 'jobs':
+            job_count = value
+        else:
+            results.append(value)
+    
+    throughput = batch_throughput(len(request.candidates), job_count, started)
+    log.info(
+        "Batch match complete",
+        candidates=throughput['candidates'],
+        jobs=job_count,
+        elapsed_ms=throughput['elapsed_ms'],
+        candidates_per_second=throughput['candidates_per_second'],
+    )
+    return {
+        "success": True,
+        "results": results,
+        "throughput": throughput,
+    }
+
+
+async def parse_resume_upload(file: UploadFile) -> ParsedResume:
+    """Validate and parse an uploaded resume on the parser pool"""
     allowed_types = {'.pdf', '.docx', '.txt'}
     file_ext = Path(file.filename).suffix.lower()
     
@@ -458,20 +1303,20 @@ async def match_resume(
             detail=f"Unsupported file type. Allowed: {', '.join(allowed_types)}"
         )
     
+    content = await read_resume_upload(file)
+    
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        parsed = resume_parser.parse(tmp_path)
-        os.unlink(tmp_path)
+        return await parse_resume_cached(content, file_ext)
         
+    except IntegrationTimeout:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Resume parsing failed: {str(e)}")
-    
-    # Create match request
-    request = MatchRequest(
+
+
+def resume_match_request(parsed: ParsedResume, city: Optional[str], industry: Optional[str], limit: int) -> MatchRequest:
+    """Match request for a parsed resume"""
+    return MatchRequest(
         skills=parsed.skills,
         experience_years=parsed.experience_years,
         education=[edu for edu in parsed.education],
@@ -480,12 +1325,10 @@ async def match_resume(
         target_industry=industry,
         limit=limit
     )
-    
-    # Get matches
-    result = await match_jobs(request)
-    
-    # Add parsed resume data to response
-    result['parsed_resume'] = {
+
+
+def parsed_resume_summary(parsed: ParsedResume) -> dict:
+    return {
         'skills': parsed.skills,
         'experience_years': parsed.experience_years,
         'education': parsed.education,
@@ -493,40 +1336,167 @@ async def match_resume(
         'industries': parsed.industries,
         'certifications': parsed.certifications,
     }
+
+
+@app.post("/match-resume")
+async def match_resume(
+    file: UploadFile = File(...),
+    city: Optional[str] = Query(None),
+    industry: Optional[str] = Query(None),
+    limit: int = Query(20)
+):
+    """
+    Upload a resume and get job matches in one step.
+    """
+    parsed = await parse_resume_upload(file)
     
-    return result
+    # Get matches
+    result = await match_jobs(resume_match_request(parsed, city, industry, limit))
+    
+    # Add parsed resume data to response (a copy, the result may be cached)
+    return {**result, 'parsed_resume': parsed_resume_summary(parsed)}
+
+
+@app.post("/match-resume/stream")
+async def match_resume_stream(
+    file: UploadFile = File(...),
+    city: Optional[str] = Query(None),
+    industry: Optional[str] = Query(None),
+    limit: int = Query(20),
+    format: str = Query('ndjson', pattern='^(ndjson|sse)$'),
+    fetch_wait: float = Query(60, ge=0, le=300)
+):
+    """
+    Streaming /match-resume: the parsed resume is sent first, then the same
+    events as /match/stream.
+    """
+    if not is_trained:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not yet trained. Please wait."
+        )
+    
+    parsed = await parse_resume_upload(file)
+    request = resume_match_request(parsed, city, industry, limit)
+    return StreamingResponse(
+        match_events(request, format, fetch_wait, parsed_resume=parsed_resume_summary(parsed)),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def catalog_filters(
+    city: Optional[List[str]] = Query(None, description="Partial match; repeat for any of several"),
+    region: Optional[List[str]] = Query(None),
+    industry: Optional[List[str]] = Query(None),
+    source: Optional[List[str]] = Query(None),
+    education: Optional[List[str]] = Query(None),
+    experience_years: Optional[float] = Query(None, description="Jobs requiring at most this experience"),
+    min_salary: Optional[float] = Query(None),
+    max_salary: Optional[float] = Query(None)
+) -> dict:
+    """Facet filters shared by /jobs and /facets"""
+    return {
+        'city': city,
+        'region': region,
+        'industry': industry,
+        'job_source': source,
+        'education_required': education,
+        'experience_years': experience_years,
+        'min_salary': min_salary,
+        'max_salary': max_salary,
+    }
 
 
 @app.get("/jobs")
 async def get_jobs(
-    city: Optional[str] = None,
-    industry: Optional[str] = None,
-    limit: int = 50
+    filters: dict = Depends(catalog_filters),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
-    """Get available jobs, optionally filtered by city or industry"""
-    if city and industry:
-        jobs = db.get_jobs_by_industry(industry, city)
-    elif city:
-        jobs = db.get_jobs_by_city(city)
-    elif industry:
-        jobs = db.get_jobs_by_industry(industry)
-    else:
-        jobs = db.get_all_jobs(limit=limit)
+    """
+    Get available jobs, optionally filtered by any combination of facets.
+    
+    Results are paged by job id; pass the returned next_cursor to get the
+    following page. next_cursor is null on the last page.
+    """
+    jobs, next_cursor = job_store.get_jobs_page(filters, cursor=cursor, limit=limit)
+    descriptions = await db.get_descriptions([job['id'] for job in jobs])
+    for job in jobs:
+        job['description'] = descriptions.get(job['id'], '')
     
     return {
         "success": True,
         "count": len(jobs),
-        "jobs": jobs[:limit]
+        "total": job_store.count(filters),
+        "jobs": jobs,
+        "next_cursor": next_cursor
+    }
+
+
+@app.get("/facets")
+async def get_facets(filters: dict = Depends(catalog_filters)):
+    """
+    Job counts per city, region, industry, source and education level.
+    
+    Each facet is counted under all the other active filters, so the counts
+    show how many jobs selecting that value would return.
+    """
+    return {
+        "success": True,
+        "total": job_store.count(filters),
+        "facets": job_store.facet_counts(filters)
     }
 
 
 @app.get("/industries")
 async def get_industries():
-    """Get list of available industries"""
+    """Get list of available industries with live job counts"""
     industries = list(IndustryClassifier.INDUSTRY_KEYWORDS.keys())
+    counts = await db.get_job_counts(('industry',))
+    return {
+        "success": True,
+        "industries": industries,
+        "job_counts": {row['industry']: row['count'] for row in counts}
+    }
+
+
+@app.get("/catalog-stats")
+async def get_catalog_stats():
+    """
+    Live job counts per city, industry and source.
+    Served from the job_counts aggregate table, which triggers keep current.
+    """
+    rows = await db.get_job_counts()
+    by_city, by_industry, by_source = {}, {}, {}
+    for row in rows:
+        by_city[row['city']] = by_city.get(row['city'], 0) + row['count']
+        by_industry[row['industry']] = by_industry.get(row['industry'], 0) + row['count']
+        by_source[row['job_source']] = by_source.get(row['job_source'], 0) + row['count']
+    return {
+        "success": True,
+        "total": sum(by_source.values()),
+        "by_city": by_city,
+        "by_industry": by_industry,
+        "by_source": by_source,
+        "segments": rows
+    }
+
+
+@app.get("/top-skills")
+async def get_top_skills(
+    industry: Optional[str] = None,
+    city: Optional[str] = None,
+    source: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Most requested skills across live jobs, optionally within one industry, city and/or source"""
     return {
         "success": True,
-        "industries": industries
+        "industry": industry,
+        "city": city,
+        "source": source,
+        "skills": await db.get_skill_counts(industry, city=city, job_source=source, limit=limit)
     }
 
 
@@ -555,7 +1525,7 @@ async def analyze_resume(request: AnalyzeResumeRequest):
     """
     try:
         # Parse the resume text
-        parsed = resume_parser.parse_text(request.resume_text)
+        parsed = await parse_resume_cached(request.resume_text)
         
         # Detect industries from skills and text
         detected_industries = IndustryClassifier.classify(request.resume_text)
@@ -622,23 +1592,22 @@ async def analyze_resume(request: AnalyzeResumeRequest):
             else:
                 search_position = primary_industry
             
-            print(f"[AI Analysis] Fetching fresh jobs for: {search_position} in {location}")
+            log.debug("Fetching fresh jobs for analysis", position=search_position, location=location)
             
             try:
-                fetched_jobs = job_api_orchestrator.fetch_jobs(
+                fetched_jobs = await fetch_jobs_shared(
                     location=location,
                     keywords=[search_position],
                     limit=30
                 )
                 
                 # Cache in database
-                for job in fetched_jobs:
-                    db.insert_job(job)
+                write_queue.enqueue_jobs(fetched_jobs)
                 
                 fresh_jobs_count = len(fetched_jobs)
-                print(f"[AI Analysis] Fetched {fresh_jobs_count} fresh jobs")
+                log.debug("Fetched fresh jobs for analysis", jobs=fresh_jobs_count)
             except Exception as e:
-                print(f"[AI Analysis] Error fetching jobs: {e}")
+                log.warning("Fetching fresh jobs for analysis failed", error=str(e))
         
         return {
             "success": True,
@@ -654,6 +1623,8 @@ async def analyze_resume(request: AnalyzeResumeRequest):
             "certifications": parsed.certifications,
         }
         
+    except IntegrationTimeout:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
@@ -691,46 +1662,60 @@ async def analyze_resume_file(
         else:
             raise HTTPException(400, f"Unsupported file type: {content_type}. Allowed: PDF, DOCX, TXT")
     
+    file_content = await read_resume_upload(file)
+    
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        print(f"[Gemini] Analyzing resume file: {filename} ({content_type}), size: {len(file_content)} bytes")
+        log.debug("Analyzing resume file", filename=filename, content_type=content_type, size=len(file_content))
         
         # Use Gemini for analysis if available
         if gemini_analyzer and gemini_analyzer.is_available():
-            if content_type == 'text/plain':
+            # The same resume uploaded again reuses the stored analysis instead of a paid call
+            analysis_key = content_key(file_content, '.txt' if content_type == 'text/plain' else None)
+            result = await cached_resume_result('gemini', analysis_key, gemini_analyzer.version)
+            if result is not None:
+                result['cached'] = True
+            elif content_type == 'text/plain':
                 # For text files, decode and use text analysis
                 resume_text = file_content.decode('utf-8', errors='ignore')
-                result = gemini_analyzer.analyze_resume_text(resume_text)
+                with stage('gemini'):
+                    result = await gemini_pool.run(gemini_analyzer.analyze_resume_text, resume_text)
                 result['extracted_text'] = resume_text
             else:
                 # For PDF/DOCX, use file analysis
-                result = gemini_analyzer.analyze_resume_file(file_content, filename, content_type)
+                with stage('gemini'):
+                    result = await gemini_pool.run(gemini_analyzer.analyze_resume_file, file_content, filename, content_type)
+            
+            # Only real Gemini answers are worth keeping; errors and local fallbacks are not
+            if not result.get('cached') and not result.get('error') and result.get('analysis_method') != 'fallback':
+                # Stored with extracted_text, so a hit answers without extracting the file again
+                await store_resume_result('gemini', analysis_key, gemini_analyzer.version, result)
             
             result['analysis_method'] = 'gemini'
-            print(f"[Gemini] Analysis complete: {result.get('detected_industry')} ({result.get('industry_confidence')}%)")
-            print(f"[Gemini] Skills detected: {result.get('detected_skills', [])}")
-            print(f"[Gemini] Extracted text length: {len(result.get('extracted_text', ''))}")
+            log.debug(
+                "Gemini analysis complete",
+                industry=result.get('detected_industry'),
+                confidence=result.get('industry_confidence'),
+                skills=len(result.get('detected_skills', [])),
+                text_length=len(result.get('extracted_text', '')),
+            )
             
             # If there's an error, log it
             if result.get('error'):
-                print(f"[Gemini] Error: {result.get('error')}")
+                log.warning("Gemini analysis failed", error=result.get('error'))
         else:
             # Fallback: Try to extract text and use basic analysis
-            print("[Gemini] API not available, using fallback analysis")
+            log.info("Gemini API not available, using fallback analysis", sample=0.1)
             
             if content_type == 'text/plain':
                 resume_text = file_content.decode('utf-8', errors='ignore')
             elif content_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
                 # Try to extract DOCX text
                 try:
-                    from docx import Document
-                    import io
-                    doc = Document(io.BytesIO(file_content))
-                    resume_text = '\n'.join([p.text for p in doc.paragraphs])
+                    resume_text = await parser_pool.run(resume_parser.extract_text, file_content, '.docx')
                 except ImportError:
                     raise HTTPException(500, "python-docx not installed. Cannot process DOCX files without Gemini API.")
+                except IntegrationTimeout:
+                    raise
                 except Exception as e:
                     raise HTTPException(500, f"Failed to extract text from DOCX: {str(e)}")
             else:
@@ -745,7 +1730,7 @@ async def analyze_resume_file(
                 result = gemini_analyzer._fallback_analysis(resume_text)
             else:
                 # Ultimate fallback using resume parser
-                parsed = resume_parser.parse_text(resume_text)
+                parsed = await parser_pool.run(resume_parser.parse_text, resume_text)
                 result = {
                     'detected_skills': parsed.skills,
                     'detected_industry': 'Technology',
@@ -776,23 +1761,22 @@ async def analyze_resume_file(
             else:
                 search_position = industry
             
-            print(f"[Gemini] Fetching fresh jobs for: {search_position} in {location}")
+            log.debug("Fetching fresh jobs for analysis", position=search_position, location=location)
             
             try:
-                fetched_jobs = job_api_orchestrator.fetch_jobs(
+                fetched_jobs = await fetch_jobs_shared(
                     location=location,
                     keywords=[search_position],
                     limit=30
                 )
                 
                 # Cache in database
-                for job in fetched_jobs:
-                    db.insert_job(job)
+                write_queue.enqueue_jobs(fetched_jobs)
                 
                 fresh_jobs_count = len(fetched_jobs)
-                print(f"[Gemini] Fetched {fresh_jobs_count} fresh jobs")
+                log.debug("Fetched fresh jobs for analysis", jobs=fresh_jobs_count)
             except Exception as e:
-                print(f"[Gemini] Error fetching jobs: {e}")
+                log.warning("Fetching fresh jobs for analysis failed", error=str(e))
         
         result['fresh_jobs_fetched'] = fresh_jobs_count
         result['success'] = True
@@ -800,10 +1784,10 @@ async def analyze_resume_file(
         
         return result
         
-    except HTTPException:
+    except (HTTPException, IntegrationTimeout):
         raise
     except Exception as e:
-        print(f"[Gemini] Error analyzing file: {e}")
+        log.exception("Analyzing resume file failed")
         raise HTTPException(status_code=500, detail=f"File analysis failed: {str(e)}")
 
 
@@ -829,14 +1813,14 @@ async def scrape_linkedin(request: LinkedInRequest):
     if not linkedin_scraper.is_valid_linkedin_url(request.linkedin_url):
         raise HTTPException(400, "Invalid LinkedIn URL. Use format: https://www.linkedin.com/in/username")
     
-    print(f"[LinkedIn] Scraping profile: {request.linkedin_url}")
+    log.debug("Scraping LinkedIn profile", url=request.linkedin_url)
     
     try:
         # Scrape the profile
-        profile_data = linkedin_scraper.scrape_profile(request.linkedin_url)
+        profile_data = await scrape_profile_shared(request.linkedin_url)
         
         if profile_data.get("error"):
-            print(f"[LinkedIn] Scraping failed: {profile_data.get('error')}")
+            log.warning("LinkedIn scraping failed", error=profile_data.get('error'))
             return {
                 "success": False,
                 "error": profile_data.get("error"),
@@ -847,7 +1831,7 @@ async def scrape_linkedin(request: LinkedInRequest):
         # Calculate confidence boost
         boost = linkedin_scraper.calculate_profile_boost(profile_data)
         
-        print(f"[LinkedIn] Profile scraped successfully. Skills: {len(profile_data.get('skills', []))}, Boost: {boost['boost_percentage']}%")
+        log.debug("LinkedIn profile scraped", skills=len(profile_data.get('skills', [])), boost=boost['boost_percentage'])
         
         return {
             "success": True,
@@ -855,8 +1839,10 @@ async def scrape_linkedin(request: LinkedInRequest):
             "boost": boost
         }
         
+    except IntegrationTimeout:
+        raise
     except Exception as e:
-        print(f"[LinkedIn] Error: {e}")
+        log.exception("LinkedIn scraping failed")
         raise HTTPException(500, f"LinkedIn scraping failed: {str(e)}")
 
 
@@ -870,13 +1856,82 @@ async def get_linkedin_status():
     }
 
 
+@app.get("/fetch-tasks")
+async def list_fetch_tasks(active_only: bool = Query(False), limit: int = Query(50, ge=1, le=500)):
+    """Background job fetches started by /match, newest first."""
+    tasks = fetch_tasks.list(active_only) if fetch_tasks else []
+    return {
+        "success": True,
+        "tasks": [fetch_task_info(task) for task in tasks[:limit]],
+        "stats": fetch_tasks.stats() if fetch_tasks else None
+    }
+
+
+@app.get("/fetch-tasks/{task_id}")
+async def get_fetch_task(task_id: str):
+    """Status of one background fetch; re-run /match once it is done."""
+    task = await fetch_tasks.get(task_id) if fetch_tasks else None
+    if task is None:
+        raise HTTPException(404, f"Unknown fetch task: {task_id}")
+    return {"success": True, "task": fetch_task_info(task)}
+
+
+@app.get("/fetch-tasks/{task_id}/events")
+async def stream_fetch_task(task_id: str):
+    """
+    Server-sent events for one background fetch.
+    Sends a status event on every change and closes after the final one.
+    """
+    if not fetch_tasks or await fetch_tasks.get(task_id) is None:
+        raise HTTPException(404, f"Unknown fetch task: {task_id}")
+    
+    async def events():
+        async for state in fetch_tasks.events(task_id):
+            if state is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: status\ndata: {json.dumps(state)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Latency histograms and counters in the Prometheus text format (this worker's only)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/db-status")
+async def get_db_status():
+    """Database and integration pool utilisation, write-behind queue depth, job store and match cache stats."""
+    return {
+        "available": db is not None,
+        "pool": db.stats() if db else None,
+        "write_queue": write_queue.stats() if write_queue else None,
+        "job_store": job_store.stats() if job_store else None,
+        "match_cache": match_cache.stats(),
+        "resume_cache": resume_cache.stats() if resume_cache else None,
+        "shared_state": shared_state.stats() if shared_state else None,
+        "tracing": tracer.stats(),
+        "logging": log_stats(),
+        "integrations": {pool.name: pool.stats() for pool in integration_pools},
+        "single_flight": {flights.name: flights.stats() for flights in (job_api_flights, linkedin_flights)}
+    }
+
+
 @app.get("/cities")
 async def get_cities():
     """Get list of Philippine cities with job listings"""
+    counts = await db.get_job_counts(('city',))
     return {
         "success": True,
         "cities": settings.PHILIPPINE_CITIES,
-        "primary_city": "Naga City"
+        "primary_city": "Naga City",
+        "job_counts": {row['city']: row['count'] for row in counts}
     }
 
 
@@ -897,28 +1952,70 @@ async def refresh_jobs(
 
     try:
         if city:
-            print(f"Refreshing jobs for {city}...")
-            jobs = job_api_orchestrator.fetch_jobs(
+            log.info("Refreshing jobs", city=city)
+            jobs = await fetch_jobs_shared(
                 location=city,
                 limit=50
             )
-            for job in jobs:
-                db.insert_job(job)
+            await db.insert_jobs_bulk(jobs)
             job_count = len(jobs)
         else:
-            print("Refreshing jobs for all cities...")
+            log.info("Refreshing jobs for all cities")
             await fetch_and_cache_real_jobs()
-            job_count = len(db.get_all_jobs(limit=1000))
+            job_count = await db.count_jobs()
+
+        # Make refreshed jobs matchable now rather than on the next scheduled refresh
+        await db.run(job_store.refresh)
 
         return {
             "success": True,
             "message": f"Refreshed jobs for {city or 'all cities'}",
             "job_count": job_count
         }
+    except IntegrationTimeout:
+        raise
     except Exception as e:
         raise HTTPException(500, f"Error refreshing jobs: {str(e)}")
 
 
+@app.get("/retention-report")
+async def get_retention_report():
+    """Jobs table size, live/expired counts and space reclaimed by retention."""
+    return {
+        "success": True,
+        "enabled": settings.ENABLE_RETENTION,
+        "report": await db.run(job_retention.report)
+    }
+
+
+@app.get("/snapshots")
+async def get_snapshots():
+    """Training snapshots of the jobs database, newest first."""
+    return {
+        "success": True,
+        "interval_seconds": settings.SNAPSHOT_INTERVAL,
+        "latest": snapshot_manager.latest(),
+        "snapshots": snapshot_manager.list()
+    }
+
+
+@app.post("/expire-jobs")
+async def expire_jobs():
+    """
+    Run expiry, archiving and incremental vacuum now.
+    Admin endpoint; the same pass also runs every RETENTION_INTERVAL seconds.
+    """
+    try:
+        result = await db.run(job_retention.run, consumed_seq=await consumed_change_seq())
+        await db.run(job_store.refresh)
+        return {
+            "success": True,
+            "result": result
+        }
+    except Exception as e:
+        raise HTTPException(500, f"Error expiring jobs: {str(e)}")
+
+
 @app.post("/feedback")
 async def submit_feedback(request: FeedbackRequest):
     """
@@ -933,7 +2030,8 @@ async def submit_feedback(request: FeedbackRequest):
         'timestamp': datetime.now().isoformat()
     }
     
-    # In production, this would update the database and trigger retraining
+    # Persist through the write-behind queue; retraining still reads feedback_history
+    write_queue.enqueue_feedback(feedback)
     job_matcher.feedback_history.append(feedback)
     
     return {
@@ -948,7 +2046,7 @@ async def train_model(config: TrainingConfig):
     """
     Trigger model training with new data.
     """
-    global is_trained
+    global is_trained, applied_model_id
     
     try:
         # Generate training data
@@ -961,6 +2059,12 @@ async def train_model(config: TrainingConfig):
         job_matcher.train(training_data)
         is_trained = True
         
+        # Other workers switch to the new model on their next refresh
+        if shared_state:
+            state = await scoring_pool.run(shared_state.publish_model, job_matcher)
+            await scoring_pool.run(job_matcher.load, state['model_path'])
+            applied_model_id = job_matcher.model_id
+        
         return {
             "success": True,
             "message": f"Model trained on {len(training_data)} samples",
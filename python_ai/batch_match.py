@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Matching
+Matches stored candidate profiles (JSONL or CSV) against a job catalog
+without going through the API, for nightly recommendation runs.
+
+Candidates are streamed from the input file and scored in chunks on a
+process pool. Every worker shares the trained model and the precomputed job
+matrix read-only. Top-k results are appended to JSONL (or Parquet part files)
+as chunks finish, and a checkpoint is written after each chunk, so a crashed
+run picks up where it stopped. The database snapshot and the model a run
+starts with are kept next to the checkpoint and reused on resume, so every
+result of one run comes from the same catalog and model.
+
+Usage:
+    python batch_match.py --candidates profiles.jsonl --out results.jsonl
+    python batch_match.py --candidates profiles.csv --catalog exports/catalog --out results.jsonl
+    python batch_match.py --candidates profiles.jsonl --format parquet --out results/ --top-k 10
+    python batch_match.py --candidates profiles.jsonl --out results.jsonl --restart
+
+Candidate fields (JSONL keys or CSV columns):
+    candidate_id (or id), skills, experience_years, education, industries
+In CSV, skills/industries are separated by ';' or ',' and education lists degrees ('bachelors;masters').
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from models.job_matcher import JobMatcher
+from data.data_generator import JobDatabase, generate_training_data
+from data.catalog_export import CatalogSnapshot
+from data.snapshots import SnapshotManager
+
+# Set in each worker by _init_worker (inherited without copying under fork)
+_worker: Dict = {}
+
+
+def _split(value, separators: str = r'[;,|]') -> List[str]:
+    if isinstance(value, str):
+        return [part.strip() for part in re.split(separators, value) if part.strip()]
+    return [str(part).strip() for part in value or [] if str(part).strip()]
+
+
+def normalize_candidate(record: Dict) -> Dict:
+    """Candidate profile from a JSONL object or CSV row"""
+    education = record.get('education') or []
+    if isinstance(education, str):
+        education = [{'degree': degree} for degree in _split(education, r'[;|]')]
+    return {
+        'skills': _split(record.get('skills')),
+        'experience_years': float(record.get('experience_years') or 0),
+        'education': [entry for entry in education if isinstance(entry, dict)],
+        'industries': _split(record.get('industries'), r'[;|]'),
+    }
+
+
+def read_candidates(path: str) -> Iterator[Tuple[int, Optional[str], Optional[Dict], Optional[str]]]:
+    """
+    Stream (index, candidate_id, profile, error) from a JSONL or CSV file.
+
+    Unreadable records keep their index and carry an error instead of a profile.
+    """
+    suffix = Path(path).suffix.lower()
+    with open(path, newline='' if suffix == '.csv' else None, encoding='utf-8') as f:
+        if suffix == '.csv':
+            records = (('row', row) for row in csv.DictReader(f))
+        else:
+            records = (('line', line) for line in f if line.strip())
+
+        for index, (kind, raw) in enumerate(records):
+            try:
+                record = json.loads(raw) if kind == 'line' else raw
+                candidate_id = record.get('candidate_id') or record.get('id') or str(index)
+                yield index, str(candidate_id), normalize_candidate(record), None
+            except (ValueError, TypeError, AttributeError) as e:
+                yield index, None, None, f"Unreadable candidate: {e}"
+
+
+def load_jobs(args, snapshot_dir: Path, pinned: Optional[str] = None) -> Tuple[List[Dict], str, Optional[str]]:
+    """
+    Jobs to match against, a description of where they came from, and the snapshot read.
+
+    A new run snapshots the database into snapshot_dir; a resumed run passes
+    the snapshot it started from as pinned.
+    """
+    filters = {}
+    if args.industry:
+        filters['industry'] = args.industry
+    if args.source:
+        filters['job_source'] = args.source
+
+    if args.catalog:
+        snapshot = CatalogSnapshot(args.catalog)
+        return list(snapshot.iter_jobs(filters)), f"catalog {args.catalog}", None
+
+    if args.no_snapshot:
+        db = JobDatabase(args.db)
+        return list(db.iter_jobs(filters, include_description=True)), f"database {args.db}", None
+
+    if pinned:
+        if not Path(pinned).exists():
+            raise SystemExit(f"❌ Snapshot {pinned} of the interrupted run is gone; use --restart to start over")
+        path = pinned
+    else:
+        path = SnapshotManager(args.db, str(snapshot_dir), keep=1).refresh()['path']
+    db = JobDatabase(path, read_only=True)
+    return list(db.iter_jobs(filters, include_description=True)), f"snapshot {path}", path
+
+
+def load_matcher(model_dir: Optional[str], run_model_dir: Path, resume: bool) -> JobMatcher:
+    """
+    Matcher for the run: a resumed run reloads the copy saved when it started.
+
+    A new run loads the saved matcher if there is one, else trains one the way
+    the API trains at startup, and saves it to run_model_dir.
+    """
+    matcher = JobMatcher()
+    if resume:
+        if not (run_model_dir / 'matcher.pkl').exists():
+            raise SystemExit(f"❌ Model of the interrupted run is missing from {run_model_dir}; use --restart to start over")
+        matcher.load(str(run_model_dir))
+        print(f"[OK] Reloaded the run's model from {run_model_dir}")
+        return matcher
+
+    if model_dir and (Path(model_dir) / 'matcher.pkl').exists():
+        matcher.load(model_dir)
+        print(f"[OK] Loaded model from {model_dir}")
+    else:
+        print("[INFO] No saved model found, training on generated data...")
+        matcher.train(generate_training_data(num_samples=500))
+    matcher.save(str(run_model_dir))
+    return matcher
+
+
+def _init_worker(matcher: JobMatcher, jobs: List[Dict], features: Dict, top_k: int):
+    _worker.update(matcher=matcher, jobs=jobs, features=features, top_k=top_k)
+
+
+def _match_chunk(chunk: List[Tuple[int, Optional[str], Optional[Dict], Optional[str]]]) -> List[Dict]:
+    """Top-k results for one chunk of candidates (runs in a worker)"""
+    scored = [item for item in chunk if item[2] is not None]
+    results = _worker['matcher'].match_batch(
+        [profile for _, _, profile, _ in scored],
+        _worker['jobs'],
+        top_k=_worker['top_k'],
+        features=_worker['features']
+    )
+    by_index = {item[0]: matches for item, matches in zip(scored, results)}
+
+    records = []
+    for index, candidate_id, profile, error in chunk:
+        record = {'index': index, 'candidate_id': candidate_id}
+        if error:
+            record['error'] = error
+        else:
+            record['matches'] = [
+                {'rank': rank, **match.to_dict()} for rank, match in enumerate(by_index[index], 1)
+            ]
+        records.append(record)
+    return records
+
+
+class JsonlResultWriter:
+    """Appends one JSON line per candidate; resumes by truncating to the checkpointed size"""
+
+    def __init__(self, path: str, resume_bytes: Optional[int] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume_bytes is None:
+            self.file = open(self.path, 'wb')
+        else:
+            self.file = open(self.path, 'r+b')
+            self.file.truncate(resume_bytes)
+            self.file.seek(resume_bytes)
+
+    def write(self, records: List[Dict]):
+        self.file.write(b''.join((json.dumps(r) + '\n').encode('utf-8') for r in records))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def position(self) -> Dict:
+        return {'output_bytes': self.file.tell()}
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetResultWriter:
+    """Writes one Parquet part per chunk, one row per (candidate, rank); needs pyarrow or fastparquet"""
+
+    def __init__(self, path: str, resume_parts: Optional[int] = None):
+        import pandas as pd
+        try:
+            pd.io.parquet.get_engine('auto')  # Fail now, not after the first chunk
+        except ImportError:
+            raise SystemExit("❌ Parquet output needs pyarrow (pip install pyarrow); use --format jsonl otherwise")
+        self.pd = pd
+        self.dir = Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.parts = resume_parts or 0
+        # Parts past the checkpoint were written by the crashed run after its last checkpoint
+        for part in self.dir.glob('part-*.parquet'):
+            if resume_parts is None or int(part.stem.split('-')[1]) >= self.parts:
+                part.unlink()
+
+    def write(self, records: List[Dict]):
+        rows = []
+        for record in records:
+            if 'error' in record:
+                rows.append({'candidate_index': record['index'], 'candidate_id': record['candidate_id'],
+                             'rank': 0, 'error': record['error']})
+                continue
+            for match in record['matches']:
+                rows.append({
+                    'candidate_index': record['index'],
+                    'candidate_id': record['candidate_id'],
+                    'rank': match['rank'],
+                    'job_id': match['job_id'],
+                    'confidence': match['confidence'],
+                    'title': match['title'],
+                    'company': match['company'],
+                    'industry': match['industry'],
+                    'city': match['city'],
+                    'skill_match_score': match['skill_match_score'],
+                    'matched_skills': ';'.join(match['matched_skills']),
+                    'missing_skills': ';'.join(match['missing_skills']),
+                    'job_url': match['job_url'],
+                    'error': None,
+                })
+        path = self.dir / f'part-{self.parts:05d}.parquet'
+        self.pd.DataFrame(rows).to_parquet(path, index=False)
+        self.parts += 1
+
+    def position(self) -> Dict:
+        return {'parts': self.parts}
+
+    def close(self):
+        pass
+
+
+def checkpoint_path(out: str, fmt: str) -> Path:
+    return Path(out) / '_checkpoint.json' if fmt == 'parquet' else Path(f'{out}.checkpoint.json')
+
+
+def run_dir(out: str, fmt: str) -> Path:
+    """Where a run keeps its database snapshot and model for resuming"""
+    return Path(out) / '_run' if fmt == 'parquet' else Path(f'{out}.run')
+
+
+def write_checkpoint(path: Path, state: Dict):
+    """Replace the checkpoint atomically so a crash never leaves a torn one"""
+    state['updated_at'] = datetime.now().isoformat()
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def run(args) -> Dict:
+    ckpt_path = checkpoint_path(args.out, args.format)
+    pinned_dir = run_dir(args.out, args.format)
+    run_key = {
+        'candidates_file': str(Path(args.candidates).resolve()),
+        'format': args.format,
+        'top_k': args.top_k,
+        'catalog': args.catalog,
+        'db': None if args.catalog else args.db,
+        'industry': args.industry,
+        'source': args.source,
+    }
+
+    checkpoint = None
+    if ckpt_path.exists() and not args.restart:
+        with open(ckpt_path) as f:
+            checkpoint = json.load(f)
+        if any(checkpoint.get(key) != value for key, value in run_key.items()):
+            raise SystemExit(f"❌ {ckpt_path} belongs to a different run; use --restart to start over")
+        if checkpoint.get('complete'):
+            print(f"[OK] Run already complete ({checkpoint['candidates_done']} candidates); use --restart to redo it")
+            return checkpoint
+        print(f"[RESUME] Continuing after {checkpoint['candidates_done']} candidates")
+
+    jobs, source, snapshot = load_jobs(args, pinned_dir / 'snapshot', checkpoint and checkpoint.get('snapshot'))
+    if not jobs:
+        raise SystemExit("❌ No jobs to match against")
+    if checkpoint and args.no_snapshot:
+        print("[WARNING] Resuming against the live database (--no-snapshot); results may mix catalog versions")
+    matcher = load_matcher(args.model, pinned_dir / 'model', resume=checkpoint is not None)
+    if checkpoint and checkpoint.get('model_id') != matcher.model_id:
+        raise SystemExit(f"❌ {pinned_dir / 'model'} is not the model this run started with; use --restart to start over")
+    # The catalog snapshot and model the results come from
+    run_key.update(snapshot=snapshot, model_id=matcher.model_id)
+    started = time.perf_counter()
+    features = matcher.job_features(jobs)
+    print(f"[OK] {len(jobs)} jobs from {source}, job matrix built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    if checkpoint:
+        done = checkpoint['candidates_done']
+        writer = (JsonlResultWriter(args.out, checkpoint['output_bytes']) if args.format == 'jsonl'
+                  else ParquetResultWriter(args.out, checkpoint['parts']))
+    else:
+        done = 0
+        writer = JsonlResultWriter(args.out) if args.format == 'jsonl' else ParquetResultWriter(args.out)
+    state = {**run_key, 'jobs': len(jobs), 'job_source': source, 'candidates_done': done, **writer.position()}
+    write_checkpoint(ckpt_path, state)
+
+    candidates = islice(read_candidates(args.candidates), done, None)
+    chunks = iter(lambda: list(islice(candidates, args.chunk_size)), [])
+
+    # Fork shares the model and job matrix copy-on-write; spawn pickles them once per worker
+    pool = None
+    if args.workers > 1:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        pool = context.Pool(args.workers, initializer=_init_worker, initargs=(matcher, jobs, features, args.top_k))
+    else:
+        _init_worker(matcher, jobs, features, args.top_k)
+
+    run_started = time.perf_counter()
+    matched = 0
+    try:
+        # Keep a bounded window of chunks in flight and write them back in input order
+        pending = deque()
+        while True:
+            while pool and len(pending) < args.workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending.append(pool.apply_async(_match_chunk, (chunk,)))
+            if pool:
+                if not pending:
+                    break
+                records = pending.popleft().get()
+            else:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                records = _match_chunk(chunk)
+
+            writer.write(records)
+            done += len(records)
+            matched += len(records)
+            state.update(candidates_done=done, **writer.position())
+            write_checkpoint(ckpt_path, state)
+
+            elapsed = time.perf_counter() - run_started
+            print(f"  {done:,} candidates ({matched / elapsed:.0f}/s)")
+    finally:
+        if pool:
+            pool.terminate()
+        writer.close()
+
+    elapsed = time.perf_counter() - run_started
+    state.update(
+        complete=True,
+        elapsed_seconds=round(elapsed, 2),
+        candidates_per_second=round(matched / elapsed, 1) if elapsed > 0 else None
+    )
+    write_checkpoint(ckpt_path, state)
+    print(f"\n[SUCCESS] Matched {matched:,} candidates in {elapsed:.1f}s -> {args.out}")
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Match candidate files against the job catalog offline',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--candidates', required=True, help='Candidate profiles (.jsonl or .csv)')
+    parser.add_argument('--out', required=True, help='Results file (jsonl) or directory (parquet)')
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl', help='Output format (default: jsonl)')
+    parser.add_argument('--top-k', type=int, default=20, help='Matches kept per candidate (default: 20)')
+    parser.add_argument('--catalog', type=str, default=None, help='Match against a columnar export instead of the database')
+    parser.add_argument('--db', type=str, default='jobs.db', help='Jobs database (default: jobs.db)')
+    parser.add_argument('--no-snapshot', action='store_true', help='Read the live database instead of a snapshot')
+    parser.add_argument('--industry', type=str, default=None, help='Only match jobs in this industry')
+    parser.add_argument('--source', type=str, default=None, help='Only match jobs from this source')
+    parser.add_argument('--model', type=str, default='trained_models', help='Saved matcher directory (default: trained_models)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='Candidates per chunk and checkpoint (default: 256)')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and start over')
+    args = parser.parse_args()
+
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
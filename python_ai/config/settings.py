@@ -37,6 +37,22 @@ class Settings:
     API_TIMEOUT = int(os.getenv('API_TIMEOUT', '120'))  # Apify scraping needs time
     API_RETRY_COUNT = int(os.getenv('API_RETRY_COUNT', '3'))
 
+    # Blocking integrations run on bounded thread pools: max concurrent calls and seconds a request waits
+    JOB_API_CONCURRENCY = int(os.getenv('JOB_API_CONCURRENCY', '2'))
+    JOB_API_CALL_TIMEOUT = float(os.getenv('JOB_API_CALL_TIMEOUT', '150'))  # Covers API_TIMEOUT plus retries
+    LINKEDIN_CONCURRENCY = int(os.getenv('LINKEDIN_CONCURRENCY', '2'))
+    LINKEDIN_CALL_TIMEOUT = float(os.getenv('LINKEDIN_CALL_TIMEOUT', '90'))  # Run start plus up to 60s of polling
+    GEMINI_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', '4'))
+    GEMINI_CALL_TIMEOUT = float(os.getenv('GEMINI_CALL_TIMEOUT', '60'))
+    PARSER_CONCURRENCY = int(os.getenv('PARSER_CONCURRENCY', '2'))  # PDF/DOCX parsing is CPU-bound
+    PARSER_CALL_TIMEOUT = float(os.getenv('PARSER_CALL_TIMEOUT', '30'))
+
+    # Resume uploads are parsed in memory; larger ones are rejected with 413
+    RESUME_MAX_UPLOAD_BYTES = int(os.getenv('RESUME_MAX_UPLOAD_BYTES', str(5 * 1024 * 1024)))  # 5 MB
+    # Parsed resumes and Gemini analyses, keyed by file content
+    RESUME_CACHE_PATH = os.getenv('RESUME_CACHE_PATH', 'resume_cache.db')  # Holds resume text and contact details (personal data); keep out of version control
+    RESUME_CACHE_MAX_MB = int(os.getenv('RESUME_CACHE_MAX_MB', '256'))  # Stored results before LRU eviction; 0 = off
+
     # Philippine Cities - Naga City as priority
     PHILIPPINE_CITIES = [
         'Naga City',  # Priority location
@@ -55,12 +71,78 @@ class Settings:
         'Remote Philippines'
     ]
 
+    # Region facet for job locations (matched anywhere in the location text)
+    CITY_REGIONS = {
+        'Naga City': 'Bicol Region',
+        'Manila': 'Metro Manila',
+        'Quezon City': 'Metro Manila',
+        'Makati': 'Metro Manila',
+        'Taguig': 'Metro Manila',
+        'Pasig': 'Metro Manila',
+        'Cebu City': 'Central Visayas',
+        'Davao City': 'Davao Region',
+        'Iloilo City': 'Western Visayas',
+        'Bacolod': 'Western Visayas',
+        'Cagayan de Oro': 'Northern Mindanao',
+        'General Santos': 'Soccsksargen',
+        'Zamboanga City': 'Zamboanga Peninsula',
+        'Remote Philippines': 'Remote',
+    }
+
     # Cache Settings
     JOB_CACHE_TTL = int(os.getenv('JOB_CACHE_TTL', '3600'))  # 1 hour in seconds
     ENABLE_CACHE = os.getenv('ENABLE_CACHE', 'true').lower() == 'true'
+    MATCH_CACHE_SIZE = int(os.getenv('MATCH_CACHE_SIZE', '1024'))  # /match responses kept; 0 = off
+    MATCH_CACHE_TTL = int(os.getenv('MATCH_CACHE_TTL', '300'))  # Seconds a cached match response stays valid
+
+    # Batch Matching (/match-batch)
+    BATCH_MAX_CANDIDATES = int(os.getenv('BATCH_MAX_CANDIDATES', '1000'))  # Candidates accepted per request
+    BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '64'))  # Candidates scored per matrix pass
+    BATCH_SCORING_WORKERS = int(os.getenv('BATCH_SCORING_WORKERS', '2'))  # Threads scoring batches off the event loop
 
     # Database
     DB_PATH = os.getenv('DB_PATH', 'jobs.db')
+    DB_MAX_WORKERS = int(os.getenv('DB_MAX_WORKERS', '4'))  # Threads serving async DB calls
+    WRITE_QUEUE_SIZE = int(os.getenv('WRITE_QUEUE_SIZE', '10000'))  # Pending request-path writes before dropping
+    WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', '200'))  # Writes grouped per transaction
+    WRITE_FLUSH_INTERVAL = float(os.getenv('WRITE_FLUSH_INTERVAL', '0.5'))  # Max seconds a write waits for its batch
+    JOB_STORE_REFRESH_INTERVAL = float(os.getenv('JOB_STORE_REFRESH_INTERVAL', '2'))  # Seconds between in-memory catalog refreshes
+
+    # Job Retention
+    # Days a job stays live after its posted date (or ingest time if unknown); 0 = never expire
+    JOB_TTL_DAYS = int(os.getenv('JOB_TTL_DAYS', '45'))
+    # Per-source overrides, e.g. "indeed:30,jobstreet:30,synthetic:0"
+    JOB_SOURCE_TTL_DAYS = {
+        source.strip(): int(days)
+        for source, days in (
+            item.split(':') for item in
+            os.getenv('JOB_SOURCE_TTL_DAYS', 'indeed:30,jobstreet:30,rapidapi:30,synthetic:0').split(',')
+            if ':' in item
+        )
+    }
+    RETENTION_INTERVAL = int(os.getenv('RETENTION_INTERVAL', '3600'))  # Seconds between expiry/vacuum runs
+    ENABLE_RETENTION = os.getenv('ENABLE_RETENTION', 'true').lower() == 'true'
+
+    # Training Snapshots (read-only copies of the database for offline workloads)
+    SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+    SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', '3'))
+    SNAPSHOT_INTERVAL = int(os.getenv('SNAPSHOT_INTERVAL', '3600'))  # Seconds between API-side snapshots; 0 = off
+
+    # Multi-worker serving (uvicorn --workers N on one host)
+    SHARED_STATE_DIR = os.getenv('SHARED_STATE_DIR', '')  # Directory shared by the workers; empty = single process
+    SHARED_CATALOG_INTERVAL = int(os.getenv('SHARED_CATALOG_INTERVAL', '600'))  # Seconds between job store image republishes; 0 = startup only
+
+    # Request tracing (OTLP/JSON spans in a local rotating file)
+    TRACE_PATH = os.getenv('TRACE_PATH', '')  # OTLP/JSON trace file, e.g. traces/spans.jsonl; empty = tracing off
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))  # Fraction of requests traced regardless of latency
+    TRACE_SLOW_MS = float(os.getenv('TRACE_SLOW_MS', '1000'))  # Requests at least this slow are always traced; 0 = off
+    TRACE_MAX_MB = int(os.getenv('TRACE_MAX_MB', '50'))  # Size before the trace file is rotated
+    TRACE_BACKUPS = int(os.getenv('TRACE_BACKUPS', '5'))  # Rotated trace files kept
+
+    # Logging (written to stderr from a background thread)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')  # DEBUG adds per-request detail and integration payloads
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # 'json' (one object per line) or 'text'
+    LOG_MAX_FIELD_CHARS = int(os.getenv('LOG_MAX_FIELD_CHARS', '512'))  # Longer messages and field values are truncated
 
     # Feature Flags
     USE_REAL_JOBS = os.getenv('USE_REAL_JOBS', 'false').lower() == 'true'
@@ -0,0 +1,123 @@
+"""
+Async Database Access
+Runs blocking JobDatabase calls on a bounded thread pool so async
+FastAPI handlers never block the event loop on SQLite I/O.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from data.data_generator import JobDatabase
+from services.tracing import tracer
+
+
+class AsyncJobDatabase:
+    """
+    Awaitable facade over JobDatabase backed by a dedicated thread pool.
+
+    Any JobDatabase method can be awaited through this wrapper, e.g.
+    ``await adb.count_jobs()``. The pool size bounds how many queries run
+    concurrently; extra calls wait in the executor queue and the time they
+    spend there is recorded in stats().
+
+    Generator methods (iter_jobs) must not be called through the wrapper,
+    since their rows would be fetched lazily on the event loop. Use
+    get_jobs_page() instead.
+    """
+
+    def __init__(self, db: JobDatabase, max_workers: int = 4):
+        self.db = db
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='jobdb'
+        )
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'queued': 0,
+            'in_flight': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0,
+            'total_query': 0.0,
+            'max_query': 0.0,
+        }
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the database pool and await its result"""
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['queued'] += 1
+
+        def call():
+            started_at = time.perf_counter()
+            wait = started_at - submitted_at
+            with self._lock:
+                self._stats['queued'] -= 1
+                self._stats['in_flight'] += 1
+                self._stats['total_wait'] += wait
+                self._stats['max_wait'] = max(self._stats['max_wait'], wait)
+
+            failed = False
+            try:
+                with tracer.span(f"db.{getattr(func, '__name__', 'call')}", kind='client',
+                                 **{'db.system': 'sqlite', 'db.queue_wait_ms': round(wait * 1000, 3)}):
+                    return func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with self._lock:
+                    self._stats['in_flight'] -= 1
+                    self._stats['completed'] += 1
+                    self._stats['failed'] += int(failed)
+                    self._stats['total_query'] += elapsed
+                    self._stats['max_query'] = max(self._stats['max_query'], elapsed)
+
+        # The caller's context carries its trace span into the database thread
+        return await loop.run_in_executor(self._executor, contextvars.copy_context().run, call)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+
+        async def method(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        method.__name__ = name
+        return method
+
+    def stats(self) -> Dict:
+        """Pool utilisation and queue wait statistics (times in milliseconds)"""
+        with self._lock:
+            s = dict(self._stats)
+
+        started = (s['completed'] + s['in_flight']) or 1
+        completed = s['completed'] or 1
+        return {
+            'max_workers': self.max_workers,
+            'submitted': s['submitted'],
+            'completed': s['completed'],
+            'failed': s['failed'],
+            'queued': s['queued'],
+            'in_flight': s['in_flight'],
+            'avg_wait_ms': round(s['total_wait'] / started * 1000, 3),
+            'max_wait_ms': round(s['max_wait'] * 1000, 3),
+            'avg_query_ms': round(s['total_query'] / completed * 1000, 3),
+            'max_query_ms': round(s['max_query'] * 1000, 3),
+        }
+
+    def close(self):
+        """Wait for running queries and shut the pool down"""
+        self._executor.shutdown(wait=True)
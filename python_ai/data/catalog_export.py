@@ -0,0 +1,327 @@
+"""
+Columnar Catalog Export
+Snapshots the jobs table into .npy columns plus a string table, and loads
+them back memory-mapped so offline training never has to touch SQLite.
+
+Usage:
+    python data/catalog_export.py --db jobs.db --out exports/catalog
+    python data/catalog_export.py --info exports/catalog
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import shutil
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.data_generator import JobDatabase
+
+FORMAT_VERSION = 1
+
+TEXT_FIELDS = ('id', 'title', 'company', 'posted_date', 'job_url')
+CATEGORY_FIELDS = ('city', 'industry', 'job_source', 'education_required')
+NUMERIC_FIELDS = ('min_experience', 'max_experience', 'salary_min', 'salary_max')
+SKILL_FIELDS = ('required_skills', 'preferred_skills')
+
+
+def normalize_skill(skill: str) -> str:
+    """Skills are exported lower-cased and trimmed, so 'Python ' and 'python' share a code"""
+    return skill.strip().lower()
+
+
+def export_catalog(
+    db: JobDatabase,
+    out_dir: str,
+    filters: Optional[Dict] = None,
+    include_description: bool = False
+) -> Dict:
+    """
+    Write the jobs table to a columnar directory.
+
+    The directory is built next to out_dir and swapped in when complete, so
+    readers never see a half-written export.
+
+    Args:
+        db: Source database
+        out_dir: Export directory (replaced if it exists)
+        filters: Optional JobDatabase filter dict
+        include_description: Also export descriptions as a text column
+
+    Returns:
+        The export manifest
+    """
+    started = time.perf_counter()
+    out_path = Path(out_dir)
+    tmp_path = out_path.with_name(f'{out_path.name}.tmp-{os.getpid()}')
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    text_fields = TEXT_FIELDS + (('description',) if include_description else ())
+    categories = {field: {} for field in CATEGORY_FIELDS}
+    skills: Dict[str, int] = {}
+
+    numeric, category_codes = [], []
+    text_offsets, text_lengths = [], []
+    skill_codes, skill_offsets, skill_lengths = [], [], []
+    string_bytes = 0
+
+    seq = db.get_change_seq()
+    with open(tmp_path / 'strings.bin', 'wb') as strings:
+        for job in db.iter_jobs(filters, include_description=include_description):
+            numeric.append([
+                np.nan if job.get(field) is None else job[field] for field in NUMERIC_FIELDS
+            ])
+            category_codes.append([
+                categories[field].setdefault(job.get(field), len(categories[field]))
+                for field in CATEGORY_FIELDS
+            ])
+
+            offsets, lengths = [], []
+            for field in text_fields:
+                value = job.get(field)
+                if value is None:
+                    offsets.append(string_bytes)
+                    lengths.append(-1)
+                    continue
+                encoded = str(value).encode('utf-8')
+                strings.write(encoded)
+                offsets.append(string_bytes)
+                lengths.append(len(encoded))
+                string_bytes += len(encoded)
+            text_offsets.append(offsets)
+            text_lengths.append(lengths)
+
+            offsets, lengths = [], []
+            for field in SKILL_FIELDS:
+                codes = list(dict.fromkeys(
+                    skills.setdefault(normalize_skill(skill), len(skills))
+                    for skill in job.get(field) or [] if skill and skill.strip()
+                ))
+                offsets.append(len(skill_codes))
+                lengths.append(len(codes))
+                skill_codes.extend(codes)
+            skill_offsets.append(offsets)
+            skill_lengths.append(lengths)
+
+    rows = len(numeric)
+    np.save(tmp_path / 'numeric.npy', np.array(numeric, dtype=np.float64).reshape(rows, len(NUMERIC_FIELDS)))
+    np.save(tmp_path / 'categories.npy', np.array(category_codes, dtype=np.int32).reshape(rows, len(CATEGORY_FIELDS)))
+    np.save(tmp_path / 'text_offsets.npy', np.array(text_offsets, dtype=np.int64).reshape(rows, len(text_fields)))
+    np.save(tmp_path / 'text_lengths.npy', np.array(text_lengths, dtype=np.int32).reshape(rows, len(text_fields)))
+    np.save(tmp_path / 'skill_codes.npy', np.array(skill_codes, dtype=np.int32))
+    np.save(tmp_path / 'skill_offsets.npy', np.array(skill_offsets, dtype=np.int64).reshape(rows, len(SKILL_FIELDS)))
+    np.save(tmp_path / 'skill_lengths.npy', np.array(skill_lengths, dtype=np.int32).reshape(rows, len(SKILL_FIELDS)))
+
+    with open(tmp_path / 'vocabulary.json', 'w') as f:
+        json.dump({
+            'categories': {field: list(values) for field, values in categories.items()},
+            'skills': list(skills),
+        }, f)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'rows': rows,
+        'change_seq': seq,
+        'exported_at': datetime.now().isoformat(),
+        'source_db': str(db.db_path),
+        'filters': filters or {},
+        'text_fields': list(text_fields),
+        'category_fields': list(CATEGORY_FIELDS),
+        'numeric_fields': list(NUMERIC_FIELDS),
+        'skill_fields': list(SKILL_FIELDS),
+        'distinct_skills': len(skills),
+        'string_bytes': string_bytes,
+    }
+    with open(tmp_path / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the finished export in; readers holding the old mmaps keep working
+    old_path = out_path.with_name(f'{out_path.name}.old-{os.getpid()}')
+    if out_path.exists():
+        os.rename(out_path, old_path)
+    os.rename(tmp_path, out_path)
+    if old_path.exists():
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    manifest['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return manifest
+
+
+def _number(value: float):
+    if np.isnan(value):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class CatalogSnapshot:
+    """
+    Memory-mapped view of an exported catalog.
+
+    Opening only maps the files; rows are decoded when read. Exposes the
+    same count_jobs()/iter_jobs() calls as JobDatabase (source filters
+    only), so training code can take either.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        with open(self.path / 'manifest.json') as f:
+            self.manifest = json.load(f)
+        if self.manifest['format_version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog format {self.manifest['format_version']} in {path}")
+        with open(self.path / 'vocabulary.json') as f:
+            vocabulary = json.load(f)
+
+        self.categories: Dict[str, List] = vocabulary['categories']
+        self.skills: List[str] = vocabulary['skills']
+        self.text_fields: List[str] = self.manifest['text_fields']
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.path / f'{name}.npy', mmap_mode='r')
+
+        self.numeric = load('numeric')
+        self.category_codes = load('categories')
+        self.text_offsets = load('text_offsets')
+        self.text_lengths = load('text_lengths')
+        self.skill_codes = load('skill_codes')
+        self.skill_offsets = load('skill_offsets')
+        self.skill_lengths = load('skill_lengths')
+
+        self._strings_file = open(self.path / 'strings.bin', 'rb')
+        if self.manifest['string_bytes']:
+            self.strings = mmap.mmap(self._strings_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.strings = b''
+
+    def close(self):
+        if isinstance(self.strings, mmap.mmap):
+            self.strings.close()
+        self._strings_file.close()
+
+    def __len__(self) -> int:
+        return self.manifest['rows']
+
+    def column(self, field: str) -> np.ndarray:
+        """Numeric column (NaN = missing) or category code column, memory-mapped"""
+        if field in NUMERIC_FIELDS:
+            return self.numeric[:, NUMERIC_FIELDS.index(field)]
+        if field in CATEGORY_FIELDS:
+            return self.category_codes[:, CATEGORY_FIELDS.index(field)]
+        raise KeyError(field)
+
+    def job_skill_codes(self, row: int, field: str = 'required_skills') -> np.ndarray:
+        """Skill codes of one job (index into self.skills)"""
+        index = SKILL_FIELDS.index(field)
+        offset = self.skill_offsets[row, index]
+        return self.skill_codes[offset:offset + self.skill_lengths[row, index]]
+
+    def _text(self, row: int, index: int) -> Optional[str]:
+        length = self.text_lengths[row, index]
+        if length < 0:
+            return None
+        offset = self.text_offsets[row, index]
+        return self.strings[offset:offset + length].decode('utf-8')
+
+    def job(self, row: int) -> Dict:
+        """Job dict for a row, shaped like JobDatabase._row_to_job (skills normalized)"""
+        text = {field: self._text(row, i) for i, field in enumerate(self.text_fields)}
+        category = {
+            field: self.categories[field][self.category_codes[row, i]]
+            for i, field in enumerate(CATEGORY_FIELDS)
+        }
+        numeric = {field: _number(self.numeric[row, i]) for i, field in enumerate(NUMERIC_FIELDS)}
+
+        job = {
+            'id': text['id'],
+            'title': text['title'],
+            'company': text['company'],
+            'industry': category['industry'],
+            'city': category['city'],
+            'required_skills': [self.skills[code] for code in self.job_skill_codes(row, 'required_skills')],
+            'preferred_skills': [self.skills[code] for code in self.job_skill_codes(row, 'preferred_skills')],
+            'min_experience': numeric['min_experience'],
+            'max_experience': numeric['max_experience'],
+            'education_required': category['education_required'],
+            'salary_min': numeric['salary_min'],
+            'salary_max': numeric['salary_max'],
+            'posted_date': text['posted_date'],
+            'job_url': text['job_url'] or '',
+            'job_source': category['job_source'] or 'synthetic',
+        }
+        if 'description' in text:
+            job['description'] = text['description'] or ''
+        return job
+
+    def _rows(self, filters: Optional[Dict]) -> np.ndarray:
+        filters = filters or {}
+        sources = [value or 'synthetic' for value in self.categories['job_source']]
+        codes = self.column('job_source')
+        mask = np.ones(len(self), dtype=bool)
+        if filters.get('job_source'):
+            mask &= np.isin(codes, [i for i, s in enumerate(sources) if s == filters['job_source']])
+        if filters.get('exclude_source'):
+            mask &= ~np.isin(codes, [i for i, s in enumerate(sources) if s == filters['exclude_source']])
+        if filters.get('industry'):
+            mask &= np.isin(
+                self.column('industry'),
+                [i for i, v in enumerate(self.categories['industry']) if v == filters['industry']]
+            )
+        return np.flatnonzero(mask)
+
+    def count_jobs(self, filters: Optional[Dict] = None) -> int:
+        """Count jobs (supports job_source, exclude_source and industry filters)"""
+        return len(self._rows(filters))
+
+    def iter_jobs(
+        self,
+        filters: Optional[Dict] = None,
+        batch_size: int = 500,
+        include_description: bool = False
+    ) -> Iterator[Dict]:
+        """
+        Decode jobs one at a time (batch_size is accepted for JobDatabase compatibility).
+
+        Descriptions are present only if the export included them.
+        """
+        for row in self._rows(filters):
+            yield self.job(int(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the job catalog to memory-mappable columns')
+    parser.add_argument('--db', type=str, default='jobs.db', help='Path to the jobs database (default: jobs.db)')
+    parser.add_argument('--out', type=str, default='exports/catalog', help='Export directory (default: exports/catalog)')
+    parser.add_argument('--descriptions', action='store_true', help='Include job descriptions')
+    parser.add_argument('--real-only', action='store_true', help='Skip synthetic jobs')
+    parser.add_argument('--info', type=str, default=None, help='Open an existing export and print its manifest')
+    args = parser.parse_args()
+
+    if args.info:
+        started = time.perf_counter()
+        snapshot = CatalogSnapshot(args.info)
+        opened_ms = (time.perf_counter() - started) * 1000
+        print(json.dumps(snapshot.manifest, indent=2))
+        print(f"[OK] Opened {len(snapshot)} jobs in {opened_ms:.1f} ms")
+        snapshot.close()
+        return
+
+    db = JobDatabase(args.db)
+    filters = {'exclude_source': 'synthetic'} if args.real_only else None
+    manifest = export_catalog(db, args.out, filters=filters, include_description=args.descriptions)
+    print(f"[OK] Exported {manifest['rows']} jobs ({manifest['distinct_skills']} skills) "
+          f"to {args.out} in {manifest['duration_ms']} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,15 +3,23 @@ Training Data Generator & Database Manager
 Generates synthetic training data and manages job database
 """
 
+import sys
 import json
+import zlib
 import random
+import hashlib
 import sqlite3
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import uuid
 
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from migrations.runner import run_migrations
+
 
 # Sample data for generation
 COMPANIES_BY_INDUSTRY = {
@@ -382,12 +390,39 @@ def generate_training_data(
 class JobDatabase:
     """SQLite database for storing jobs and matches"""
     
-    def __init__(self, db_path: str = 'jobs.db'):
+    # Job fields written by upserts; their stored values make up the content hash
+    CONTENT_FIELDS = (
+        'title', 'company', 'industry', 'city', 'required_skills', 'preferred_skills',
+        'min_experience', 'max_experience', 'education_required', 'salary_min',
+        'salary_max', 'posted_date', 'description', 'job_url', 'job_source',
+    )
+    # Columns read by default: descriptions live compressed in job_descriptions
+    # and are only loaded on request (include_description=True / get_descriptions)
+    LIST_COLUMNS = ('id',) + tuple(field for field in CONTENT_FIELDS if field != 'description')
+    
+    def __init__(self, db_path: str = 'jobs.db', read_only: bool = False):
+        """
+        Args:
+            db_path: Path to SQLite database file
+            read_only: Open without creating or migrating anything (e.g. a
+                training snapshot); writes will fail
+        """
         self.db_path = db_path
-        self._init_db()
+        self.read_only = read_only
+        if not read_only:
+            self._init_db()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection whose rows can be read by column name"""
+        if self.read_only:
+            conn = sqlite3.connect(f'{Path(self.db_path).resolve().as_uri()}?mode=ro', uri=True)
+        else:
+            conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
     
     def _init_db(self):
-        """Initialize database tables"""
+        """Initialize database tables and apply pending migrations"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -447,120 +482,516 @@ class JobDatabase:
         
         conn.commit()
         conn.close()
+        
+        # Bring the schema up to date (a single PRAGMA read when current)
+        run_migrations(self.db_path)
     
-    def insert_job(self, job: Dict):
-        """Insert a job into the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT OR REPLACE INTO jobs
-            (id, title, company, industry, city, required_skills, preferred_skills,
-             min_experience, max_experience, education_required, salary_min,
-             salary_max, posted_date, description, job_url, job_source)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            job['id'], job['title'], job['company'], job['industry'], job['city'],
+    def _job_values(self, job: Dict) -> Tuple:
+        """Stored column values for a job, in CONTENT_FIELDS order"""
+        return (
+            job['title'], job['company'], job['industry'], job['city'],
             json.dumps(job['required_skills']), json.dumps(job.get('preferred_skills', [])),
             job['min_experience'], job['max_experience'], job['education_required'],
             job.get('salary_min'), job.get('salary_max'), job.get('posted_date'),
             job.get('description', ''),
             job.get('job_url', ''),
             job.get('job_source', 'synthetic')
-        ))
-
-        conn.commit()
+        )
+    
+    @staticmethod
+    def _content_hash(values: Tuple) -> str:
+        """SHA-256 over a job's stored values"""
+        payload = json.dumps(values, default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def insert_job(self, job: Dict) -> str:
+        """
+        Insert or update a job.
+        
+        Returns:
+            'inserted', 'updated' or 'unchanged'
+        """
+        counts = self.insert_jobs_bulk([job])
+        return next(status for status, count in counts.items() if count)
+    
+    def insert_jobs_bulk(self, jobs: List[Dict]) -> Dict[str, int]:
+        """
+        Upsert multiple jobs in a single transaction.
+        
+        Jobs whose content hash matches the stored row are skipped. Changed
+        jobs are updated in place (keeping their rowid and created_at) and
+        every insert or update is appended to the job_changes log.
+        
+        Returns:
+            Counts of 'inserted', 'updated' and 'unchanged' jobs
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not jobs:
+            return counts
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        now = datetime.now().isoformat()
+        assignments = ', '.join(f'{field} = ?' for field in self.CONTENT_FIELDS)
+        columns = ', '.join(self.CONTENT_FIELDS)
+        placeholders = ', '.join('?' for _ in self.CONTENT_FIELDS)
+        
+        description_index = self.CONTENT_FIELDS.index('description')
+        
+        try:
+            # Take the write lock before reading, so a concurrent writer cannot insert the same id in between
+            conn.execute('BEGIN IMMEDIATE')
+            for job in jobs:
+                values = self._job_values(job)
+                content_hash = self._content_hash(values)
+                description = values[description_index]
+                # The hash covers the description, but the jobs row does not hold it
+                values = values[:description_index] + (None,) + values[description_index + 1:]
+        
+                cursor.execute('SELECT content_hash FROM jobs WHERE id = ?', (job['id'],))
+                existing = cursor.fetchone()
+        
+                if existing and existing['content_hash'] == content_hash:
+                    counts['unchanged'] += 1
+                    continue
+        
+                op = 'update' if existing else 'insert'
+                cursor.execute(
+                    'INSERT INTO job_changes (job_id, op, changed_at) VALUES (?, ?, ?)',
+                    (job['id'], op, now)
+                )
+                seq = cursor.lastrowid
+        
+                if existing:
+                    cursor.execute(
+                        f'UPDATE jobs SET {assignments}, content_hash = ?, updated_at = ?, '
+                        f'change_seq = ? WHERE id = ?',
+                        values + (content_hash, now, seq, job['id'])
+                    )
+                    counts['updated'] += 1
+                else:
+                    cursor.execute(
+                        f'INSERT INTO jobs (id, {columns}, content_hash, updated_at, change_seq) '
+                        f'VALUES (?, {placeholders}, ?, ?, ?)',
+                        (job['id'],) + values + (content_hash, now, seq)
+                    )
+                    counts['inserted'] += 1
+        
+                cursor.execute(
+                    'INSERT OR REPLACE INTO job_descriptions (job_id, body) VALUES (?, ?)',
+                    (job['id'], self._compress(description))
+                )
+        
+            conn.commit()
+        finally:
+            # Closing without a commit rolls the transaction back and releases the write lock
+            conn.close()
+        
+        return counts
+    
+    @staticmethod
+    def _compress(text: Optional[str]) -> Optional[bytes]:
+        if not text:
+            return None
+        return sqlite3.Binary(zlib.compress(text.encode('utf-8')))
+    
+    def _select(self) -> str:
+        """Projected column list for job reads"""
+        return ', '.join(self.LIST_COLUMNS)
+    
+    def get_descriptions(self, job_ids: List[str]) -> Dict[str, str]:
+        """
+        Decompressed descriptions for the given jobs.
+        
+        Returns:
+            Dict of job id -> description (jobs without one are omitted)
+        """
+        descriptions = {}
+        if not job_ids:
+            return descriptions
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        ids = list(job_ids)
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in batch)
+            cursor.execute(
+                f'SELECT job_id, body FROM job_descriptions WHERE job_id IN ({placeholders})',
+                batch
+            )
+            for row in cursor.fetchall():
+                if row['body'] is not None:
+                    descriptions[row['job_id']] = zlib.decompress(row['body']).decode('utf-8')
+        
         conn.close()
+        
+        return descriptions
     
-    def insert_jobs_bulk(self, jobs: List[Dict]):
-        """Insert multiple jobs"""
+    def _with_descriptions(self, jobs: List[Dict]) -> List[Dict]:
+        descriptions = self.get_descriptions([job['id'] for job in jobs])
         for job in jobs:
-            self.insert_job(job)
+            job['description'] = descriptions.get(job['id'], '')
+        return jobs
+    
+    def get_change_seq(self) -> int:
+        """Latest change sequence number (0 if nothing has changed yet)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT MAX(seq) FROM job_changes')
+        seq = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        return seq or 0
+    
+    def get_changes_since(self, seq: int) -> Dict:
+        """
+        Get everything that changed after a given sequence number.
+        
+        Downstream caches keep the returned 'seq' and pass it back on the
+        next call to refresh incrementally instead of reloading all jobs.
+        
+        Returns:
+            Dict with 'seq' (latest sequence number), 'upserted' (current
+            job dicts, without descriptions, inserted or updated since seq),
+            'deleted' (ids of jobs removed since seq) and 'complete' (False
+            when log entries after seq were pruned, so deletes may be
+            missing and the caller should reload everything)
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT MIN(seq), MAX(seq) FROM job_changes')
+        oldest, latest = cursor.fetchone()
+        latest = latest or 0
+        
+        cursor.execute(
+            f'SELECT {self._select()} FROM jobs WHERE change_seq > ? AND change_seq <= ? ORDER BY change_seq',
+            (seq, latest)
+        )
+        upserted = [self._row_to_job(row) for row in cursor.fetchall()]
+        
+        cursor.execute('''
+            SELECT DISTINCT job_id FROM job_changes
+            WHERE seq > ? AND seq <= ? AND op = 'delete'
+              AND job_id NOT IN (SELECT id FROM jobs)
+        ''', (seq, latest))
+        deleted = [row[0] for row in cursor.fetchall()]
+        
+        conn.close()
+        
+        return {
+            'seq': latest,
+            'upserted': upserted,
+            'deleted': deleted,
+            'complete': oldest is None or seq >= oldest - 1,
+        }
     
-    def get_jobs_by_city(self, city: str) -> List[Dict]:
+    def get_jobs_by_city(self, city: str, include_description: bool = False) -> List[Dict]:
         """Get all jobs in a city using partial matching"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Use LIKE for partial matching (e.g., 'Makati' matches 'Makati City, Metro Manila')
-        cursor.execute('SELECT * FROM jobs WHERE city LIKE ?', (f'%{city}%',))
+        cursor.execute(f'SELECT {self._select()} FROM jobs WHERE city LIKE ?', (f'%{city}%',))
         rows = cursor.fetchall()
         
         conn.close()
         
-        return [self._row_to_job(row) for row in rows]
+        jobs = [self._row_to_job(row) for row in rows]
+        return self._with_descriptions(jobs) if include_description else jobs
     
-    def get_jobs_by_industry(self, industry: str, city: Optional[str] = None) -> List[Dict]:
+    def get_jobs_by_industry(
+        self,
+        industry: str,
+        city: Optional[str] = None,
+        include_description: bool = False
+    ) -> List[Dict]:
         """Get jobs by industry, optionally filtered by city (partial match)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         if city:
             # Use LIKE for partial city matching
-            cursor.execute('SELECT * FROM jobs WHERE industry = ? AND city LIKE ?', (industry, f'%{city}%'))
+            cursor.execute(
+                f'SELECT {self._select()} FROM jobs WHERE industry = ? AND city LIKE ?',
+                (industry, f'%{city}%')
+            )
         else:
-            cursor.execute('SELECT * FROM jobs WHERE industry = ?', (industry,))
+            cursor.execute(f'SELECT {self._select()} FROM jobs WHERE industry = ?', (industry,))
         
         rows = cursor.fetchall()
         conn.close()
         
-        return [self._row_to_job(row) for row in rows]
+        jobs = [self._row_to_job(row) for row in rows]
+        return self._with_descriptions(jobs) if include_description else jobs
     
-    def get_all_jobs(self, limit: int = 100) -> List[Dict]:
+    def get_all_jobs(self, limit: int = 100, include_description: bool = False) -> List[Dict]:
         """Get all jobs"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM jobs LIMIT ?', (limit,))
+        cursor.execute(f'SELECT {self._select()} FROM jobs LIMIT ?', (limit,))
         rows = cursor.fetchall()
         
         conn.close()
         
-        return [self._row_to_job(row) for row in rows]
+        jobs = [self._row_to_job(row) for row in rows]
+        return self._with_descriptions(jobs) if include_description else jobs
     
-    def _row_to_job(self, row) -> Dict:
+    def _build_filters(self, filters: Optional[Dict]) -> Tuple[List[str], List]:
+        """
+        Translate a filter dict into SQL WHERE clauses and parameters.
+        
+        Supported keys:
+            city: partial match (e.g., 'Makati' matches 'Makati City, Metro Manila')
+            industry: exact match
+            job_source: exact match
+            exclude_source: skip jobs from this source (NULL counts as 'synthetic')
+        """
+        clauses = []
+        params = []
+        filters = filters or {}
+        
+        if filters.get('city'):
+            clauses.append('city LIKE ?')
+            params.append(f"%{filters['city']}%")
+        if filters.get('industry'):
+            clauses.append('industry = ?')
+            params.append(filters['industry'])
+        if filters.get('job_source'):
+            clauses.append("COALESCE(job_source, 'synthetic') = ?")
+            params.append(filters['job_source'])
+        if filters.get('exclude_source'):
+            clauses.append("COALESCE(job_source, 'synthetic') != ?")
+            params.append(filters['exclude_source'])
+        
+        return clauses, params
+    
+    def count_jobs(self, filters: Optional[Dict] = None) -> int:
+        """Count jobs matching the filters without loading any rows"""
+        clauses, params = self._build_filters(filters)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute(f'SELECT COUNT(*) FROM jobs{where}', params)
+        count = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        return count
+    
+    def get_job_counts(self, group_by: Tuple[str, ...] = ('city', 'industry', 'job_source')) -> List[Dict]:
+        """
+        Live job counts from the job_counts aggregate table.
+        
+        Args:
+            group_by: Any of 'city', 'industry', 'job_source'
+        
+        Returns:
+            One dict per group with the grouping columns and 'count', largest first
+        """
+        columns = [column for column in group_by if column in ('city', 'industry', 'job_source')]
+        if not columns:
+            raise ValueError("group_by must include city, industry or job_source")
+        selected = ', '.join(columns)
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            f'SELECT {selected}, SUM(count) AS count FROM job_counts '
+            f'GROUP BY {selected} ORDER BY count DESC'
+        )
+        counts = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        
+        return counts
+    
+    def get_skill_counts(
+        self,
+        industry: Optional[str] = None,
+        city: Optional[str] = None,
+        job_source: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Most required skills, from the skill_counts aggregate table.
+        
+        Args:
+            industry: Restrict to one industry (all industries when None)
+            city: Restrict to one city, as listed by get_job_counts()
+            job_source: Restrict to one source
+            limit: Maximum number of skills
+        """
+        conditions = [
+            (column, value)
+            for column, value in (('industry', industry), ('city', city), ('job_source', job_source))
+            if value
+        ]
+        where = ' WHERE ' + ' AND '.join(f'{column} = ?' for column, _ in conditions) if conditions else ''
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            f'SELECT skill, SUM(count) AS count FROM skill_counts{where} '
+            f'GROUP BY skill ORDER BY count DESC LIMIT ?',
+            [value for _, value in conditions] + [limit]
+        )
+        counts = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        
+        return counts
+    
+    def get_jobs_page(
+        self,
+        filters: Optional[Dict] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        include_description: bool = False
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of jobs using keyset pagination on the primary key.
+        
+        Args:
+            filters: Optional filter dict (see _build_filters)
+            cursor: Job id to resume after (None for the first page)
+            limit: Maximum number of jobs per page
+            include_description: Also load each job's description
+        
+        Returns:
+            Tuple of (jobs, next_cursor). next_cursor is None on the last page.
+        """
+        clauses, params = self._build_filters(filters)
+        if cursor is not None:
+            clauses.append('id > ?')
+            params.append(cursor)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        conn = self._connect()
+        db_cursor = conn.cursor()
+        
+        db_cursor.execute(f'SELECT {self._select()} FROM jobs{where} ORDER BY id LIMIT ?', params + [limit])
+        rows = db_cursor.fetchall()
+        
+        conn.close()
+        
+        jobs = [self._row_to_job(row) for row in rows]
+        if include_description:
+            self._with_descriptions(jobs)
+        next_cursor = jobs[-1]['id'] if len(jobs) == limit else None
+        
+        return jobs, next_cursor
+    
+    def iter_jobs(
+        self,
+        filters: Optional[Dict] = None,
+        batch_size: int = 500,
+        include_description: bool = False
+    ) -> Iterator[Dict]:
+        """
+        Stream jobs matching the filters one batch at a time.
+        
+        Only a single batch is held in memory, so callers that walk the
+        whole table (training, export, admin stats) stay flat in memory.
+        """
+        cursor = None
+        while True:
+            jobs, cursor = self.get_jobs_page(
+                filters, cursor=cursor, limit=batch_size, include_description=include_description
+            )
+            yield from jobs
+            if cursor is None:
+                break
+    
+    def _row_to_job(self, row: sqlite3.Row) -> Dict:
         """Convert database row to job dict"""
         return {
-            'id': row[0],
-            'title': row[1],
-            'company': row[2],
-            'industry': row[3],
-            'city': row[4],
-            'required_skills': json.loads(row[5]) if row[5] else [],
-            'preferred_skills': json.loads(row[6]) if row[6] else [],
-            'min_experience': row[7],
-            'max_experience': row[8],
-            'education_required': row[9],
-            'salary_min': row[10],
-            'salary_max': row[11],
-            'posted_date': row[12],
-            'description': row[13],
-            'job_url': row[14] if len(row) > 14 else '',
-            'job_source': row[15] if len(row) > 15 else 'synthetic',
+            'id': row['id'],
+            'title': row['title'],
+            'company': row['company'],
+            'industry': row['industry'],
+            'city': row['city'],
+            'required_skills': json.loads(row['required_skills']) if row['required_skills'] else [],
+            'preferred_skills': json.loads(row['preferred_skills']) if row['preferred_skills'] else [],
+            'min_experience': row['min_experience'],
+            'max_experience': row['max_experience'],
+            'education_required': row['education_required'],
+            'salary_min': row['salary_min'],
+            'salary_max': row['salary_max'],
+            'posted_date': row['posted_date'],
+            'job_url': row['job_url'] or '',
+            'job_source': row['job_source'] or 'synthetic',
         }
     
     def save_match(self, candidate_id: str, match_result: Dict):
         """Save a match result"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.save_matches([(candidate_id, match_result)])
+    
+    def save_matches(self, matches: List[Tuple[str, Dict]]):
+        """Save (candidate_id, match_result) pairs in a single transaction"""
+        if not matches:
+            return
         
-        cursor.execute('''
-            INSERT INTO matches 
-            (candidate_id, job_id, confidence, skill_match_score, 
-             experience_match_score, matched_skills, missing_skills)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            candidate_id,
-            match_result['job_id'],
-            match_result['confidence'],
-            match_result['skill_match_score'],
-            match_result['experience_match_score'],
-            json.dumps(match_result['matched_skills']),
-            json.dumps(match_result['missing_skills']),
-        ))
+        rows = [
+            (
+                candidate_id,
+                match_result['job_id'],
+                match_result['confidence'],
+                match_result['skill_match_score'],
+                match_result['experience_match_score'],
+                json.dumps(match_result['matched_skills']),
+                json.dumps(match_result['missing_skills']),
+            )
+            for candidate_id, match_result in matches
+        ]
         
-        conn.commit()
-        conn.close()
+        conn = self._connect()
+        try:
+            conn.cursor().executemany('''
+                INSERT INTO matches 
+                (candidate_id, job_id, confidence, skill_match_score, 
+                 experience_match_score, matched_skills, missing_skills)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def save_feedback_events(self, events: List[Dict]):
+        """Save match feedback events in a single transaction"""
+        if not events:
+            return
+        
+        rows = [
+            (
+                event['job_id'],
+                event['candidate_id'],
+                int(event['was_successful']),
+                event.get('feedback_type', 'application'),
+                event.get('timestamp', datetime.now().isoformat()),
+            )
+            for event in events
+        ]
+        
+        conn = self._connect()
+        try:
+            conn.cursor().executemany('''
+                INSERT INTO feedback_events
+                (job_id, candidate_id, was_successful, feedback_type, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+        finally:
+            conn.close()
 
 
 def populate_sample_database(db_path: str = 'jobs.db', num_jobs: int = 500):
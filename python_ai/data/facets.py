@@ -0,0 +1,250 @@
+"""
+Faceted Job Filters
+Per-value bitmaps for categorical facets and sorted arrays for numeric
+ranges, so any filter combination is a handful of vectorised ANDs.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config.settings import settings
+
+# Categorical facets, each also usable as a filter key
+FACETS = ('city', 'region', 'industry', 'job_source', 'education_required')
+# Numeric columns answered by binary search -> job field they come from
+RANGES = {
+    'min_experience': 'min_experience',
+    'salary_min': 'salary_min',
+    'salary_max': 'salary_max',
+}
+# Value indexed when a job leaves a range field empty; missing experience means none
+# required, as in ColumnarJobStore and JobMatcher, while a missing salary stays unknown (NaN)
+RANGE_DEFAULTS = {'min_experience': 0}
+
+
+def region_for(city: Optional[str]) -> str:
+    """
+    Region of a job location.
+
+    Known cities map through settings.CITY_REGIONS (matched anywhere in the
+    location, so 'Makati City, Metro Manila' works); otherwise the last
+    comma-separated part of the location is used.
+    """
+    if not city:
+        return 'Other'
+    lowered = city.lower()
+    for known, region in settings.CITY_REGIONS.items():
+        if known.lower() in lowered:
+            return region
+    if ',' in city:
+        return city.rsplit(',', 1)[1].strip() or 'Other'
+    return 'Other'
+
+
+def _facet_values(job: Dict) -> Dict[str, Optional[str]]:
+    return {
+        'city': job.get('city'),
+        'region': region_for(job.get('city')),
+        'industry': job.get('industry'),
+        'job_source': job.get('job_source') or 'synthetic',
+        'education_required': job.get('education_required'),
+    }
+
+
+def _as_list(value) -> List:
+    if isinstance(value, (list, tuple, set)):
+        return [v for v in value if v]
+    return [value]
+
+
+class FacetIndex:
+    """
+    Bitmap and sorted-array index over job slots.
+
+    Each categorical facet keeps one boolean array per distinct value. Range
+    facets keep their column plus a lazily rebuilt argsort, answered with
+    np.searchsorted. Slots are the ColumnarJobStore's slots.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {facet: {} for facet in FACETS}
+        # Each slot's value per facet, as an index into values[facet] (-1 = not indexed)
+        self.values: Dict[str, List[Optional[str]]] = {facet: [] for facet in FACETS}
+        self.value_codes: Dict[str, Dict[Optional[str], int]] = {facet: {} for facet in FACETS}
+        self.slot_codes = {facet: np.full(capacity, -1, dtype=np.int32) for facet in FACETS}
+        self.range_values = {name: np.full(capacity, np.nan) for name in RANGES}
+        self._sorted: Dict[str, Optional[tuple]] = {name: None for name in RANGES}
+
+    def grow(self, capacity: int):
+        """Extend every bitmap and range column to a new slot capacity"""
+        def resized(column: np.ndarray, fill) -> np.ndarray:
+            grown = np.full(capacity, fill, dtype=column.dtype)
+            grown[:len(column)] = column
+            return grown
+
+        for facet in FACETS:
+            for value, bitmap in self.bitmaps[facet].items():
+                self.bitmaps[facet][value] = resized(bitmap, False)
+            self.slot_codes[facet] = resized(self.slot_codes[facet], -1)
+        for name in RANGES:
+            self.range_values[name] = resized(self.range_values[name], np.nan)
+        self.capacity = capacity
+
+    def put(self, slot: int, job: Dict):
+        """Index a job stored in slot (replacing whatever was there)"""
+        for facet, value in _facet_values(job).items():
+            previous = self.slot_codes[facet][slot]
+            if previous >= 0:
+                self.bitmaps[facet][self.values[facet][previous]][slot] = False
+
+            code = self.value_codes[facet].get(value)
+            if code is None:
+                code = self.value_codes[facet][value] = len(self.values[facet])
+                self.values[facet].append(value)
+                self.bitmaps[facet][value] = np.zeros(self.capacity, dtype=bool)
+            self.bitmaps[facet][value][slot] = True
+            self.slot_codes[facet][slot] = code
+
+        for name, field in RANGES.items():
+            value = job.get(field)
+            self.range_values[name][slot] = RANGE_DEFAULTS.get(name, np.nan) if value is None else value
+            self._sorted[name] = None
+
+    def remove(self, slot: int):
+        """Drop a slot from every bitmap and range"""
+        for facet in FACETS:
+            previous = self.slot_codes[facet][slot]
+            if previous >= 0:
+                self.bitmaps[facet][self.values[facet][previous]][slot] = False
+                self.slot_codes[facet][slot] = -1
+        for name in RANGES:
+            self.range_values[name][slot] = np.nan
+            self._sorted[name] = None
+
+    def save(self, path: Path, capacity: int) -> Dict:
+        """
+        Write bitmaps, slot codes and range columns to .npy files in path,
+        resized to capacity slots (slots past the store's size are unused).
+
+        Returns:
+            The value lists open() needs to read them back
+        """
+        kept = min(capacity, self.capacity)
+        for facet in FACETS:
+            values = self.values[facet]
+            bitmaps = np.zeros((len(values), capacity), dtype=bool)
+            for code, value in enumerate(values):
+                bitmaps[code, :kept] = self.bitmaps[facet][value][:kept]
+            codes = np.full(capacity, -1, dtype=np.int32)
+            codes[:kept] = self.slot_codes[facet][:kept]
+            np.save(path / f'facet_{facet}_bitmaps.npy', bitmaps)
+            np.save(path / f'facet_{facet}_codes.npy', codes)
+        for name in RANGES:
+            column = np.full(capacity, np.nan)
+            column[:kept] = self.range_values[name][:kept]
+            np.save(path / f'range_{name}.npy', column)
+        return {facet: list(self.values[facet]) for facet in FACETS}
+
+    @classmethod
+    def open(cls, path: Path, values: Dict[str, List], capacity: int) -> 'FacetIndex':
+        """Index over files written by save(), mapped copy-on-write"""
+        index = cls(0)
+        index.capacity = capacity
+        for facet in FACETS:
+            bitmaps = np.load(path / f'facet_{facet}_bitmaps.npy', mmap_mode='c')
+            index.values[facet] = list(values[facet])
+            index.value_codes[facet] = {value: code for code, value in enumerate(values[facet])}
+            index.bitmaps[facet] = {value: bitmaps[code] for code, value in enumerate(values[facet])}
+            index.slot_codes[facet] = np.load(path / f'facet_{facet}_codes.npy', mmap_mode='c')
+        for name in RANGES:
+            index.range_values[name] = np.load(path / f'range_{name}.npy', mmap_mode='c')
+        return index
+
+    def _sorted_range(self, name: str):
+        """(sorted values, slots in that order), excluding slots with no value"""
+        if self._sorted[name] is None:
+            column = self.range_values[name]
+            present = np.flatnonzero(~np.isnan(column))
+            order = present[np.argsort(column[present], kind='stable')]
+            self._sorted[name] = (column[order], order)
+        return self._sorted[name]
+
+    def _range_mask(self, name: str, low: Optional[float] = None, high: Optional[float] = None) -> np.ndarray:
+        """Slots whose value lies in [low, high], found by binary search"""
+        values, order = self._sorted_range(name)
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        end = len(values) if high is None else np.searchsorted(values, high, side='right')
+        mask = np.zeros(self.capacity, dtype=bool)
+        mask[order[start:end]] = True
+        return mask
+
+    def _values_matching(self, facet: str, wanted: Iterable) -> List[str]:
+        """Indexed values selected by a filter; city matches partially and case-insensitively"""
+        wanted = [w for w in wanted if w]
+        if facet == 'city':
+            needles = [w.lower() for w in wanted]
+            return [
+                value for value in self.bitmaps[facet]
+                if value is not None and any(n in value.lower() for n in needles)
+            ]
+        return [w for w in wanted if w in self.bitmaps[facet]]
+
+    def _facet_mask(self, facet: str, wanted) -> np.ndarray:
+        mask = np.zeros(self.capacity, dtype=bool)
+        for value in self._values_matching(facet, _as_list(wanted)):
+            mask |= self.bitmaps[facet][value]
+        return mask
+
+    def mask(self, filters: Optional[Dict], base: np.ndarray, skip: Optional[str] = None) -> np.ndarray:
+        """
+        AND a filter dict into a base mask (normally the store's live slots).
+
+        Supported keys:
+            city, region, industry, job_source, education_required: a value or
+                list of values (any of them matches); city matches partially
+            exclude_source: skip jobs from this source
+            experience_years: jobs whose min_experience is at most this
+            min_salary: jobs whose salary_max is at least this
+            max_salary: jobs whose salary_min is at most this
+        skip leaves one facet out, which is how per-facet counts are computed.
+        """
+        filters = filters or {}
+        size = len(base)
+        mask = base.copy()
+
+        for facet in FACETS:
+            if facet != skip and filters.get(facet):
+                mask &= self._facet_mask(facet, filters[facet])[:size]
+
+        if filters.get('exclude_source'):
+            mask &= ~self._facet_mask('job_source', filters['exclude_source'])[:size]
+        if filters.get('experience_years') is not None:
+            mask &= self._range_mask('min_experience', high=filters['experience_years'])[:size]
+        if filters.get('min_salary') is not None:
+            mask &= self._range_mask('salary_max', low=filters['min_salary'])[:size]
+        if filters.get('max_salary') is not None:
+            mask &= self._range_mask('salary_min', high=filters['max_salary'])[:size]
+
+        return mask
+
+    def counts(self, filters: Optional[Dict], base: np.ndarray) -> Dict[str, Dict[str, int]]:
+        """
+        Per-value job counts for every facet.
+
+        Each facet is counted with all the other filters applied but not its
+        own, so the UI can show how many jobs each alternative value would give.
+        """
+        size = len(base)
+        result = {}
+        for facet in FACETS:
+            others = self.mask(filters, base, skip=facet)
+            counts = {}
+            for value, bitmap in self.bitmaps[facet].items():
+                count = int(np.count_nonzero(others & bitmap[:size]))
+                if count:
+                    counts[value if value is not None else 'Unknown'] = count
+            result[facet] = dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+        return result
@@ -0,0 +1,521 @@
+"""
+Columnar Job Store
+In-process snapshot of the jobs table held as NumPy columns, kept current
+from JobDatabase's change feed so matching and filtering skip SQLite.
+"""
+
+import os
+import json
+import mmap
+import shutil
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from data.data_generator import JobDatabase
+from data.facets import FacetIndex
+
+# Text columns, stored as (offset, length) pairs into one shared UTF-8 buffer
+TEXT_FIELDS = ('id', 'title', 'company', 'posted_date', 'job_url')
+# Low-cardinality columns, stored as interned integer codes
+CATEGORY_FIELDS = ('city', 'industry', 'job_source', 'education_required')
+SKILL_FIELDS = ('required_skills', 'preferred_skills')
+
+INITIAL_CAPACITY = 1024
+IMAGE_FORMAT_VERSION = 1
+# Free slots written into a saved image, so jobs added after mapping it rarely force a private resize
+IMAGE_HEADROOM = 0.25
+
+# Slot columns saved in a store image, by attribute name
+IMAGE_COLUMNS = (
+    'alive', 'category_codes', 'experience', 'salary',
+    'text_offsets', 'text_lengths', 'skill_offsets', 'skill_lengths',
+)
+
+
+class _Interner:
+    """Maps repeated values (cities, industries, skills...) to dense integer codes"""
+
+    def __init__(self):
+        self.codes: Dict = {}
+        self.values: List = []
+
+    def code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class _MappedPool:
+    """
+    Append-only pool whose existing contents are a read-only mapping.
+
+    Reads below the mapped length come from the shared file; appends go to
+    an in-process tail. Stands in for the store's text buffer (bytes) and
+    skill pool (int codes).
+    """
+
+    def __init__(self, base, tail):
+        self.base = base
+        self.tail = tail
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.tail)
+
+    def __iadd__(self, data):
+        self.tail += data
+        return self
+
+    def extend(self, values):
+        self.tail.extend(values)
+
+    def __getitem__(self, index: slice):
+        split = len(self.base)
+        start, stop = index.start or 0, index.stop
+        if stop <= split:
+            return self.base[start:stop]
+        if start >= split:
+            return self.tail[start - split:stop - split]
+        head, rest = self.base[start:split], self.tail[:stop - split]
+        return bytes(head) + bytes(rest) if isinstance(self.tail, bytearray) else list(head) + list(rest)
+
+
+def _number(value: float):
+    """Column value back to the Python number the database returned"""
+    if np.isnan(value):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class ColumnarJobStore:
+    """
+    Jobs as parallel NumPy arrays indexed by slot.
+
+    Updates overwrite a job's slot in place and deletes clear its 'alive'
+    flag; text and skill lists are appended to shared pools, so replaced
+    values leave garbage that compact() reclaims once it outweighs live data.
+
+    refresh() pulls get_changes_since() and may run on a worker thread while
+    requests read; a lock keeps each read consistent. A second lock
+    serializes refreshes and loads, so a batch read from the database is
+    applied before the next one is read and seq only moves forward.
+    """
+
+    def __init__(self, db: JobDatabase):
+        self.db = db
+        self.seq = 0
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.RLock()
+        self._stats = {'refreshes': 0, 'last_refresh_ms': 0.0, 'last_refresh_changes': 0, 'compactions': 0}
+        self._reset()
+
+    def _reset(self, capacity: int = INITIAL_CAPACITY):
+        self.size = 0
+        self.slots: Dict[str, int] = {}
+        self.categories = {field: _Interner() for field in CATEGORY_FIELDS}
+        self.skills = _Interner()
+
+        self.text_buffer = bytearray()
+        self.skill_pool = array('i')
+
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.category_codes = np.zeros((capacity, len(CATEGORY_FIELDS)), dtype=np.int32)
+        self.experience = np.zeros((capacity, 2), dtype=np.float32)  # min, max
+        self.salary = np.full((capacity, 2), np.nan, dtype=np.float64)  # min, max
+        self.text_offsets = np.zeros((capacity, len(TEXT_FIELDS)), dtype=np.int64)
+        self.text_lengths = np.full((capacity, len(TEXT_FIELDS)), -1, dtype=np.int32)  # -1 = NULL
+        self.skill_offsets = np.zeros((capacity, len(SKILL_FIELDS)), dtype=np.int64)
+        self.skill_lengths = np.zeros((capacity, len(SKILL_FIELDS)), dtype=np.int32)
+
+        self.facets = FacetIndex(capacity)
+        self._id_order: Optional[Tuple[List[str], np.ndarray]] = None
+
+    @property
+    def capacity(self) -> int:
+        return len(self.alive)
+
+    def _grow(self):
+        capacity = self.capacity * 2
+
+        def resized(column: np.ndarray, fill) -> np.ndarray:
+            grown = np.full((capacity,) + column.shape[1:], fill, dtype=column.dtype)
+            grown[:len(column)] = column
+            return grown
+
+        self.alive = resized(self.alive, False)
+        self.category_codes = resized(self.category_codes, 0)
+        self.experience = resized(self.experience, 0)
+        self.salary = resized(self.salary, np.nan)
+        self.text_offsets = resized(self.text_offsets, 0)
+        self.text_lengths = resized(self.text_lengths, -1)
+        self.skill_offsets = resized(self.skill_offsets, 0)
+        self.skill_lengths = resized(self.skill_lengths, 0)
+        self.facets.grow(capacity)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _put(self, job: Dict) -> int:
+        slot = self.slots.get(job['id'])
+        if slot is None:
+            if self.size == self.capacity:
+                self._grow()
+            slot = self.size
+            self.size += 1
+            self.slots[job['id']] = slot
+            self._id_order = None
+
+        self.alive[slot] = True
+
+        for i, field in enumerate(CATEGORY_FIELDS):
+            self.category_codes[slot, i] = self.categories[field].code(job.get(field))
+
+        self.experience[slot] = (job.get('min_experience') or 0, job.get('max_experience') or 0)
+        self.salary[slot] = (
+            np.nan if job.get('salary_min') is None else job['salary_min'],
+            np.nan if job.get('salary_max') is None else job['salary_max'],
+        )
+
+        for i, field in enumerate(TEXT_FIELDS):
+            value = job.get(field)
+            if value is None:
+                self.text_lengths[slot, i] = -1
+                continue
+            encoded = str(value).encode('utf-8')
+            self.text_offsets[slot, i] = len(self.text_buffer)
+            self.text_lengths[slot, i] = len(encoded)
+            self.text_buffer += encoded
+
+        for i, field in enumerate(SKILL_FIELDS):
+            codes = [self.skills.code(skill) for skill in job.get(field) or []]
+            self.skill_offsets[slot, i] = len(self.skill_pool)
+            self.skill_lengths[slot, i] = len(codes)
+            self.skill_pool.extend(codes)
+
+        self.facets.put(slot, job)
+        return slot
+
+    def _remove(self, job_id: str):
+        slot = self.slots.pop(job_id, None)
+        if slot is not None:
+            self.alive[slot] = False
+            self.text_lengths[slot] = -1
+            self.skill_lengths[slot] = 0
+            self.facets.remove(slot)
+            self._id_order = None
+
+    def _garbage_ratio(self) -> float:
+        live = self.alive[:self.size]
+        used_text = int(self.text_lengths[:self.size][live].clip(min=0).sum())
+        used_skills = int(self.skill_lengths[:self.size][live].sum())
+        used = used_text + used_skills * 4
+        total = len(self.text_buffer) + len(self.skill_pool) * 4
+        return 1 - used / total if total else 0.0
+
+    def compact(self):
+        """Rebuild columns and pools from live jobs only"""
+        with self._lock:
+            jobs = [self._materialize(slot) for slot in self._live_slots()]
+            capacity = INITIAL_CAPACITY
+            while capacity < len(jobs):
+                capacity *= 2
+            self._reset(capacity)
+            for job in jobs:
+                self._put(job)
+            self._stats['compactions'] += 1
+
+    def load(self) -> int:
+        """
+        Rebuild the snapshot from a full scan of the jobs table.
+
+        Returns:
+            Number of jobs loaded
+        """
+        with self._refresh_lock:
+            # Take the sequence first: changes racing the scan are re-applied by the next refresh
+            seq = self.db.get_change_seq()
+            jobs = list(self.db.iter_jobs())
+
+            with self._lock:
+                capacity = INITIAL_CAPACITY
+                while capacity < len(jobs):
+                    capacity *= 2
+                self._reset(capacity)
+                for job in jobs:
+                    self._put(job)
+                self.seq = seq
+
+        return len(jobs)
+
+    def save_image(self, path: str) -> Dict:
+        """
+        Write the store to a directory that other processes can map with open_image().
+
+        Columns are written with free slots at the end. The directory is
+        built alongside path and renamed into place when complete.
+
+        Returns:
+            The image manifest
+        """
+        target = Path(path)
+        tmp = target.with_name(f'{target.name}.tmp-{os.getpid()}')
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+
+        with self._lock:
+            capacity = max(INITIAL_CAPACITY, int(self.size * (1 + IMAGE_HEADROOM)))
+            for name in IMAGE_COLUMNS:
+                column = getattr(self, name)
+                padded = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+                padded[:min(len(column), capacity)] = column[:capacity]
+                if name == 'salary':
+                    padded[self.size:] = np.nan
+                elif name == 'text_lengths':
+                    padded[self.size:] = -1
+                np.save(tmp / f'{name}.npy', padded)
+
+            with open(tmp / 'text.bin', 'wb') as f:
+                f.write(self.text_buffer[0:len(self.text_buffer)])
+            np.save(tmp / 'skill_pool.npy', np.asarray(self.skill_pool[0:len(self.skill_pool)], dtype=np.int32))
+
+            facet_values = self.facets.save(tmp, capacity)
+
+            manifest = {
+                'format_version': IMAGE_FORMAT_VERSION,
+                'seq': self.seq,
+                'size': self.size,
+                'capacity': capacity,
+                'jobs': len(self.slots),
+                'categories': {field: self.categories[field].values for field in CATEGORY_FIELDS},
+                'skills': self.skills.values,
+                'facet_values': facet_values,
+            }
+        with open(tmp / 'manifest.json', 'w') as f:
+            json.dump(manifest, f)
+
+        if target.exists():
+            shutil.rmtree(target)
+        os.rename(tmp, target)
+        return manifest
+
+    @classmethod
+    def open_image(cls, db: JobDatabase, path: str) -> 'ColumnarJobStore':
+        """
+        Store backed by an image written by save_image(), mapped copy-on-write.
+
+        Pages stay shared with every other process mapping the same image
+        until this process writes to them. Call refresh() afterwards to catch
+        up on changes made since the image was saved.
+        """
+        path = Path(path)
+        with open(path / 'manifest.json') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != IMAGE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported job store image format: {manifest.get('format_version')}")
+
+        store = cls(db)
+        with store._lock:
+            store._reset(capacity=0)
+            for name in IMAGE_COLUMNS:
+                setattr(store, name, np.load(path / f'{name}.npy', mmap_mode='c'))
+            store.size = manifest['size']
+            store.seq = manifest['seq']
+
+            for field in CATEGORY_FIELDS:
+                for value in manifest['categories'][field]:
+                    store.categories[field].code(value)
+            for skill in manifest['skills']:
+                store.skills.code(skill)
+
+            text_base = b''
+            if os.path.getsize(path / 'text.bin'):
+                with open(path / 'text.bin', 'rb') as f:
+                    text_base = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            store.text_buffer = _MappedPool(text_base, bytearray())
+            store.skill_pool = _MappedPool(np.load(path / 'skill_pool.npy', mmap_mode='r'), array('i'))
+            store.facets = FacetIndex.open(path, manifest['facet_values'], manifest['capacity'])
+
+            id_index = TEXT_FIELDS.index('id')
+            for slot in np.flatnonzero(store.alive[:store.size]):
+                store.slots[store._text(slot, id_index)] = int(slot)
+
+        return store
+
+    def apply_changes(self, upserted: List[Dict], deleted: List[str], seq: Optional[int] = None):
+        """Apply upserted jobs and deleted ids, advancing to seq if given (seq never goes back)"""
+        with self._lock:
+            for job in upserted:
+                self._put(job)
+            for job_id in deleted:
+                self._remove(job_id)
+            if seq is not None:
+                self.seq = max(self.seq, seq)
+            if (upserted or deleted) and self._garbage_ratio() > 0.5:
+                self.compact()
+
+    def refresh(self) -> int:
+        """
+        Pull changes made since the last refresh from the database.
+
+        Returns:
+            Number of jobs upserted or deleted (jobs loaded, if the change
+            log no longer reaches back to this store's sequence)
+        """
+        started = time.perf_counter()
+        with self._refresh_lock:
+            changes = self.db.get_changes_since(self.seq)
+            if changes['complete']:
+                self.apply_changes(changes['upserted'], changes['deleted'], changes['seq'])
+                applied = len(changes['upserted']) + len(changes['deleted'])
+            else:
+                # The change log was pruned past this store's sequence; deletes since then are unknown
+                applied = self.load()
+
+        self._stats['refreshes'] += 1
+        self._stats['last_refresh_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        self._stats['last_refresh_changes'] = applied
+        return applied
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _text(self, slot: int, index: int) -> Optional[str]:
+        length = self.text_lengths[slot, index]
+        if length < 0:
+            return None
+        offset = self.text_offsets[slot, index]
+        return self.text_buffer[offset:offset + length].decode('utf-8')
+
+    def _skill_list(self, slot: int, index: int) -> List[str]:
+        offset = self.skill_offsets[slot, index]
+        codes = self.skill_pool[offset:offset + self.skill_lengths[slot, index]]
+        return [self.skills.values[code] for code in codes]
+
+    def _materialize(self, slot: int) -> Dict:
+        """Job dict for a slot, in the same shape as JobDatabase._row_to_job (no description)"""
+        text = {field: self._text(slot, i) for i, field in enumerate(TEXT_FIELDS)}
+        category = {
+            field: self.categories[field].values[self.category_codes[slot, i]]
+            for i, field in enumerate(CATEGORY_FIELDS)
+        }
+        return {
+            'id': text['id'],
+            'title': text['title'],
+            'company': text['company'],
+            'industry': category['industry'],
+            'city': category['city'],
+            'required_skills': self._skill_list(slot, 0),
+            'preferred_skills': self._skill_list(slot, 1),
+            'min_experience': _number(self.experience[slot, 0]),
+            'max_experience': _number(self.experience[slot, 1]),
+            'education_required': category['education_required'],
+            'salary_min': _number(self.salary[slot, 0]),
+            'salary_max': _number(self.salary[slot, 1]),
+            'posted_date': text['posted_date'],
+            'job_url': text['job_url'] or '',
+            'job_source': category['job_source'] or 'synthetic',
+        }
+
+    def _live_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.alive[:self.size])
+
+    def _mask(self, filters: Optional[Dict]) -> np.ndarray:
+        """Boolean mask over slots for a filter dict (see FacetIndex.mask for keys)"""
+        return self.facets.mask(filters, self.alive[:self.size])
+
+    def get_jobs(self, filters: Optional[Dict] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Jobs matching filters, in ingest order"""
+        with self._lock:
+            slots = np.flatnonzero(self._mask(filters))
+            if limit is not None:
+                slots = slots[:limit]
+            return [self._materialize(slot) for slot in slots]
+
+    def get_jobs_page(
+        self,
+        filters: Optional[Dict] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of jobs ordered by id, like JobDatabase.get_jobs_page.
+
+        Returns:
+            (jobs, next_cursor); next_cursor is None on the last page
+        """
+        with self._lock:
+            if self._id_order is None:
+                ordered = sorted(self.slots.items())
+                self._id_order = (
+                    [job_id for job_id, _ in ordered],
+                    np.array([slot for _, slot in ordered], dtype=np.int64)
+                )
+            ids, order = self._id_order
+
+            start = bisect_right(ids, cursor) if cursor else 0
+            candidates = order[start:]
+            slots = candidates[self._mask(filters)[candidates]][:limit]
+            jobs = [self._materialize(slot) for slot in slots]
+
+        next_cursor = jobs[-1]['id'] if len(jobs) == limit else None
+        return jobs, next_cursor
+
+    def facet_counts(self, filters: Optional[Dict] = None) -> Dict[str, Dict[str, int]]:
+        """Per-value job counts for every facet under the other active filters"""
+        with self._lock:
+            return self.facets.counts(filters, self.alive[:self.size])
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Single job by id"""
+        with self._lock:
+            slot = self.slots.get(job_id)
+            return self._materialize(slot) if slot is not None else None
+
+    def count(self, filters: Optional[Dict] = None) -> int:
+        """Number of jobs matching filters"""
+        with self._lock:
+            return int(self._mask(filters).sum())
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def stats(self) -> Dict:
+        """Snapshot size, memory use and refresh timings"""
+        with self._lock:
+            column_bytes = sum(
+                column.nbytes for column in (
+                    self.alive, self.category_codes, self.experience, self.salary,
+                    self.text_offsets, self.text_lengths, self.skill_offsets, self.skill_lengths
+                )
+            )
+            return {
+                'jobs': len(self.slots),
+                'slots': self.size,
+                'capacity': self.capacity,
+                'seq': self.seq,
+                'column_bytes': column_bytes,
+                'text_bytes': len(self.text_buffer),
+                'skill_pool_entries': len(self.skill_pool),
+                'distinct_skills': len(self.skills),
+                'distinct': {field: len(self.categories[field]) for field in CATEGORY_FIELDS},
+                'facet_bytes': sum(
+                    bitmap.nbytes for bitmaps in self.facets.bitmaps.values() for bitmap in bitmaps.values()
+                ),
+                'garbage_ratio': round(self._garbage_ratio(), 3),
+                **self._stats,
+            }
@@ -0,0 +1,129 @@
+"""
+Match Result Cache
+LRU + TTL cache of /match responses, keyed by a canonical hash of the
+candidate profile and filters, and tagged with the catalog/model version
+they were computed against.
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+def _norm_text(value) -> str:
+    return ' '.join(str(value).split()).lower()
+
+
+def normalize_profile(profile: Dict, filters: Optional[Dict] = None) -> Dict:
+    """
+    Canonical form of a candidate profile plus filters.
+
+    Skills and industries are case- and order-insensitive, education entries
+    are order-insensitive, and filters set to None are dropped, so profiles
+    that would score identically normalize identically.
+    """
+    education = [
+        {key: _norm_text(value) for key, value in entry.items() if value not in (None, '')}
+        for entry in profile.get('education') or []
+        if isinstance(entry, dict)
+    ]
+    return {
+        'skills': sorted({_norm_text(s) for s in profile.get('skills') or [] if str(s).strip()}),
+        'experience_years': round(float(profile.get('experience_years') or 0), 2),
+        'education': sorted(education, key=lambda entry: json.dumps(entry, sort_keys=True)),
+        'industries': sorted({_norm_text(i) for i in profile.get('industries') or [] if str(i).strip()}),
+        'filters': {key: value for key, value in sorted((filters or {}).items()) if value is not None},
+    }
+
+
+def profile_key(profile: Dict, filters: Optional[Dict] = None) -> str:
+    """SHA-256 of the normalized profile and filters"""
+    canonical = json.dumps(normalize_profile(profile, filters), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class MatchCache:
+    """
+    Bounded LRU cache with per-entry expiry.
+
+    Every entry remembers the version it was computed against (for /match,
+    the job store's change sequence and the matcher's model version). A
+    lookup with a different version is a miss and drops the entry, so
+    ingesting jobs or retraining invalidates results without a sweep.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        """
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl_seconds: Seconds an entry stays valid; 0 disables expiry
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, Tuple[Hashable, float, Dict]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'expired': 0,
+            'evictions': 0,
+        }
+
+    def get(self, key: str, version: Hashable) -> Optional[Dict]:
+        """Cached value for key at version, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            entry_version, stored_at, value = entry
+            if entry_version != version:
+                del self._entries[key]
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                return None
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def put(self, key: str, version: Hashable, value: Dict):
+        """Store value for key at version, evicting the least recently used entries"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Size, hit ratio and invalidation counters"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hit_ratio': round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+                **self._stats,
+            }
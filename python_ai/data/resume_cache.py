@@ -0,0 +1,190 @@
+"""
+Resume Analysis Cache
+Persistent, content-addressed cache of parsed resumes and Gemini analyses.
+Entries are keyed by the SHA-256 of the uploaded file (or of its normalized
+text) and tagged with the parser or prompt version that produced them, so a
+re-uploaded resume skips pdfminer, parsing and paid API calls.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from services.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def content_key(content: Union[bytes, str], file_type: Optional[str] = None) -> str:
+    """
+    SHA-256 of a resume's content.
+
+    Binary formats hash their exact bytes. Text (a str, or a '.txt' upload)
+    hashes its whitespace-normalized form, so a pasted resume and the same
+    text uploaded as a file share an entry.
+    """
+    if isinstance(content, str) or (file_type or '').lower().lstrip('.') == 'txt':
+        text = content if isinstance(content, str) else bytes(content).decode('utf-8', errors='ignore')
+        data = ('text:' + ' '.join(text.split())).encode('utf-8')
+    else:
+        data = bytes(content)
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeCache:
+    """
+    SQLite-backed LRU cache of JSON results, capped by total size.
+
+    Each entry belongs to a kind ('parsed', 'gemini') and remembers the
+    version it was computed with; a lookup with another version is a miss
+    and drops the entry. When the stored values exceed max_bytes, the least
+    recently used entries are evicted. The file can be shared by several
+    processes.
+    """
+
+    def __init__(self, path: str = 'resume_cache.db', max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite file holding the cache
+            max_bytes: Total size of stored values before eviction; 0 disables the cache
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'stored': 0,
+            'evictions': 0,
+            'errors': 0,
+        }
+
+        if max_bytes > 0:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS resume_cache (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_resume_cache_last_used ON resume_cache(last_used);
+            ''')
+            self._conn.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def get(self, kind: str, key: str, version: str) -> Optional[Dict]:
+        """Cached value of this kind for key at version, or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT version, value FROM resume_cache WHERE kind = ? AND key = ?', (kind, key)
+                ).fetchone()
+                if row is None:
+                    self._stats['misses'] += 1
+                    return None
+
+                if row[0] != version:
+                    self._conn.execute('DELETE FROM resume_cache WHERE kind = ? AND key = ?', (kind, key))
+                    self._conn.commit()
+                    self._stats['stale'] += 1
+                    self._stats['misses'] += 1
+                    return None
+
+                self._conn.execute(
+                    'UPDATE resume_cache SET last_used = ? WHERE kind = ? AND key = ?', (time.time(), kind, key)
+                )
+                self._conn.commit()
+                self._stats['hits'] += 1
+                return json.loads(row[1])
+            except sqlite3.Error as e:
+                # A broken cache only costs a recomputation
+                logger.warning("Resume cache lookup failed", error=str(e), sample=0.1)
+                self._stats['errors'] += 1
+                return None
+
+    def put(self, kind: str, key: str, version: str, value: Dict):
+        """Store value, then evict least recently used entries beyond max_bytes"""
+        if not self.enabled:
+            return
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO resume_cache (kind, key, version, value, size, created_at, last_used) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (kind, key, version, payload, len(payload), now, now)
+                )
+                self._stats['stored'] += 1
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Resume cache store failed", error=str(e), sample=0.1)
+                self._stats['errors'] += 1
+
+    def _evict(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM resume_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for kind, key, size in self._conn.execute(
+            'SELECT kind, key, size FROM resume_cache ORDER BY last_used'
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM resume_cache WHERE kind = ? AND key = ?', (kind, key))
+            total -= size
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._conn.execute('DELETE FROM resume_cache')
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Entries and bytes per kind, hit ratio and eviction counters"""
+        kinds = {}
+        if self.enabled:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM resume_cache GROUP BY kind'
+                ).fetchall()
+            kinds = {kind: {'entries': count, 'bytes': size} for kind, count, size in rows}
+
+        lookups = self._stats['hits'] + self._stats['misses']
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'max_bytes': self.max_bytes,
+            'bytes': sum(kind['bytes'] for kind in kinds.values()),
+            'kinds': kinds,
+            'hit_ratio': round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+            **self._stats,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
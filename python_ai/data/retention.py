@@ -0,0 +1,288 @@
+"""
+Job Retention & Compaction
+Expires stale jobs by posted date and source TTL, archives them compressed,
+prunes the change log, and reclaims freed pages with incremental vacuum.
+"""
+
+import re
+import json
+import zlib
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from data.data_generator import JobDatabase
+
+RELATIVE_DATE_PATTERN = re.compile(r'(\d+)\+?\s*(minute|hour|day|week|month)s?\s+ago')
+RELATIVE_UNITS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+}
+
+
+def _parse_timestamp(value: Optional[str], naive_is_utc: bool = False) -> Optional[datetime]:
+    """
+    Parse an ISO/SQLite timestamp into a naive local datetime, the clock
+    posted_date and expired_at are written with (datetime.now()).
+
+    Naive values are local time, except with naive_is_utc (SQLite's
+    CURRENT_TIMESTAMP, used for created_at, is UTC).
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None and naive_is_utc:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def job_age_reference(posted_date: Optional[str], created_at: Optional[str]) -> Optional[datetime]:
+    """
+    When a job was posted.
+
+    Uses posted_date when it is an absolute timestamp, resolves relative
+    values like "30+ days ago" or "Just posted" against the ingest time,
+    and falls back to created_at otherwise.
+    """
+    ingested = _parse_timestamp(created_at, naive_is_utc=True)
+
+    posted = _parse_timestamp(posted_date)
+    if posted:
+        return posted
+
+    if posted_date and ingested:
+        text = str(posted_date).lower()
+        match = RELATIVE_DATE_PATTERN.search(text)
+        if match:
+            return ingested - int(match.group(1)) * RELATIVE_UNITS[match.group(2)]
+
+    return ingested
+
+
+class JobRetention:
+    """
+    Expiry, archiving and compaction policy for the jobs table.
+
+    Expired rows are moved to jobs_archive as zlib-compressed JSON and a
+    'delete' entry is appended to job_changes, so incremental consumers of
+    get_changes_since() drop them too. Log entries every consumer has read
+    are pruned afterwards.
+    """
+
+    def __init__(
+        self,
+        db: JobDatabase,
+        default_ttl_days: int = 45,
+        source_ttl_days: Optional[Dict[str, int]] = None,
+        vacuum_pages: int = 1000
+    ):
+        self.db = db
+        self.default_ttl_days = default_ttl_days
+        self.source_ttl_days = source_ttl_days or {}
+        self.vacuum_pages = vacuum_pages
+        self.last_run: Optional[Dict] = None
+        self.total_expired = 0
+        self.total_reclaimed_bytes = 0
+        self.total_pruned_changes = 0
+
+    def ttl_for(self, source: Optional[str]) -> int:
+        """TTL in days for a job source (0 = never expires)"""
+        return self.source_ttl_days.get(source or 'synthetic', self.default_ttl_days)
+
+    def find_expired(self, now: Optional[datetime] = None) -> List[str]:
+        """Ids of live jobs older than their source's TTL (now is naive local time)"""
+        now = now or datetime.now()
+        expired = []
+
+        conn = self.db._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, job_source, posted_date, created_at FROM jobs')
+
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            expired.extend(row['id'] for row in rows if self.is_expired(row, now))
+
+        conn.close()
+        return expired
+
+    def is_expired(self, row, now: datetime) -> bool:
+        """Whether a jobs row (job_source, posted_date, created_at) is older than its source's TTL"""
+        ttl = self.ttl_for(row['job_source'])
+        if ttl <= 0:
+            return False
+        reference = job_age_reference(row['posted_date'], row['created_at'])
+        return reference is not None and now - reference > timedelta(days=ttl)
+
+    def expire_jobs(self, now: Optional[datetime] = None, batch_size: int = 500) -> Dict:
+        """
+        Archive and delete expired jobs.
+
+        Candidates are found without locking; each batch is then re-read
+        and re-checked under the write lock, so a job re-ingested in between
+        (a newer posted_date) is neither archived from the old row nor deleted.
+
+        Returns:
+            Dict with the number of jobs expired, per source
+        """
+        now = now or datetime.now()
+        expired_ids = self.find_expired(now)
+        expired_at = datetime.now().isoformat()
+        by_source: Dict[str, int] = {}
+
+        conn = self.db._connect()
+        cursor = conn.cursor()
+
+        try:
+            for start in range(0, len(expired_ids), batch_size):
+                candidates = expired_ids[start:start + batch_size]
+                placeholders = ', '.join('?' for _ in candidates)
+                conn.execute('BEGIN IMMEDIATE')
+                cursor.execute(f'SELECT * FROM jobs WHERE id IN ({placeholders})', candidates)
+                rows = [row for row in cursor.fetchall() if self.is_expired(row, now)]
+                if not rows:
+                    conn.commit()
+                    continue
+                batch = [row['id'] for row in rows]
+                placeholders = ', '.join('?' for _ in batch)
+                descriptions = self.db.get_descriptions(batch)
+
+                for row in rows:
+                    archived = dict(row)
+                    archived['description'] = descriptions.get(row['id'], archived['description'])
+                    payload = zlib.compress(json.dumps(archived, default=str).encode('utf-8'))
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO jobs_archive
+                        (id, job_source, posted_date, created_at, expired_at, payload)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (
+                        row['id'], row['job_source'], row['posted_date'],
+                        row['created_at'], expired_at, sqlite3.Binary(payload)
+                    ))
+                    cursor.execute(
+                        "INSERT INTO job_changes (job_id, op, changed_at) VALUES (?, 'delete', ?)",
+                        (row['id'], expired_at)
+                    )
+                    source = row['job_source'] or 'synthetic'
+                    by_source[source] = by_source.get(source, 0) + 1
+
+                cursor.execute(f'DELETE FROM jobs WHERE id IN ({placeholders})', batch)
+                conn.commit()
+        finally:
+            # Closing without a commit rolls the batch back and releases the write lock
+            conn.close()
+
+        expired = sum(by_source.values())
+        self.total_expired += expired
+        return {'expired': expired, 'expired_by_source': by_source}
+
+    def prune_changes(self, consumed_seq: int) -> int:
+        """
+        Delete job_changes entries below consumed_seq.
+
+        consumed_seq is the oldest sequence any consumer has caught up to; the
+        entry at consumed_seq itself is kept so MAX(seq) never goes back.
+        Consumers further behind get 'complete': False from
+        get_changes_since() and reload.
+
+        Returns:
+            Number of entries deleted
+        """
+        conn = self.db._connect()
+        try:
+            deleted = conn.execute('DELETE FROM job_changes WHERE seq < ?', (consumed_seq,)).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        self.total_pruned_changes += deleted
+        return deleted
+
+    def incremental_vacuum(self, max_pages: Optional[int] = None) -> Dict:
+        """Return up to max_pages free pages to the filesystem"""
+        max_pages = max_pages or self.vacuum_pages
+
+        conn = sqlite3.connect(self.db.db_path)
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        free_before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        # execute() steps the pragma once (freeing a single page); executescript runs it to completion
+        conn.executescript(f'PRAGMA incremental_vacuum({int(max_pages)})')
+        free_after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.close()
+
+        reclaimed = (free_before - free_after) * page_size
+        self.total_reclaimed_bytes += reclaimed
+        return {
+            'reclaimed_pages': free_before - free_after,
+            'reclaimed_bytes': reclaimed,
+            'free_pages_remaining': free_after,
+        }
+
+    def run(self, now: Optional[datetime] = None, consumed_seq: Optional[int] = None) -> Dict:
+        """
+        Expire, archive, prune and vacuum in one pass.
+
+        Args:
+            now: Reference time for expiry
+            consumed_seq: Oldest change sequence still needed by a consumer;
+                the change log is not pruned when omitted
+        """
+        started = datetime.now()
+        result = self.expire_jobs(now)
+        result['pruned_changes'] = self.prune_changes(consumed_seq) if consumed_seq else 0
+        result.update(self.incremental_vacuum())
+        result['ran_at'] = started.isoformat()
+        result['duration_ms'] = round((datetime.now() - started).total_seconds() * 1000, 1)
+        self.last_run = result
+        return result
+
+    def report(self) -> Dict:
+        """Table size, live/expired counts and reclaimed space"""
+        conn = self.db._connect()
+        cursor = conn.cursor()
+
+        page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+        page_count = cursor.execute('PRAGMA page_count').fetchone()[0]
+        free_pages = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+
+        try:
+            cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'jobs'")
+            jobs_table_bytes = cursor.fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            # SQLite built without the dbstat virtual table
+            jobs_table_bytes = None
+
+        cursor.execute("SELECT COALESCE(job_source, 'synthetic'), COUNT(*) FROM jobs GROUP BY 1")
+        live_by_source = {row[0]: row[1] for row in cursor.fetchall()}
+
+        cursor.execute('''
+            SELECT COALESCE(job_source, 'synthetic'), COUNT(*), SUM(LENGTH(payload))
+            FROM jobs_archive GROUP BY 1
+        ''')
+        archive_rows = cursor.fetchall()
+
+        conn.close()
+
+        return {
+            'db_size_bytes': page_count * page_size,
+            'jobs_table_bytes': jobs_table_bytes,
+            'free_bytes': free_pages * page_size,
+            'live_jobs': sum(live_by_source.values()),
+            'live_by_source': live_by_source,
+            'expired_jobs': sum(row[1] for row in archive_rows),
+            'expired_by_source': {row[0]: row[1] for row in archive_rows},
+            'archive_bytes': sum(row[2] or 0 for row in archive_rows),
+            'ttl_days': {'default': self.default_ttl_days, **self.source_ttl_days},
+            'total_expired': self.total_expired,
+            'total_reclaimed_bytes': self.total_reclaimed_bytes,
+            'total_pruned_changes': self.total_pruned_changes,
+            'last_run': self.last_run,
+        }
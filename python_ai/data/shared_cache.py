@@ -0,0 +1,214 @@
+"""
+Shared Cache Store
+SQLite-backed caches that every API worker process on a host reads and
+writes, so `uvicorn --workers N` keeps one set of cached results instead of
+N that disagree.
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional
+
+from services.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def _version_text(version: Hashable) -> str:
+    return json.dumps(version, sort_keys=True, default=str)
+
+
+class SharedCacheStore:
+    """
+    One SQLite file holding named caches.
+
+    WAL mode lets workers read while another writes. Values are stored as
+    JSON, so only JSON-serializable results can be cached.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS shared_cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_shared_cache_lru ON shared_cache(namespace, last_used);
+        ''')
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class SharedCache:
+    """
+    MatchCache with its entries in a SharedCacheStore namespace.
+
+    Same get/put/clear/stats calls and the same version, expiry and LRU
+    rules as MatchCache, but visible to every process using the store.
+    Versions must be equal across processes for entries to be shared (for
+    /match: the database change sequence and the matcher's model_id).
+    Workers briefly disagree on versions (one has refreshed, another has
+    not), so a lookup at another version is a miss that leaves the entry in
+    place; it is replaced by the next put, or evicted by age or LRU.
+    """
+
+    shared = True
+
+    def __init__(self, store: SharedCacheStore, namespace: str, max_entries: int = 1024, ttl_seconds: float = 300):
+        """
+        Args:
+            store: Shared SQLite store
+            namespace: Name separating this cache's keys from other caches
+            max_entries: Entries kept before the least recently used is evicted
+            ttl_seconds: Seconds an entry stays valid; 0 disables expiry
+        """
+        self.store = store
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'expired': 0,
+            'evictions': 0,
+            'errors': 0,
+        }
+
+    def get(self, key: str, version: Hashable = '') -> Optional[Any]:
+        """Cached value for key at version, or None"""
+        with self.store.lock:
+            try:
+                row = self.store.conn.execute(
+                    'SELECT version, value, stored_at FROM shared_cache WHERE namespace = ? AND key = ?',
+                    (self.namespace, key)
+                ).fetchone()
+                if row is None:
+                    self._stats['misses'] += 1
+                    return None
+
+                entry_version, value, stored_at = row
+                now = time.time()
+                if entry_version != _version_text(version):
+                    # Not deleted: the entry may be current for a worker at the other version
+                    self._stats['stale'] += 1
+                    self._stats['misses'] += 1
+                    return None
+                if self.ttl_seconds and now - stored_at > self.ttl_seconds:
+                    self.store.conn.execute(
+                        'DELETE FROM shared_cache WHERE namespace = ? AND key = ?', (self.namespace, key)
+                    )
+                    self.store.conn.commit()
+                    self._stats['expired'] += 1
+                    self._stats['misses'] += 1
+                    return None
+
+                self.store.conn.execute(
+                    'UPDATE shared_cache SET last_used = ? WHERE namespace = ? AND key = ?',
+                    (now, self.namespace, key)
+                )
+                self.store.conn.commit()
+                self._stats['hits'] += 1
+                return json.loads(value)
+            except sqlite3.Error as e:
+                # A broken cache only costs a recomputation
+                logger.warning("Shared cache lookup failed", namespace=self.namespace, error=str(e), sample=0.1)
+                self._stats['errors'] += 1
+                return None
+
+    def put(self, key: str, version: Hashable, value: Any):
+        """Store value for key at version, evicting the least recently used entries"""
+        if self.max_entries <= 0:
+            return
+        payload = json.dumps(value, default=str)
+        now = time.time()
+        with self.store.lock:
+            try:
+                conn = self.store.conn
+                conn.execute(
+                    'INSERT OR REPLACE INTO shared_cache (namespace, key, version, value, stored_at, last_used) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (self.namespace, key, _version_text(version), payload, now, now)
+                )
+                excess = conn.execute(
+                    'SELECT COUNT(*) FROM shared_cache WHERE namespace = ?', (self.namespace,)
+                ).fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        'DELETE FROM shared_cache WHERE namespace = ? AND key IN ('
+                        'SELECT key FROM shared_cache WHERE namespace = ? ORDER BY last_used LIMIT ?)',
+                        (self.namespace, self.namespace, excess)
+                    )
+                    self._stats['evictions'] += excess
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Shared cache store failed", namespace=self.namespace, error=str(e), sample=0.1)
+                self._stats['errors'] += 1
+
+    def clear(self):
+        """Drop all entries in this namespace (counters are kept)"""
+        with self.store.lock:
+            self.store.conn.execute('DELETE FROM shared_cache WHERE namespace = ?', (self.namespace,))
+            self.store.conn.commit()
+
+    def __len__(self) -> int:
+        with self.store.lock:
+            return self.store.conn.execute(
+                'SELECT COUNT(*) FROM shared_cache WHERE namespace = ?', (self.namespace,)
+            ).fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Size, hit ratio and invalidation counters (counters are this process's)"""
+        lookups = self._stats['hits'] + self._stats['misses']
+        return {
+            'shared': True,
+            'path': self.store.path,
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hit_ratio': round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+            **self._stats,
+        }
+
+
+class SharedDict:
+    """
+    Dict-style front for a SharedCache, for code that treats its cache as a
+    plain dict (JobAPIOrchestrator.cache). Entries expire by the cache's TTL
+    in addition to any timestamp check the caller does.
+    """
+
+    def __init__(self, cache: SharedCache):
+        self.cache = cache
+
+    def __contains__(self, key: str) -> bool:
+        return self.cache.get(key) is not None
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.cache.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.cache.get(key)
+        return default if value is None else value
+
+    def __setitem__(self, key: str, value: Any):
+        self.cache.put(key, '', value)
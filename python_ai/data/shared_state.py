@@ -0,0 +1,155 @@
+"""
+Shared Serving State
+Coordinates API worker processes started with `uvicorn --workers N`. One
+worker at a time runs startup, the trained model and the job store image are
+published to a shared directory for every worker to memory-map, and a small
+state file tells workers when either has changed.
+"""
+
+import os
+import json
+import shutil
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+# POSIX advisory locks; multi-worker mode is unavailable without them
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class SharedState:
+    """
+    Directory shared by the workers of one API deployment on one host.
+
+    Layout:
+        state.json      model_id/model_path and catalog_path/catalog_seq currently published
+        models/<id>/    saved JobMatcher, embedder as memory-mappable arrays
+        catalog/<seq>/  ColumnarJobStore image
+        *.lock          startup, state and leader locks
+
+    The leader (whichever worker holds leader.lock) runs singleton work such
+    as republishing the job store image; if it exits, the lock is released
+    and another worker can take over.
+    """
+
+    def __init__(self, directory: str, keep: int = 2):
+        """
+        Args:
+            directory: Shared directory (created if missing)
+            keep: Published models and catalog images kept, newest first
+        """
+        if fcntl is None:
+            raise RuntimeError("Multi-worker mode needs POSIX file locks (fcntl); unset SHARED_STATE_DIR on this platform")
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+        self._leader_file = None
+        self._state: Dict = {}
+        self._state_mtime: Optional[int] = None
+
+    @contextmanager
+    def lock(self, name: str):
+        """Hold an exclusive lock shared by every process using this directory"""
+        with open(self.dir / f'{name}.lock', 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def try_lead(self) -> bool:
+        """Become the leader if no live process is; True if this process leads"""
+        if self._leader_file is not None:
+            return True
+        f = open(self.dir / 'leader.lock', 'a+')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._leader_file = f
+        return True
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader_file is not None
+
+    def read(self) -> Dict:
+        """Current state file contents (re-read only when the file changed)"""
+        path = self.dir / 'state.json'
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if mtime != self._state_mtime:
+            with open(path) as f:
+                self._state = json.load(f)
+            self._state_mtime = mtime
+        return dict(self._state)
+
+    def update(self, **fields) -> Dict:
+        """Merge fields into the state file atomically"""
+        with self.lock('state'):
+            path = self.dir / 'state.json'
+            state = {}
+            if path.exists():
+                with open(path) as f:
+                    state = json.load(f)
+            state.update(fields, updated_at=datetime.now().isoformat(), updated_by=os.getpid())
+            tmp = path.with_name(f'state.json.tmp-{os.getpid()}')
+            with open(tmp, 'w') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp, path)
+        return state
+
+    def publish_model(self, matcher) -> Dict:
+        """Save a trained JobMatcher for the other workers and point the state at it"""
+        path = self.dir / 'models' / matcher.model_id
+        matcher.save(str(path), mapped=True)
+        state = self.update(model_id=matcher.model_id, model_path=str(path))
+        self._prune('models', path)
+        return state
+
+    def publish_catalog(self, store, db_path: str) -> Dict:
+        """Save a ColumnarJobStore image for the other workers and point the state at it"""
+        path = self.dir / 'catalog' / f'{store.seq:012d}-{os.getpid()}'
+        manifest = store.save_image(str(path))
+        state = self.update(
+            catalog_path=str(path),
+            catalog_seq=manifest['seq'],
+            catalog_db=str(Path(db_path).resolve()),
+        )
+        self._prune('catalog', path)
+        return state
+
+    def _prune(self, kind: str, current: Path):
+        # Workers still mapping a removed version keep reading it until they move on
+        versions = sorted(
+            (p for p in (self.dir / kind).iterdir() if p.is_dir() and '.tmp-' not in p.name),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        for old in versions[self.keep:]:
+            if old != current:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def stats(self) -> Dict:
+        return {
+            'dir': str(self.dir),
+            'pid': os.getpid(),
+            'leader': self.is_leader,
+            **self.read(),
+        }
+
+    def close(self):
+        if self._leader_file is not None:
+            self._leader_file.close()
+            self._leader_file = None
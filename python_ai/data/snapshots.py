@@ -0,0 +1,200 @@
+"""
+Database Snapshots
+Consistent read-only copies of the jobs database for offline workloads,
+made with SQLite's online backup API so trainers never contend with the API.
+
+Usage:
+    python data/snapshots.py --db jobs.db              # Take one snapshot
+    python data/snapshots.py --db jobs.db --every 3600 # Refresh hourly
+    python data/snapshots.py --list
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.data_generator import JobDatabase
+
+LATEST_FILE = 'latest.json'
+
+
+class SnapshotManager:
+    """
+    Creates, lists and prunes snapshots of one database.
+
+    Each snapshot is a complete SQLite file named <db stem>-<timestamp>.db in
+    snapshot_dir, marked read-only on disk. latest.json points at the newest
+    one so readers can find it without listing the directory.
+    """
+
+    def __init__(
+        self,
+        db_path: str = 'jobs.db',
+        snapshot_dir: str = 'snapshots',
+        keep: int = 3,
+        pages_per_step: int = -1
+    ):
+        """
+        Args:
+            db_path: Source database
+            snapshot_dir: Where snapshots are written
+            keep: Snapshots kept by prune() (newest first)
+            pages_per_step: Backup step size; -1 copies in one step under a
+                single read transaction, smaller values let writers in between
+                steps but restart the copy whenever the source changes
+        """
+        self.db_path = db_path
+        self.snapshot_dir = Path(snapshot_dir)
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.last_snapshot: Optional[Dict] = None
+
+    def create(self) -> Dict:
+        """
+        Copy the database into a new snapshot and make it the latest.
+
+        Returns:
+            Snapshot info: path, size_bytes, change_seq, created_at, duration_ms
+        """
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        created_at = datetime.now()
+        name = f"{Path(self.db_path).stem}-{created_at.strftime('%Y%m%d-%H%M%S-%f')}.db"
+        path = self.snapshot_dir / name
+        tmp_path = path.with_suffix('.db.tmp')
+
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target, pages=self.pages_per_step)
+            change_seq = target.execute('SELECT MAX(seq) FROM job_changes').fetchone()[0] or 0
+            job_count = target.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+        finally:
+            target.close()
+            source.close()
+
+        os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp_path, path)
+
+        info = {
+            'path': str(path),
+            'size_bytes': path.stat().st_size,
+            'jobs': job_count,
+            'change_seq': change_seq,
+            'created_at': created_at.isoformat(),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+        latest_tmp = self.snapshot_dir / f'{LATEST_FILE}.tmp'
+        with open(latest_tmp, 'w') as f:
+            json.dump(info, f, indent=2)
+        os.replace(latest_tmp, self.snapshot_dir / LATEST_FILE)
+
+        self.last_snapshot = info
+        return info
+
+    def latest(self) -> Optional[Dict]:
+        """Info for the newest snapshot, or None if there is none"""
+        try:
+            with open(self.snapshot_dir / LATEST_FILE) as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return info if Path(info['path']).exists() else None
+
+    def list(self) -> List[Dict]:
+        """All snapshots of this database, newest first"""
+        if not self.snapshot_dir.exists():
+            return []
+        paths = sorted(
+            self.snapshot_dir.glob(f'{Path(self.db_path).stem}-*.db'),
+            key=lambda p: p.name,
+            reverse=True
+        )
+        return [
+            {
+                'path': str(p),
+                'size_bytes': p.stat().st_size,
+                'created_at': datetime.fromtimestamp(p.stat().st_mtime).isoformat(),
+            }
+            for p in paths
+        ]
+
+    def prune(self, keep: Optional[int] = None) -> List[str]:
+        """
+        Delete all but the newest snapshots (the latest one is never deleted).
+
+        Returns:
+            Paths removed
+        """
+        keep = max(1, self.keep if keep is None else keep)
+        latest = self.latest()
+        removed = []
+        for snapshot in self.list()[keep:]:
+            if latest and snapshot['path'] == latest['path']:
+                continue
+            path = Path(snapshot['path'])
+            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+            path.unlink()
+            removed.append(str(path))
+        return removed
+
+    def refresh(self) -> Dict:
+        """Take a snapshot and prune old ones"""
+        info = self.create()
+        info['pruned'] = len(self.prune())
+        return info
+
+    def open_latest(self, max_age_seconds: Optional[float] = None) -> JobDatabase:
+        """
+        Read-only JobDatabase on the newest snapshot.
+
+        A new snapshot is taken first if there is none, or if the newest is
+        older than max_age_seconds.
+        """
+        info = self.latest()
+        if info and max_age_seconds is not None:
+            age = (datetime.now() - datetime.fromisoformat(info['created_at'])).total_seconds()
+            if age > max_age_seconds:
+                info = None
+        if info is None:
+            info = self.refresh()
+        return JobDatabase(info['path'], read_only=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshot the jobs database for offline workloads')
+    parser.add_argument('--db', type=str, default='jobs.db', help='Path to the jobs database (default: jobs.db)')
+    parser.add_argument('--dir', type=str, default='snapshots', help='Snapshot directory (default: snapshots)')
+    parser.add_argument('--keep', type=int, default=3, help='Snapshots to keep (default: 3)')
+    parser.add_argument('--every', type=int, default=0, help='Refresh every N seconds instead of once')
+    parser.add_argument('--list', action='store_true', help='List existing snapshots')
+    args = parser.parse_args()
+
+    manager = SnapshotManager(args.db, args.dir, keep=args.keep)
+
+    if args.list:
+        for snapshot in manager.list():
+            print(f"  - {snapshot['path']} ({snapshot['size_bytes']:,} bytes, {snapshot['created_at']})")
+        return
+
+    while True:
+        info = manager.refresh()
+        print(f"[OK] Snapshot {info['path']}: {info['jobs']} jobs, {info['size_bytes']:,} bytes "
+              f"in {info['duration_ms']} ms (pruned {info['pruned']})")
+        if args.every <= 0:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == '__main__':
+    main()
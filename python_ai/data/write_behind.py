@@ -0,0 +1,184 @@
+"""
+Write-Behind Queue
+A single background writer that batches request-path database writes
+(job upserts, match logs, feedback events) into grouped transactions.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, List
+
+from data.data_generator import JobDatabase
+from services.log import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue drained by one writer thread.
+
+    Handlers enqueue writes and return immediately. The writer collects
+    items until it has batch_size of them or flush_interval seconds have
+    passed since the first one, then writes each kind in one transaction.
+    If a kind's transaction fails, its records are retried one at a time so
+    a bad record only loses itself. When the queue is full new writes are
+    dropped (and counted) rather than blocking the caller. Counters are in
+    records (jobs, match log entries, feedback events).
+    """
+
+    def __init__(
+        self,
+        db: JobDatabase,
+        max_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.5
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'flushes': 0,
+            'total_flush': 0.0,
+            'max_flush': 0.0,
+            'last_flush': 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def _put(self, kind: str, payload, records: int = 1) -> bool:
+        try:
+            self._queue.put_nowait((kind, payload))
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += records
+            logger.warning("Write-behind queue full, dropped write", kind=kind, sample=0.01)
+            return False
+
+        with self._lock:
+            self._stats['enqueued'] += records
+        return True
+
+    def enqueue_jobs(self, jobs: List[Dict]) -> bool:
+        """Queue job upserts"""
+        if not jobs:
+            return True
+        return self._put('jobs', list(jobs), len(jobs))
+
+    def enqueue_match(self, candidate_id: str, match_result: Dict) -> bool:
+        """Queue a match log entry"""
+        return self._put('match', (candidate_id, match_result))
+
+    def enqueue_feedback(self, event: Dict) -> bool:
+        """Queue a feedback event"""
+        return self._put('feedback', event)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List):
+        jobs, matches, feedback = [], [], []
+        for kind, payload in batch:
+            if kind == 'jobs':
+                jobs.extend(payload)
+            elif kind == 'match':
+                matches.append(payload)
+            else:
+                feedback.append(payload)
+
+        started = time.perf_counter()
+        failed = (
+            self._write('jobs', jobs, self.db.insert_jobs_bulk)
+            + self._write('match', matches, self.db.save_matches)
+            + self._write('feedback', feedback, self.db.save_feedback_events)
+        )
+        written = len(jobs) + len(matches) + len(feedback) - failed
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._stats['written'] += written
+            self._stats['failed'] += failed
+            self._stats['flushes'] += 1
+            self._stats['total_flush'] += elapsed
+            self._stats['max_flush'] = max(self._stats['max_flush'], elapsed)
+            self._stats['last_flush'] = elapsed
+
+    def _write(self, kind: str, records: List, write: Callable[[List], object]) -> int:
+        """Write records of one kind in one transaction, falling back to one at a time; returns the number lost"""
+        if not records:
+            return 0
+        try:
+            write(records)
+            return 0
+        except Exception as e:
+            if len(records) == 1:
+                logger.error("Write-behind record failed", kind=kind, error=str(e), sample=0.1)
+                return 1
+            logger.warning("Write-behind batch failed, retrying one at a time", kind=kind, records=len(records), error=str(e))
+
+        failed = 0
+        for record in records:
+            try:
+                write([record])
+            except Exception as e:
+                failed += 1
+                logger.error("Write-behind record failed", kind=kind, error=str(e), sample=0.1)
+        return failed
+
+    def stats(self) -> Dict:
+        """Queue depth and flush latency (times in milliseconds)"""
+        with self._lock:
+            s = dict(self._stats)
+
+        flushes = s['flushes'] or 1
+        return {
+            'depth': self._queue.qsize(),
+            'capacity': self._queue.maxsize,
+            'enqueued': s['enqueued'],
+            'written': s['written'],
+            'dropped': s['dropped'],
+            'failed': s['failed'],
+            'flushes': s['flushes'],
+            'avg_flush_ms': round(s['total_flush'] / flushes * 1000, 3),
+            'max_flush_ms': round(s['max_flush'] * 1000, 3),
+            'last_flush_ms': round(s['last_flush'] * 1000, 3),
+        }
+
+    def close(self, timeout: float = 30.0):
+        """Flush everything queued so far and stop the writer"""
+        # Blocking put: the stop marker must not be dropped when the queue is full
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
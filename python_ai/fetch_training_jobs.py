@@ -105,15 +105,14 @@ def fetch_jobs():
     print(f"{'='*60}")
     
     # Show DB stats
-    all_jobs = db.get_all_jobs(limit=5000)
-    real_jobs = [j for j in all_jobs if j.get('job_source', 'synthetic') != 'synthetic']
+    real_filter = {'exclude_source': 'synthetic'}
     print(f"\nDatabase now has:")
-    print(f"  - {len(all_jobs)} total jobs")
-    print(f"  - {len(real_jobs)} real jobs from Indeed")
+    print(f"  - {db.count_jobs()} total jobs")
+    print(f"  - {db.count_jobs(real_filter)} real jobs from Indeed")
     
     # Show skill distribution
     skills = {}
-    for job in real_jobs:
+    for job in db.iter_jobs(real_filter):
         for skill in job.get('required_skills', []):
             skills[skill.lower()] = skills.get(skill.lower(), 0) + 1
     
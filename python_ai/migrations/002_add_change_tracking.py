@@ -0,0 +1,77 @@
+"""
+Migration: Add content hashing and change tracking to jobs table.
+
+This migration adds:
+- content_hash: SHA-256 of the job's stored fields, used to skip unchanged re-ingests
+- updated_at: When the job's content last changed
+- change_seq: Sequence number of the job's latest change
+- job_changes: Append-only change log with a monotonically increasing seq
+"""
+import sqlite3
+import sys
+import os
+
+
+def migrate(db_path='jobs.db'):
+    """
+    Add change tracking columns and the job_changes log.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    print(f"Running migration on database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} does not exist. No migration needed.")
+        return True
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("PRAGMA table_info(jobs)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        if 'content_hash' not in columns:
+            cursor.execute('ALTER TABLE jobs ADD COLUMN content_hash TEXT')
+            print("[OK] Added content_hash column")
+
+        if 'updated_at' not in columns:
+            cursor.execute('ALTER TABLE jobs ADD COLUMN updated_at TIMESTAMP')
+            cursor.execute('UPDATE jobs SET updated_at = created_at')
+            print("[OK] Added updated_at column")
+
+        if 'change_seq' not in columns:
+            cursor.execute('ALTER TABLE jobs ADD COLUMN change_seq INTEGER DEFAULT 0')
+            print("[OK] Added change_seq column")
+
+        # AUTOINCREMENT guarantees seq values are never reused
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                op TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_change_seq ON jobs(change_seq)')
+        print("[OK] Created job_changes table")
+
+        conn.commit()
+        conn.close()
+
+        print("\n[SUCCESS] Migration completed successfully!")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"\n❌ Migration failed: {e}")
+        return False
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'jobs.db'
+
+    success = migrate(db_path)
+
+    if not success:
+        sys.exit(1)
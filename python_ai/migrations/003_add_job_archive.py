@@ -0,0 +1,72 @@
+"""
+Migration: Add expired-job archive and enable incremental vacuum.
+
+This migration adds:
+- jobs_archive: Expired jobs, one zlib-compressed JSON payload per row
+- auto_vacuum = INCREMENTAL, so space freed by expiry can be reclaimed in
+  small steps instead of a full VACUUM (requires one VACUUM to take effect)
+"""
+import sqlite3
+import sys
+import os
+
+INCREMENTAL = 2
+
+
+def migrate(db_path='jobs.db'):
+    """
+    Create the jobs_archive table and switch the database to incremental vacuum.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    print(f"Running migration on database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} does not exist. No migration needed.")
+        return True
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs_archive (
+                id TEXT PRIMARY KEY,
+                job_source TEXT,
+                posted_date TEXT,
+                created_at TIMESTAMP,
+                expired_at TIMESTAMP,
+                payload BLOB
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_archive_source ON jobs_archive(job_source)')
+        conn.commit()
+        print("[OK] Created jobs_archive table")
+
+        cursor.execute("PRAGMA auto_vacuum")
+        if cursor.fetchone()[0] != INCREMENTAL:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # The new mode only applies after the file is rebuilt
+            cursor.execute("VACUUM")
+            print("[OK] Enabled incremental vacuum")
+        else:
+            print("[OK] Incremental vacuum already enabled")
+
+        conn.close()
+
+        print("\n[SUCCESS] Migration completed successfully!")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"\n❌ Migration failed: {e}")
+        return False
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'jobs.db'
+
+    success = migrate(db_path)
+
+    if not success:
+        sys.exit(1)
@@ -0,0 +1,59 @@
+"""
+Migration: Add feedback_events table.
+
+This migration adds:
+- feedback_events: Application/interview/hire outcomes submitted via /feedback
+"""
+import sqlite3
+import sys
+import os
+
+
+def migrate(db_path='jobs.db'):
+    """
+    Create the feedback_events table.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    print(f"Running migration on database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} does not exist. No migration needed.")
+        return True
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS feedback_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT,
+                candidate_id TEXT,
+                was_successful INTEGER,
+                feedback_type TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_events_job ON feedback_events(job_id)')
+        print("[OK] Created feedback_events table")
+
+        conn.commit()
+        conn.close()
+
+        print("\n[SUCCESS] Migration completed successfully!")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"\n❌ Migration failed: {e}")
+        return False
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'jobs.db'
+
+    success = migrate(db_path)
+
+    if not success:
+        sys.exit(1)
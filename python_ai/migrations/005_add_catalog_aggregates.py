@@ -0,0 +1,142 @@
+"""
+Migration: Add materialized catalog aggregates.
+
+This migration adds:
+- job_counts: Live job count per (city, industry, job_source)
+- skill_counts: How many live jobs in each industry require each skill
+- Triggers on jobs that keep both tables current on every insert, update
+  and delete (ingest, re-ingest and retention expiry alike)
+"""
+import sqlite3
+import sys
+import os
+
+# Distinct lower-cased skills of a job row; tolerates NULL or malformed JSON
+SKILLS_OF = '''
+    SELECT DISTINCT LOWER(TRIM(value)) AS skill FROM json_each(
+        CASE WHEN json_valid({row}.required_skills) THEN {row}.required_skills ELSE '[]' END
+    ) WHERE TRIM(value) != ''
+'''
+
+ADD_JOB = f'''
+    INSERT INTO job_counts (city, industry, job_source, count)
+    VALUES (COALESCE(NEW.city, ''), COALESCE(NEW.industry, ''), COALESCE(NEW.job_source, 'synthetic'), 1)
+    ON CONFLICT (city, industry, job_source) DO UPDATE SET count = count + 1;
+
+    INSERT INTO skill_counts (industry, skill, count)
+    SELECT COALESCE(NEW.industry, ''), skill, 1 FROM ({SKILLS_OF.format(row='NEW')}) WHERE true
+    ON CONFLICT (industry, skill) DO UPDATE SET count = count + 1;
+'''
+
+REMOVE_JOB = f'''
+    UPDATE job_counts SET count = count - 1
+    WHERE city = COALESCE(OLD.city, '') AND industry = COALESCE(OLD.industry, '')
+      AND job_source = COALESCE(OLD.job_source, 'synthetic');
+    DELETE FROM job_counts
+    WHERE city = COALESCE(OLD.city, '') AND industry = COALESCE(OLD.industry, '')
+      AND job_source = COALESCE(OLD.job_source, 'synthetic') AND count <= 0;
+
+    UPDATE skill_counts SET count = count - 1
+    WHERE industry = COALESCE(OLD.industry, '') AND skill IN ({SKILLS_OF.format(row='OLD')});
+    DELETE FROM skill_counts WHERE industry = COALESCE(OLD.industry, '') AND count <= 0;
+'''
+
+
+def migrate(db_path='jobs.db'):
+    """
+    Create the aggregate tables, their maintenance triggers, and backfill them.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    print(f"Running migration on database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} does not exist. No migration needed.")
+        return True
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_counts (
+                city TEXT NOT NULL,
+                industry TEXT NOT NULL,
+                job_source TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (city, industry, job_source)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS skill_counts (
+                industry TEXT NOT NULL,
+                skill TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (industry, skill)
+            )
+        ''')
+        print("[OK] Created job_counts and skill_counts tables")
+
+        cursor.executescript(f'''
+            DROP TRIGGER IF EXISTS jobs_aggregate_insert;
+            DROP TRIGGER IF EXISTS jobs_aggregate_delete;
+            DROP TRIGGER IF EXISTS jobs_aggregate_update;
+
+            CREATE TRIGGER jobs_aggregate_insert AFTER INSERT ON jobs BEGIN
+                {ADD_JOB}
+            END;
+
+            CREATE TRIGGER jobs_aggregate_delete AFTER DELETE ON jobs BEGIN
+                {REMOVE_JOB}
+            END;
+
+            CREATE TRIGGER jobs_aggregate_update
+            AFTER UPDATE OF city, industry, job_source, required_skills ON jobs
+            WHEN OLD.city IS NOT NEW.city OR OLD.industry IS NOT NEW.industry
+              OR OLD.job_source IS NOT NEW.job_source OR OLD.required_skills IS NOT NEW.required_skills
+            BEGIN
+                {REMOVE_JOB}
+                {ADD_JOB}
+            END;
+        ''')
+        print("[OK] Created aggregate maintenance triggers")
+
+        # Backfill from the current jobs table
+        cursor.execute('DELETE FROM job_counts')
+        cursor.execute('DELETE FROM skill_counts')
+        cursor.execute('''
+            INSERT INTO job_counts (city, industry, job_source, count)
+            SELECT COALESCE(city, ''), COALESCE(industry, ''), COALESCE(job_source, 'synthetic'), COUNT(*)
+            FROM jobs GROUP BY 1, 2, 3
+        ''')
+        cursor.execute('''
+            INSERT INTO skill_counts (industry, skill, count)
+            SELECT industry, skill, COUNT(*) FROM (
+                SELECT DISTINCT jobs.id, COALESCE(jobs.industry, '') AS industry, LOWER(TRIM(skill.value)) AS skill
+                FROM jobs, json_each(
+                    CASE WHEN json_valid(jobs.required_skills) THEN jobs.required_skills ELSE '[]' END
+                ) AS skill
+                WHERE TRIM(skill.value) != ''
+            ) GROUP BY 1, 2
+        ''')
+        conn.commit()
+        print("[OK] Backfilled aggregates from jobs table")
+
+        conn.close()
+
+        print("\n[SUCCESS] Migration completed successfully!")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"\n❌ Migration failed: {e}")
+        return False
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'jobs.db'
+
+    success = migrate(db_path)
+
+    if not success:
+        sys.exit(1)
@@ -0,0 +1,79 @@
+"""
+Migration: Move job descriptions to a compressed side table.
+
+This migration adds:
+- job_descriptions: One zlib-compressed description per job, read only when
+  a caller asks for it
+- A trigger removing a job's description when the job is deleted
+Existing descriptions are compressed into the new table and cleared from
+jobs, so list and match queries no longer read them.
+"""
+import sqlite3
+import sys
+import os
+import zlib
+
+
+def migrate(db_path='jobs.db'):
+    """
+    Create job_descriptions and move existing descriptions into it.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    print(f"Running migration on database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} does not exist. No migration needed.")
+        return True
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_descriptions (
+                job_id TEXT PRIMARY KEY,
+                body BLOB
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS jobs_description_delete AFTER DELETE ON jobs BEGIN
+                DELETE FROM job_descriptions WHERE job_id = OLD.id;
+            END
+        ''')
+        print("[OK] Created job_descriptions table")
+
+        cursor.execute("SELECT id, description FROM jobs WHERE description IS NOT NULL AND description != ''")
+        moved = 0
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            conn.executemany(
+                'INSERT OR REPLACE INTO job_descriptions (job_id, body) VALUES (?, ?)',
+                [(job_id, sqlite3.Binary(zlib.compress(text.encode('utf-8')))) for job_id, text in rows]
+            )
+            moved += len(rows)
+
+        cursor.execute('UPDATE jobs SET description = NULL WHERE description IS NOT NULL')
+        conn.commit()
+        print(f"[OK] Compressed {moved} descriptions")
+
+        conn.close()
+
+        print("\n[SUCCESS] Migration completed successfully!")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"\n❌ Migration failed: {e}")
+        return False
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'jobs.db'
+
+    success = migrate(db_path)
+
+    if not success:
+        sys.exit(1)
@@ -0,0 +1,131 @@
+"""
+Migration: Key skill_counts by (city, industry, job_source, skill).
+
+This migration:
+- Rebuilds skill_counts, which 005 keyed by (industry, skill) only, so skill
+  demand can be read per city and source like job_counts
+- Replaces the aggregate triggers on jobs so they maintain the new key
+- Backfills skill_counts from the current jobs table
+"""
+import sqlite3
+import sys
+import os
+
+# Distinct lower-cased skills of a job row; tolerates NULL or malformed JSON
+SKILLS_OF = '''
+    SELECT DISTINCT LOWER(TRIM(value)) AS skill FROM json_each(
+        CASE WHEN json_valid({row}.required_skills) THEN {row}.required_skills ELSE '[]' END
+    ) WHERE TRIM(value) != ''
+'''
+
+ADD_JOB = f'''
+    INSERT INTO job_counts (city, industry, job_source, count)
+    VALUES (COALESCE(NEW.city, ''), COALESCE(NEW.industry, ''), COALESCE(NEW.job_source, 'synthetic'), 1)
+    ON CONFLICT (city, industry, job_source) DO UPDATE SET count = count + 1;
+
+    INSERT INTO skill_counts (city, industry, job_source, skill, count)
+    SELECT COALESCE(NEW.city, ''), COALESCE(NEW.industry, ''), COALESCE(NEW.job_source, 'synthetic'), skill, 1
+    FROM ({SKILLS_OF.format(row='NEW')}) WHERE true
+    ON CONFLICT (city, industry, job_source, skill) DO UPDATE SET count = count + 1;
+'''
+
+REMOVE_JOB = f'''
+    UPDATE job_counts SET count = count - 1
+    WHERE city = COALESCE(OLD.city, '') AND industry = COALESCE(OLD.industry, '')
+      AND job_source = COALESCE(OLD.job_source, 'synthetic');
+    DELETE FROM job_counts
+    WHERE city = COALESCE(OLD.city, '') AND industry = COALESCE(OLD.industry, '')
+      AND job_source = COALESCE(OLD.job_source, 'synthetic') AND count <= 0;
+
+    UPDATE skill_counts SET count = count - 1
+    WHERE city = COALESCE(OLD.city, '') AND industry = COALESCE(OLD.industry, '')
+      AND job_source = COALESCE(OLD.job_source, 'synthetic') AND skill IN ({SKILLS_OF.format(row='OLD')});
+    DELETE FROM skill_counts
+    WHERE city = COALESCE(OLD.city, '') AND industry = COALESCE(OLD.industry, '')
+      AND job_source = COALESCE(OLD.job_source, 'synthetic') AND count <= 0;
+'''
+
+
+def migrate(db_path='jobs.db'):
+    """
+    Rebuild skill_counts with the per-segment key, its triggers, and backfill it.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    print(f"Running migration on database: {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} does not exist. No migration needed.")
+        return True
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.executescript(f'''
+            BEGIN;
+
+            DROP TRIGGER IF EXISTS jobs_aggregate_insert;
+            DROP TRIGGER IF EXISTS jobs_aggregate_delete;
+            DROP TRIGGER IF EXISTS jobs_aggregate_update;
+
+            DROP TABLE IF EXISTS skill_counts;
+            CREATE TABLE skill_counts (
+                city TEXT NOT NULL,
+                industry TEXT NOT NULL,
+                job_source TEXT NOT NULL,
+                skill TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (city, industry, job_source, skill)
+            );
+            CREATE INDEX idx_skill_counts_industry ON skill_counts(industry);
+
+            CREATE TRIGGER jobs_aggregate_insert AFTER INSERT ON jobs BEGIN
+                {ADD_JOB}
+            END;
+
+            CREATE TRIGGER jobs_aggregate_delete AFTER DELETE ON jobs BEGIN
+                {REMOVE_JOB}
+            END;
+
+            CREATE TRIGGER jobs_aggregate_update
+            AFTER UPDATE OF city, industry, job_source, required_skills ON jobs
+            WHEN OLD.city IS NOT NEW.city OR OLD.industry IS NOT NEW.industry
+              OR OLD.job_source IS NOT NEW.job_source OR OLD.required_skills IS NOT NEW.required_skills
+            BEGIN
+                {REMOVE_JOB}
+                {ADD_JOB}
+            END;
+
+            INSERT INTO skill_counts (city, industry, job_source, skill, count)
+            SELECT city, industry, job_source, skill, COUNT(*) FROM (
+                SELECT DISTINCT jobs.id, COALESCE(jobs.city, '') AS city, COALESCE(jobs.industry, '') AS industry,
+                       COALESCE(jobs.job_source, 'synthetic') AS job_source, LOWER(TRIM(skill.value)) AS skill
+                FROM jobs, json_each(
+                    CASE WHEN json_valid(jobs.required_skills) THEN jobs.required_skills ELSE '[]' END
+                ) AS skill
+                WHERE TRIM(skill.value) != ''
+            ) GROUP BY 1, 2, 3, 4;
+
+            COMMIT;
+        ''')
+        print("[OK] Rebuilt skill_counts keyed by city, industry, source and skill")
+
+        conn.close()
+
+        print("\n[SUCCESS] Migration completed successfully!")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"\n❌ Migration failed: {e}")
+        return False
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'jobs.db'
+
+    success = migrate(db_path)
+
+    if not success:
+        sys.exit(1)
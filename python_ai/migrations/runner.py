@@ -0,0 +1,140 @@
+"""
+Migration runner for the jobs database.
+
+Discovers the numbered scripts in this directory (NNN_description.py, each
+exposing migrate(db_path) -> bool) and applies the ones newer than the
+database's PRAGMA user_version, recording each applied version.
+
+When the database is already up to date the runner only reads user_version,
+so calling it on every startup (and from every worker) is effectively free.
+Pending migrations run under an exclusive file lock next to the database so
+concurrent workers apply them exactly once.
+"""
+import importlib.util
+import os
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Tuple
+
+MIGRATIONS_DIR = Path(__file__).parent
+MIGRATION_PATTERN = re.compile(r'^(\d+)_\w+\.py$')
+
+
+def discover_migrations() -> List[Tuple[int, Path]]:
+    """Return (version, path) for every migration script, sorted by version."""
+    migrations = []
+    for path in MIGRATIONS_DIR.iterdir():
+        match = MIGRATION_PATTERN.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), path))
+    return sorted(migrations)
+
+
+def get_schema_version(db_path: str) -> int:
+    """Read the applied migration version from PRAGMA user_version."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _set_schema_version(db_path: str, version: int):
+    conn = sqlite3.connect(db_path)
+    try:
+        # PRAGMA does not accept bound parameters
+        conn.execute(f'PRAGMA user_version = {int(version)}')
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _load_migration(path: Path):
+    spec = importlib.util.spec_from_file_location(f'migration_{path.stem}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextmanager
+def _migration_lock(db_path: str):
+    """Exclusive lock on <db_path>.migrate.lock, held for the duration of the block."""
+    lock_path = f'{db_path}.migrate.lock'
+    with open(lock_path, 'a+') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            # LK_LOCK retries for ~10s; keep trying until the holder finishes
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def run_migrations(db_path: str = 'jobs.db') -> int:
+    """
+    Apply pending migrations to the database.
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        The schema version after running
+
+    Raises:
+        RuntimeError: If a migration reports failure (later ones are not run)
+    """
+    migrations = discover_migrations()
+    latest = migrations[-1][0] if migrations else 0
+
+    # Fast path: nothing to do, no lock taken
+    if get_schema_version(db_path) >= latest:
+        return latest
+
+    with _migration_lock(db_path):
+        # Another worker may have migrated while we waited for the lock
+        current = get_schema_version(db_path)
+
+        for version, path in migrations:
+            if version <= current:
+                continue
+
+            print(f"[MIGRATE] Applying {path.name}")
+            module = _load_migration(path)
+            if not module.migrate(db_path):
+                raise RuntimeError(f"Migration {path.name} failed")
+
+            _set_schema_version(db_path, version)
+            current = version
+
+        return current
+
+
+if __name__ == '__main__':
+    # Get database path from command line or use default
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'jobs.db'
+
+    try:
+        version = run_migrations(db_path)
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    print(f"[OK] Database schema at version {version}")
@@ -4,14 +4,20 @@ Trainable skill-based matching with confidence scoring
 """
 
 import json
+import uuid
 import pickle
 import numpy as np
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import math
 
+from services.log import get_logger
+
+logger = get_logger(__name__)
+
 
 @dataclass
 class MatchResult:
@@ -35,6 +41,49 @@ class MatchResult:
         return asdict(self)
 
 
+class _SkillArray(Mapping):
+    """Read-only {skill: value} view of an array indexed by vocabulary position"""
+    
+    def __init__(self, vocabulary: Dict[str, int], values: np.ndarray):
+        self.vocabulary = vocabulary
+        self.values = values
+    
+    def __getitem__(self, skill: str) -> float:
+        return float(self.values[self.vocabulary[skill]])
+    
+    def __iter__(self):
+        return iter(self.vocabulary)
+    
+    def __len__(self) -> int:
+        return len(self.vocabulary)
+
+
+class _CooccurrenceRows(Mapping):
+    """Read-only {skill: {skill: weight}} view of a CSR co-occurrence matrix"""
+    
+    def __init__(self, skills: List[str], vocabulary: Dict[str, int], indptr: np.ndarray,
+                 indices: np.ndarray, data: np.ndarray):
+        self.skills = skills
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+    
+    def __getitem__(self, skill: str) -> Dict[str, float]:
+        row = self.vocabulary[skill]
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return {
+            self.skills[column]: float(weight)
+            for column, weight in zip(self.indices[start:end], self.data[start:end])
+        }
+    
+    def __iter__(self):
+        return iter(self.vocabulary)
+    
+    def __len__(self) -> int:
+        return len(self.vocabulary)
+
+
 class SkillEmbedder:
     """
     Convert skills to vector representations for semantic matching.
@@ -54,6 +103,9 @@ class SkillEmbedder:
         Args:
             skill_documents: List of skill lists (from resumes or job postings)
         """
+        self.idf_scores = {}
+        self.skill_cooccurrence = {}
+        
         # Build vocabulary
         all_skills = set()
         for doc in skill_documents:
@@ -152,6 +204,49 @@ class SkillEmbedder:
         self.idf_scores = data['idf_scores']
         self.skill_cooccurrence = data['skill_cooccurrence']
         self.is_trained = data['is_trained']
+    
+    def save_arrays(self, path: str):
+        """
+        Save as .npy arrays (IDF per skill, co-occurrence as CSR) that
+        load_arrays() memory-maps, so processes loading the same files share
+        one copy in the page cache.
+        """
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+        
+        skills = sorted(self.vocabulary, key=self.vocabulary.get)
+        indptr, indices, data = [0], [], []
+        for skill in skills:
+            for other, weight in self.skill_cooccurrence.get(skill, {}).items():
+                if other in self.vocabulary:
+                    indices.append(self.vocabulary[other])
+                    data.append(weight)
+            indptr.append(len(indices))
+        
+        np.save(out / 'idf.npy', np.array([self.idf_scores.get(skill, 1.0) for skill in skills], dtype=np.float64))
+        np.save(out / 'cooccurrence_indptr.npy', np.array(indptr, dtype=np.int64))
+        np.save(out / 'cooccurrence_indices.npy', np.array(indices, dtype=np.int32))
+        np.save(out / 'cooccurrence_data.npy', np.array(data, dtype=np.float64))
+        with open(out / 'manifest.json', 'w') as f:
+            json.dump({'skills': skills, 'is_trained': self.is_trained}, f)
+    
+    def load_arrays(self, path: str):
+        """Load an embedder saved by save_arrays(), memory-mapped read-only"""
+        src = Path(path)
+        with open(src / 'manifest.json') as f:
+            manifest = json.load(f)
+        
+        skills = manifest['skills']
+        self.vocabulary = {skill: idx for idx, skill in enumerate(skills)}
+        self.idf_scores = _SkillArray(self.vocabulary, np.load(src / 'idf.npy', mmap_mode='r'))
+        self.skill_cooccurrence = _CooccurrenceRows(
+            skills,
+            self.vocabulary,
+            np.load(src / 'cooccurrence_indptr.npy', mmap_mode='r'),
+            np.load(src / 'cooccurrence_indices.npy', mmap_mode='r'),
+            np.load(src / 'cooccurrence_data.npy', mmap_mode='r'),
+        )
+        self.is_trained = manifest['is_trained']
 
 
 class JobMatcher:
@@ -199,6 +294,9 @@ class JobMatcher:
         # Training history
         self.feedback_history: List[Dict] = []
         self.is_trained = False
+        
+        # Identifies the weights in use (new on train, load and recalibration); processes that load the same saved model share it
+        self.model_id = uuid.uuid4().hex
     
     def train(self, training_data: List[Dict]):
         """
@@ -225,6 +323,7 @@ class JobMatcher:
             self._optimize_weights(labeled_data)
         
         self.is_trained = True
+        self.model_id = uuid.uuid4().hex
     
     def _optimize_weights(self, labeled_data: List[Dict]):
         """
@@ -272,7 +371,7 @@ class JobMatcher:
                         best_weights = test_weights
         
         self.weights = best_weights
-        print(f"Optimized weights with accuracy: {best_accuracy:.2%}")
+        logger.info("Optimized weights", accuracy=round(best_accuracy, 4))
     
     def match(self, candidate: Dict, job: Dict) -> MatchResult:
         """
@@ -370,6 +469,185 @@ class JobMatcher:
             job_source=job.get('job_source', 'synthetic')
         )
     
+    def job_features(self, jobs: List[Dict]) -> Dict:
+        """
+        Job-side inputs of score_matrix(), computed once per job list.
+        
+        Only depends on the jobs and the trained embedder, so it can be
+        reused across candidate chunks (and shared read-only between
+        processes) until the catalog or the model changes.
+        """
+        job_skills = [j.get('required_skills', []) or [] for j in jobs]
+        
+        skill_index: Dict[str, int] = {}
+        for skills in job_skills:
+            for skill in skills:
+                skill_index.setdefault(skill.lower(), len(skill_index))
+        incidence = np.zeros((len(jobs), len(skill_index)))
+        for row, skills in enumerate(job_skills):
+            incidence[row, [skill_index[s.lower()] for s in skills]] = 1
+        
+        # Embeddings restricted to the vocabulary columns jobs use; other
+        # columns contribute nothing to a dot product with a job
+        embedding_columns = np.zeros(0, dtype=int)
+        embeddings = np.zeros((len(jobs), 0))
+        if self.is_trained:
+            vectors = [self.embedder.embed(skills) if skills else None for skills in job_skills]
+            used = [np.flatnonzero(v) for v in vectors if v is not None]
+            embedding_columns = np.unique(np.concatenate(used)) if used else embedding_columns
+            embeddings = np.array([
+                v[embedding_columns] if v is not None else np.zeros(len(embedding_columns))
+                for v in vectors
+            ]).reshape(len(jobs), len(embedding_columns))
+        
+        required = [j.get('education_required', 'bachelors') for j in jobs]
+        industries = [j.get('industry', '') for j in jobs]
+        distinct_industries = sorted(set(industries))
+        industry_column = {industry: i for i, industry in enumerate(distinct_industries)}
+        
+        return {
+            'count': len(jobs),
+            'skill_index': skill_index,
+            'incidence': incidence,
+            'sizes': incidence.sum(axis=1),
+            'embedding_columns': embedding_columns,
+            'embeddings': embeddings,
+            'skill_less': [col for col, skills in enumerate(job_skills) if not skills],
+            'min_exp': np.array([float(j.get('min_experience', 0) or 0) for j in jobs])[None, :],
+            'max_exp': np.array([float(j.get('max_experience', 20) or 0) for j in jobs])[None, :],
+            'required_level': np.array(
+                [self.education_levels.get(r.lower(), 0) if r else 0 for r in required], dtype=float
+            )[None, :],
+            'has_requirement': np.array([bool(r) for r in required])[None, :],
+            'industries': distinct_industries,
+            'industry_columns': np.array([industry_column[ind] for ind in industries], dtype=int),
+        }
+    
+    def score_matrix(self, candidates: List[Dict], jobs: List[Dict], features: Optional[Dict] = None) -> np.ndarray:
+        """
+        Confidence of every candidate against every job, as one matrix.
+        
+        Computes the same scores as match() for all pairs at once: skills become
+        incidence and embedding matrices, so skill overlap and semantic similarity
+        are matrix products; experience, education and industry are broadcast.
+        
+        Args:
+            features: job_features(jobs), if already computed
+        
+        Returns:
+            Array of shape (len(candidates), len(jobs)) with confidences in percent
+        """
+        n, m = len(candidates), len(jobs)
+        if n == 0 or m == 0:
+            return np.zeros((n, m))
+        if features is None:
+            features = self.job_features(jobs)
+        
+        candidate_skills = [c.get('skills', []) or [] for c in candidates]
+        
+        # Exact overlap: share of each job's distinct skills the candidate has
+        skill_index = features['skill_index']
+        candidate_incidence = np.zeros((n, len(skill_index)))
+        for row, skills in enumerate(candidate_skills):
+            cols = [skill_index[s.lower()] for s in skills if s.lower() in skill_index]
+            candidate_incidence[row, cols] = 1
+        overlap = candidate_incidence @ features['incidence'].T
+        job_sizes = features['sizes']
+        skill_exact = np.divide(overlap, job_sizes, out=np.ones((n, m)), where=job_sizes > 0)
+        
+        # Semantic similarity: cosine of the embeddings
+        skill_semantic = np.zeros((n, m))
+        columns = features['embedding_columns']
+        if self.is_trained and len(columns):
+            candidate_emb = np.array([
+                self.embedder.embed(skills)[columns] if skills else np.zeros(len(columns))
+                for skills in candidate_skills
+            ])
+            skill_semantic = np.clip(candidate_emb @ features['embeddings'].T, 0, 1)
+        
+        # Jobs without structured skills are scored on title/description relevance
+        title_bonus = np.zeros((n, m))
+        for col in features['skill_less']:
+            job = jobs[col]
+            for row, skills in enumerate(candidate_skills):
+                title_bonus[row, col] = self._calculate_title_relevance(
+                    skills, job.get('title', ''), job.get('description', '')
+                )
+        skill_exact = np.where(title_bonus > 0, title_bonus, skill_exact)
+        
+        # Experience
+        candidate_exp = np.array([float(c.get('experience_years', 0) or 0) for c in candidates])[:, None]
+        min_exp, max_exp = features['min_exp'], features['max_exp']
+        overqualified = (max_exp != 0) & (candidate_exp > max_exp + self.exp_params['overqualified_threshold'])
+        ratio = np.where(min_exp > 0, candidate_exp / np.where(min_exp > 0, min_exp, 1), 1.0)
+        experience = np.where(
+            candidate_exp >= min_exp,
+            np.where(overqualified, self.exp_params['overqualified_penalty'], 1.0),
+            ratio * self.exp_params['underqualified_penalty']
+        )
+        
+        # Education
+        candidate_level = np.array([
+            max([self.education_levels.get(e.get('degree', '').lower(), 0) for e in c.get('education', []) or []] or [0])
+            for c in candidates
+        ], dtype=float)[:, None]
+        has_education = np.array([bool(c.get('education')) for c in candidates])[:, None]
+        required_level = features['required_level']
+        education = np.where(
+            ~features['has_requirement'], 1.0,
+            np.where(
+                ~has_education, 0.5,
+                np.where(
+                    candidate_level >= required_level, 1.0,
+                    np.where(candidate_level > 0, candidate_level / np.maximum(required_level, 1), 0.5)
+                )
+            )
+        )
+        
+        # Industry: scored once per distinct job industry
+        per_industry = np.array([
+            [self._calculate_industry_score(c.get('industries', []), industry) for industry in features['industries']]
+            for c in candidates
+        ])
+        industry = per_industry[:, features['industry_columns']]
+        
+        raw = (
+            self.weights['skill_semantic'] * skill_semantic +
+            self.weights['skill_exact'] * skill_exact +
+            self.weights['experience'] * experience +
+            self.weights['education'] * education +
+            self.weights['industry'] * industry
+        )
+        raw = np.where((title_bonus > 0) & (raw < 0.5), np.maximum(raw, title_bonus * 0.7), raw)
+        
+        adjusted = raw * self.calibration['scale'] + self.calibration['shift']
+        confidence = 100 / (1 + np.exp(-10 * (adjusted - 0.5)))
+        return np.clip(confidence, 5, 95)
+    
+    def match_batch(
+        self,
+        candidates: List[Dict],
+        jobs: List[Dict],
+        top_k: int = 20,
+        features: Optional[Dict] = None
+    ) -> List[List[MatchResult]]:
+        """
+        Top matches for many candidates against one job list.
+        
+        Ranks all pairs with score_matrix() and builds full MatchResults
+        (skills, explanation) only for each candidate's top_k jobs.
+        """
+        confidence = self.score_matrix(candidates, jobs, features)
+        if confidence.size == 0:
+            return [[] for _ in candidates]
+        
+        # Stable sort on rounded confidence ranks ties like match() + list.sort
+        order = np.argsort(-np.round(confidence, 1), axis=1, kind='stable')[:, :top_k]
+        return [
+            [self.match(candidate, jobs[col]) for col in row]
+            for candidate, row in zip(candidates, order)
+        ]
+    
     def _calculate_skill_semantic_score(
         self, 
         candidate_skills: List[str], 
@@ -630,15 +908,23 @@ class JobMatcher:
         
         # Adjust shift to match average success rate
         self.calibration['shift'] += (actual_mean - pred_mean) * 0.1
+        self.model_id = uuid.uuid4().hex
     
-    def save(self, path: str):
-        """Save trained matcher"""
+    def save(self, path: str, mapped: bool = False):
+        """
+        Save trained matcher.
+        
+        Args:
+            path: Model directory
+            mapped: Save the embedder as memory-mappable arrays instead of a pickle
+        """
         data = {
             'weights': self.weights,
             'exp_params': self.exp_params,
             'calibration': self.calibration,
             'feedback_history': self.feedback_history,
             'is_trained': self.is_trained,
+            'model_id': self.model_id,
         }
         
         model_path = Path(path)
@@ -647,7 +933,10 @@ class JobMatcher:
         with open(model_path / 'matcher.pkl', 'wb') as f:
             pickle.dump(data, f)
         
-        self.embedder.save(str(model_path / 'embedder.pkl'))
+        if mapped:
+            self.embedder.save_arrays(str(model_path / 'embedder'))
+        else:
+            self.embedder.save(str(model_path / 'embedder.pkl'))
     
     def load(self, path: str):
         """Load trained matcher"""
@@ -662,7 +951,11 @@ class JobMatcher:
         self.feedback_history = data['feedback_history']
         self.is_trained = data['is_trained']
         
-        self.embedder.load(str(model_path / 'embedder.pkl'))
+        if (model_path / 'embedder' / 'manifest.json').exists():
+            self.embedder.load_arrays(str(model_path / 'embedder'))
+        else:
+            self.embedder.load(str(model_path / 'embedder.pkl'))
+        self.model_id = data.get('model_id') or uuid.uuid4().hex
 
 
 class IndustryClassifier:
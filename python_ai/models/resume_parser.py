@@ -3,13 +3,17 @@ Resume Parser & Skill Extractor
 Extracts structured data from resumes (PDF, DOCX, TXT)
 """
 
+import io
 import re
 import json
+import hashlib
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from services.tracing import tracer
+
 # For PDF parsing
 try:
     from pdfminer.high_level import extract_text as pdf_extract_text
@@ -22,6 +26,9 @@ try:
 except ImportError:
     Document = None
 
+# A resume file: a path, its raw bytes, or a binary file-like object
+ResumeSource = Union[str, Path, bytes, BinaryIO]
+
 
 @dataclass
 class ParsedResume:
@@ -155,11 +162,18 @@ class ResumeParser:
     # Path to unified training knowledge
     LEARNED_SKILLS_PATH = Path(__file__).parent.parent / "trained_models" / "unified_training_knowledge.json"
     
+    # Bump when extraction logic changes so cached parse results are recomputed
+    PARSER_VERSION = 1
+    
     def __init__(self):
         self.skill_taxonomy = SkillTaxonomy.get_all_skills()
         self.learned_skills_count = 0
         self._load_learned_skills()  # Load skills from training
         self._compile_patterns()
+        
+        # Parse results depend on the code and on the skills learned so far
+        taxonomy_hash = hashlib.sha256('\n'.join(sorted(self.skill_taxonomy)).encode('utf-8')).hexdigest()
+        self.version = f"{self.PARSER_VERSION}-{taxonomy_hash[:12]}"
     
     def _load_learned_skills(self):
         """Load learned skills from unified training knowledge file."""
@@ -229,36 +243,53 @@ class ResumeParser:
             'Media': ['media', 'entertainment', 'news', 'publishing', 'content'],
         }
     
-    def parse(self, file_path: str) -> ParsedResume:
-        """Parse a resume file and return structured data"""
-        path = Path(file_path)
+    def parse(self, source: ResumeSource, file_type: Optional[str] = None) -> ParsedResume:
+        """
+        Parse a resume and return structured data.
         
-        # Extract raw text based on file type
-        if path.suffix.lower() == '.pdf':
-            raw_text = self._extract_pdf(file_path)
-        elif path.suffix.lower() == '.docx':
-            raw_text = self._extract_docx(file_path)
-        elif path.suffix.lower() == '.txt':
-            raw_text = self._extract_txt(file_path)
-        else:
-            raise ValueError(f"Unsupported file format: {path.suffix}")
+        Args:
+            source: File path, raw file bytes, or a binary file-like object
+            file_type: Format ('.pdf', '.docx', '.txt'); taken from the
+                path or the file object's name when omitted
+        """
+        return self.parse_text(self.extract_text(source, file_type))
+    
+    def extract_text(self, source: ResumeSource, file_type: Optional[str] = None) -> str:
+        """Raw text of a resume given as a path, bytes, or file-like object"""
+        if file_type is None:
+            name = source if isinstance(source, (str, Path)) else getattr(source, 'name', '')
+            file_type = Path(str(name)).suffix
+        file_type = '.' + file_type.lower().lstrip('.')
         
-        return self.parse_text(raw_text)
+        with tracer.span('resume.extract_text', **{'resume.file_type': file_type}) as span:
+            # Extract raw text based on file type
+            if file_type == '.pdf':
+                text = self._extract_pdf(source)
+            elif file_type == '.docx':
+                text = self._extract_docx(source)
+            elif file_type == '.txt':
+                text = self._extract_txt(source)
+            else:
+                raise ValueError(f"Unsupported file format: {file_type}")
+            span.set_attribute('resume.text_chars', len(text))
+            return text
     
     def parse_text(self, raw_text: str) -> ParsedResume:
         """Parse resume from raw text"""
-        # Clean text
-        text = self._clean_text(raw_text)
-        text_lower = text.lower()
-        
-        # Extract all components
-        skills = self._extract_skills(text_lower)
-        experience_years = self._calculate_experience(text)
-        education = self._extract_education(text_lower)
-        job_titles = self._extract_job_titles(text_lower)
-        industries = self._extract_industries(text_lower)
-        certifications = self._extract_certifications(text_lower)
-        contact_info = self._extract_contact_info(text)
+        with tracer.span('resume.parse_text', **{'resume.text_chars': len(raw_text)}) as span:
+            # Clean text
+            text = self._clean_text(raw_text)
+            text_lower = text.lower()
+            
+            # Extract all components
+            skills = self._extract_skills(text_lower)
+            experience_years = self._calculate_experience(text)
+            education = self._extract_education(text_lower)
+            job_titles = self._extract_job_titles(text_lower)
+            industries = self._extract_industries(text_lower)
+            certifications = self._extract_certifications(text_lower)
+            contact_info = self._extract_contact_info(text)
+            span.set_attribute('resume.skills', len(skills))
         
         # Format skills as sentence
         skills_sentence = self.format_skills_sentence(skills)
@@ -275,23 +306,33 @@ class ResumeParser:
             skills_sentence=skills_sentence
         )
     
-    def _extract_pdf(self, file_path: str) -> str:
+    @staticmethod
+    def _binary(source: ResumeSource):
+        """Path or binary file object; bytes are wrapped so nothing touches disk"""
+        return io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+    
+    def _extract_pdf(self, source: ResumeSource) -> str:
         """Extract text from PDF"""
         if pdf_extract_text is None:
             raise ImportError("pdfminer.six is required for PDF parsing")
-        return pdf_extract_text(file_path)
+        return pdf_extract_text(self._binary(source))
     
-    def _extract_docx(self, file_path: str) -> str:
+    def _extract_docx(self, source: ResumeSource) -> str:
         """Extract text from DOCX"""
         if Document is None:
             raise ImportError("python-docx is required for DOCX parsing")
-        doc = Document(file_path)
+        doc = Document(self._binary(source))
         return '\n'.join([para.text for para in doc.paragraphs])
     
-    def _extract_txt(self, file_path: str) -> str:
+    def _extract_txt(self, source: ResumeSource) -> str:
         """Extract text from TXT"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
+        if isinstance(source, (str, Path)):
+            with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+        content = source.read() if hasattr(source, 'read') else source
+        if isinstance(content, str):
+            return content
+        return bytes(content).decode('utf-8', errors='ignore')
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text"""
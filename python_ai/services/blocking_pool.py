@@ -0,0 +1,133 @@
+"""
+Blocking Integration Pools
+Runs synchronous third-party calls (job APIs, LinkedIn scraping, Gemini,
+resume parsing) on small dedicated thread pools so async FastAPI handlers
+never block the event loop, and one slow integration cannot starve another.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class IntegrationTimeout(Exception):
+    """A call through a BlockingPool did not finish within its timeout"""
+
+    def __init__(self, pool: str, timeout: float):
+        super().__init__(f"{pool} did not respond within {timeout:g}s")
+        self.pool = pool
+        self.timeout = timeout
+
+
+class BlockingPool:
+    """
+    Bounded thread pool for one blocking integration.
+
+    max_workers caps how many calls run at once; extra calls wait in the
+    executor queue. The timeout covers queue wait plus the call itself.
+    A call that times out while queued is skipped; one that is already
+    running cannot be interrupted, so it keeps its worker until the
+    underlying client returns and its result is discarded.
+    """
+
+    def __init__(self, name: str, max_workers: int = 2, timeout: Optional[float] = None):
+        """
+        Args:
+            name: Integration name, used in thread names, errors and stats
+            max_workers: Concurrent calls allowed
+            timeout: Seconds a caller waits for a result; None waits forever
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'queued': 0,
+            'in_flight': 0,
+            'total_call': 0.0,
+            'max_call': 0.0,
+        }
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking callable on this pool and await its result.
+
+        Raises:
+            IntegrationTimeout: No result within timeout (default: the pool's)
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+
+        state = {'started': False, 'abandoned': False}
+
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['queued'] += 1
+
+        def call():
+            started_at = time.perf_counter()
+            with self._lock:
+                if state['abandoned']:
+                    # The caller gave up while this call was queued; skip it
+                    return None
+                state['started'] = True
+                self._stats['queued'] -= 1
+                self._stats['in_flight'] += 1
+
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with self._lock:
+                    self._stats['in_flight'] -= 1
+                    self._stats['completed'] += 1
+                    self._stats['failed'] += int(failed)
+                    self._stats['total_call'] += elapsed
+                    self._stats['max_call'] = max(self._stats['max_call'], elapsed)
+
+        # Carry the caller's context (current trace span) into the worker thread
+        future = loop.run_in_executor(self._executor, contextvars.copy_context().run, call)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                state['abandoned'] = True
+                if not state['started']:
+                    self._stats['queued'] -= 1
+                self._stats['timed_out'] += 1
+            raise IntegrationTimeout(self.name, timeout)
+
+    def stats(self) -> Dict:
+        """Concurrency, queue depth, timeouts and call latency (milliseconds)"""
+        with self._lock:
+            s = dict(self._stats)
+
+        completed = s['completed'] or 1
+        return {
+            'max_workers': self.max_workers,
+            'timeout_seconds': self.timeout,
+            'submitted': s['submitted'],
+            'completed': s['completed'],
+            'failed': s['failed'],
+            'timed_out': s['timed_out'],
+            'queued': s['queued'],
+            'in_flight': s['in_flight'],
+            'avg_call_ms': round(s['total_call'] / completed * 1000, 3),
+            'max_call_ms': round(s['max_call'] * 1000, 3),
+        }
+
+    def close(self):
+        """Stop accepting calls; calls already running are not waited for"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
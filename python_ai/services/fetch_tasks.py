@@ -0,0 +1,262 @@
+"""
+Background Fetch Tasks
+Fetches jobs for a (city, industry) segment in the background so /match can
+answer from local data immediately. Tasks are tracked by id, and clients can
+poll their status or follow them as a stream of status events. With several
+API workers, task state is mirrored to a shared cache so any worker can
+answer for a task another one runs.
+"""
+
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from services.log import get_logger
+
+logger = get_logger(__name__)
+
+# Task states; the last three are final
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+SHARED_POLL_SECONDS = 1  # How often a worker re-reads the state of a task running in another worker
+
+
+@dataclass
+class FetchTask:
+    """One background fetch for a (city, industry) segment"""
+    id: str
+    city: Optional[str]
+    industry: Optional[str]
+    keywords: List[str]
+    limit: int
+    status: str = QUEUED
+    jobs_fetched: int = 0
+    error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINAL_STATES
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def segment_key(city: Optional[str], industry: Optional[str]) -> tuple:
+    """Case- and whitespace-insensitive key of a (city, industry) segment"""
+    return tuple(' '.join((value or '').split()).lower() for value in (city, industry))
+
+
+class FetchTaskManager:
+    """
+    Runs and tracks background segment fetches on the event loop.
+
+    Submitting a segment that already has a queued or running task returns
+    that task instead of starting another. Finished tasks are kept (up to
+    max_history) so clients can still read their outcome.
+
+    Given a shared cache (SharedCache), every state change is also written
+    there, and get()/events() fall back to it for tasks of other workers.
+    The cache is a SQLite file, so its reads and writes run on `pool`; one
+    writer coroutine publishes the latest state of each changed task in
+    order. Deduplication and list() stay per worker.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Optional[str], Optional[str], List[str], int], Awaitable[int]],
+        max_history: int = 500,
+        shared=None,
+        pool=None
+    ):
+        """
+        Args:
+            fetch: Coroutine function (city, industry, keywords, limit) that
+                fetches and stores jobs and returns how many it stored
+            max_history: Tasks remembered, oldest finished ones dropped first
+            shared: SharedCache mirroring task state across worker processes
+            pool: BlockingPool running the shared cache's reads and writes
+                (required with shared)
+        """
+        self.fetch = fetch
+        self.max_history = max_history
+        self.shared = shared
+        self.pool = pool
+        self._unpublished: Dict[str, Dict] = {}
+        self._publisher: Optional[asyncio.Task] = None
+        self.tasks: 'OrderedDict[str, FetchTask]' = OrderedDict()
+        self._active: Dict[tuple, str] = {}
+        self._runners: Dict[str, asyncio.Task] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._stats = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'jobs_fetched': 0,
+        }
+
+    def submit(
+        self,
+        city: Optional[str],
+        industry: Optional[str],
+        keywords: List[str],
+        limit: int = 20
+    ) -> FetchTask:
+        """Start fetching a segment, or return the task already fetching it"""
+        key = segment_key(city, industry)
+        active_id = self._active.get(key)
+        if active_id is not None:
+            self._stats['deduplicated'] += 1
+            return self.tasks[active_id]
+
+        task = FetchTask(id=uuid.uuid4().hex[:16], city=city, industry=industry, keywords=keywords, limit=limit)
+        self.tasks[task.id] = task
+        self._active[key] = task.id
+        self._changed[task.id] = asyncio.Event()
+        self._runners[task.id] = asyncio.create_task(self._run(task, key))
+        self._stats['submitted'] += 1
+        self._publish(task)
+        self._trim()
+        return task
+
+    async def get(self, task_id: str) -> Optional[FetchTask]:
+        """This worker's task, or the last state another worker shared"""
+        task = self.tasks.get(task_id)
+        if task is None and self.shared is not None:
+            state = await self.pool.run(self.shared.get, task_id)
+            if state is not None:
+                task = FetchTask(**state)
+        return task
+
+    def list(self, active_only: bool = False) -> List[FetchTask]:
+        """Tracked tasks, newest first"""
+        tasks = reversed(self.tasks.values())
+        return [task for task in tasks if not (active_only and task.finished)]
+
+    async def events(self, task_id: str, keepalive: float = 15) -> AsyncIterator[Optional[Dict]]:
+        """
+        Yield the task's state now and after every change until it finishes.
+
+        None is yielded after keepalive seconds without a change, so stream
+        handlers can send a heartbeat.
+        """
+        task = self.tasks.get(task_id)
+        if task is None:
+            async for state in self._shared_events(task_id, keepalive):
+                yield state
+            return
+        while True:
+            changed = self._changed.get(task_id)
+            yield task.to_dict()
+            if task.finished or changed is None:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+
+    async def _shared_events(self, task_id: str, keepalive: float) -> AsyncIterator[Optional[Dict]]:
+        """events() for a task running in another worker, polling the shared state"""
+        last = None
+        quiet = 0.0
+        while True:
+            task = await self.get(task_id)
+            if task is None:
+                return
+            state = task.to_dict()
+            if state != last:
+                yield state
+                last = state
+                quiet = 0.0
+                if task.finished:
+                    return
+            elif quiet >= keepalive:
+                yield None
+                quiet = 0.0
+            await asyncio.sleep(SHARED_POLL_SECONDS)
+            quiet += SHARED_POLL_SECONDS
+
+    async def _run(self, task: FetchTask, key: tuple):
+        try:
+            self._update(task, status=RUNNING, started_at=datetime.now().isoformat())
+            stored = await self.fetch(task.city, task.industry, task.keywords, task.limit)
+            self._stats['succeeded'] += 1
+            self._stats['jobs_fetched'] += stored
+            self._update(task, status=DONE, jobs_fetched=stored)
+        except asyncio.CancelledError:
+            self._update(task, status=CANCELLED)
+            raise
+        except Exception as e:
+            logger.error("Fetch task failed", task=task.id, city=task.city, industry=task.industry, error=str(e))
+            self._stats['failed'] += 1
+            self._update(task, status=FAILED, error=str(e))
+        finally:
+            task.finished_at = datetime.now().isoformat()
+            self._active.pop(key, None)
+            self._runners.pop(task.id, None)
+            self._publish(task)
+            self._notify(task.id)
+
+    def _update(self, task: FetchTask, **changes):
+        for name, value in changes.items():
+            setattr(task, name, value)
+        self._publish(task)
+        self._notify(task.id)
+
+    def _publish(self, task: FetchTask):
+        # Queue the latest state; changes made while a write is in flight are coalesced into the next one
+        if self.shared is None:
+            return
+        self._unpublished[task.id] = task.to_dict()
+        if self._publisher is None or self._publisher.done():
+            self._publisher = asyncio.create_task(self._publish_pending())
+
+    async def _publish_pending(self):
+        while self._unpublished:
+            task_id = next(iter(self._unpublished))
+            state = self._unpublished.pop(task_id)
+            try:
+                await self.pool.run(self.shared.put, task_id, '', state)
+            except Exception as e:
+                # The cache logs its own SQLite errors; this covers the pool (e.g. a timeout)
+                logger.warning("Publishing fetch task state failed", task=task_id, error=str(e), sample=0.1)
+
+    def _notify(self, task_id: str):
+        # Wake current listeners and give later ones a fresh event to wait on
+        changed = self._changed.get(task_id)
+        if changed is not None:
+            changed.set()
+            self._changed[task_id] = asyncio.Event()
+
+    def _trim(self):
+        for task_id in list(self.tasks):
+            if len(self.tasks) <= self.max_history:
+                break
+            if self.tasks[task_id].finished:
+                del self.tasks[task_id]
+                self._changed.pop(task_id, None)
+
+    def stats(self) -> Dict:
+        return {
+            'active': len(self._active),
+            'tracked': len(self.tasks),
+            **self._stats,
+        }
+
+    def close(self):
+        """Cancel tasks still running"""
+        for runner in list(self._runners.values()):
+            runner.cancel()
+        if self._publisher is not None:
+            self._publisher.cancel()
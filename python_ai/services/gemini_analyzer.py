@@ -6,11 +6,15 @@ import google.generativeai as genai
 import json
 import re
 from typing import Dict, List, Optional
-import logging
 import base64
 import io
+import time
 
-logger = logging.getLogger(__name__)
+from services.metrics import metrics
+from services.tracing import tracer
+from services.log import get_logger
+
+logger = get_logger(__name__)
 
 
 class GeminiResumeAnalyzer:
@@ -23,6 +27,10 @@ class GeminiResumeAnalyzer:
         "Fine Arts & Design"
     ]
     
+    MODEL_NAME = 'gemini-2.0-flash'
+    # Bump when the prompts change so cached analyses are recomputed
+    PROMPT_VERSION = 1
+    
     def __init__(self, api_key: str):
         """Initialize Gemini client."""
         self.api_key = api_key
@@ -32,16 +40,49 @@ class GeminiResumeAnalyzer:
             try:
                 genai.configure(api_key=api_key)
                 # Use gemini-2.0-flash (gemini-1.5-flash is deprecated)
-                self.model = genai.GenerativeModel('gemini-2.0-flash')
-                logger.info("Gemini API initialized successfully with gemini-2.0-flash")
+                self.model = genai.GenerativeModel(self.MODEL_NAME)
+                logger.info("Gemini API initialized", model=self.MODEL_NAME)
             except Exception as e:
-                logger.error(f"Failed to initialize Gemini: {e}")
+                logger.error("Failed to initialize Gemini", error=str(e))
                 self.model = None
     
     def is_available(self) -> bool:
         """Check if Gemini API is available."""
         return self.model is not None
     
+    @property
+    def version(self) -> str:
+        """Model and prompt version, for caching analyses."""
+        return f"{self.MODEL_NAME}:{self.PROMPT_VERSION}"
+    
+    def _generate_json(self, contents) -> Dict:
+        """
+        Call Gemini and parse its answer as JSON (markdown code fences stripped).
+        
+        Each call is counted in /metrics as ok, invalid (not JSON) or error.
+        """
+        with tracer.span('gemini.generate_content', kind='client', **{'gemini.model': self.MODEL_NAME}) as span:
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                response = self.model.generate_content(contents)
+                result_text = response.text.strip()
+                
+                # Clean up the response - remove markdown code blocks if present
+                if result_text.startswith('```'):
+                    result_text = re.sub(r'^```(?:json)?\n?', '', result_text)
+                    result_text = re.sub(r'\n?```$', '', result_text)
+                
+                outcome = 'invalid'
+                result = json.loads(result_text)
+                outcome = 'ok'
+                return result
+            finally:
+                span.set_attribute('outcome', outcome)
+                if outcome != 'ok':
+                    span.set_error(outcome)
+                metrics.external_call('gemini', outcome, time.perf_counter() - started)
+    
     def analyze_resume_text(self, resume_text: str) -> Dict:
         """
         Analyze resume text using Gemini.
@@ -73,15 +114,7 @@ Resume:
 Respond ONLY with valid JSON, no markdown formatting or code blocks."""
 
         try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Clean up the response - remove markdown code blocks if present
-            if result_text.startswith('```'):
-                result_text = re.sub(r'^```(?:json)?\n?', '', result_text)
-                result_text = re.sub(r'\n?```$', '', result_text)
-            
-            result = json.loads(result_text)
+            result = self._generate_json(prompt)
             
             # Ensure required fields exist
             result.setdefault('detected_skills', [])
@@ -98,14 +131,14 @@ Respond ONLY with valid JSON, no markdown formatting or code blocks."""
             if result['detected_industry'] not in self.INDUSTRY_LIST:
                 result['detected_industry'] = 'Technology'
             
-            logger.info(f"Gemini analysis complete: {result['detected_industry']} ({result['industry_confidence']}%)")
+            logger.debug("Gemini analysis complete", industry=result['detected_industry'], confidence=result['industry_confidence'])
             return result
             
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Gemini response as JSON: {e}")
+            logger.error("Failed to parse Gemini response as JSON", error=str(e))
             return self._fallback_analysis(resume_text)
         except Exception as e:
-            logger.error(f"Gemini analysis failed: {e}")
+            logger.error("Gemini analysis failed", error=str(e))
             return self._fallback_analysis(resume_text)
     
     def analyze_resume_file(self, file_content: bytes, filename: str, mime_type: str) -> Dict:
@@ -143,7 +176,7 @@ Respond ONLY with valid JSON, no markdown formatting or code blocks."""
             if mime_type == 'application/pdf':
                 extracted_text = self._extract_pdf_text(file_content)
                 if extracted_text and len(extracted_text.strip()) > 50:
-                    logger.info(f"Extracted {len(extracted_text)} chars from PDF, using text analysis")
+                    logger.debug("Extracted PDF text, using text analysis", chars=len(extracted_text))
                     result = self.analyze_resume_text(extracted_text)
                     result['extracted_text'] = extracted_text
                     result['extraction_method'] = 'pdfminer'
@@ -154,7 +187,7 @@ Respond ONLY with valid JSON, no markdown formatting or code blocks."""
                     
                     # Try Gemini multimodal as fallback (if available and quota permits)
                     if self.model:
-                        logger.info("Attempting Gemini multimodal analysis for image-based PDF...")
+                        logger.debug("Attempting Gemini multimodal analysis for image-based PDF")
                         try:
                             # Use Gemini's inline data format for PDF
                             file_part = {
@@ -164,18 +197,10 @@ Respond ONLY with valid JSON, no markdown formatting or code blocks."""
                                 }
                             }
                             
-                            response = self.model.generate_content([prompt, file_part])
-                            result_text = response.text.strip()
-                            
-                            # Clean up markdown formatting
-                            if result_text.startswith('```'):
-                                result_text = re.sub(r'^```(?:json)?\n?', '', result_text)
-                                result_text = re.sub(r'\n?```$', '', result_text)
-                            
-                            result = json.loads(result_text)
+                            result = self._generate_json([prompt, file_part])
                             result['extraction_method'] = 'gemini_multimodal'
                         except Exception as multimodal_error:
-                            logger.error(f"Gemini multimodal failed: {multimodal_error}")
+                            logger.error("Gemini multimodal analysis failed", error=str(multimodal_error))
                             # Return error with helpful message
                             return {
                                 "error": "This PDF appears to be image-based (scanned). Please use a text-based PDF, or copy and paste your resume text directly.",
@@ -220,14 +245,14 @@ Respond ONLY with valid JSON, no markdown formatting or code blocks."""
             if result['detected_industry'] not in self.INDUSTRY_LIST:
                 result['detected_industry'] = 'Technology'
             
-            logger.info(f"Gemini file analysis complete: {result['detected_industry']} ({result['industry_confidence']}%)")
+            logger.debug("Gemini file analysis complete", industry=result['detected_industry'], confidence=result['industry_confidence'])
             return result
             
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Gemini file response as JSON: {e}")
+            logger.error("Failed to parse Gemini file response as JSON", error=str(e))
             return {"error": str(e), "detected_skills": [], "detected_industry": "Technology"}
         except Exception as e:
-            logger.error(f"Gemini file analysis failed: {e}")
+            logger.error("Gemini file analysis failed", error=str(e))
             return {"error": str(e), "detected_skills": [], "detected_industry": "Technology"}
     
     def _extract_pdf_text(self, file_content: bytes) -> Optional[str]:
@@ -242,19 +267,19 @@ Respond ONLY with valid JSON, no markdown formatting or code blocks."""
                 # Clean up the text - remove excessive whitespace
                 lines = [line.strip() for line in text.split('\n') if line.strip()]
                 cleaned_text = '\n'.join(lines)
-                logger.info(f"PDF text extraction successful: {len(cleaned_text)} characters")
+                logger.debug("PDF text extracted", chars=len(cleaned_text))
                 return cleaned_text
             else:
                 logger.warning("PDF text extraction returned empty text - PDF may be image-based")
                 return None
         except PDFSyntaxError as e:
-            logger.error(f"PDF syntax error: {e}")
+            logger.error("PDF syntax error", error=str(e))
             return None
         except ImportError:
             logger.error("pdfminer not installed")
             return None
         except Exception as e:
-            logger.error(f"PDF text extraction failed: {e}")
+            logger.error("PDF text extraction failed", error=str(e))
             return None
     
     def _extract_docx_text(self, file_content: bytes) -> Optional[str]:
@@ -270,7 +295,7 @@ Respond ONLY with valid JSON, no markdown formatting or code blocks."""
             logger.warning("python-docx not installed, cannot extract DOCX text")
             return None
         except Exception as e:
-            logger.error(f"Failed to extract DOCX text: {e}")
+            logger.error("Failed to extract DOCX text", error=str(e))
             return None
     
     def _fallback_analysis(self, text: str) -> Dict:
@@ -2,18 +2,31 @@
 Job API Service Layer - Integration with external job APIs.
 """
 import time
-import logging
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
 import requests
 from datetime import datetime
 
-logger = logging.getLogger(__name__)
+from services.metrics import metrics
+from services.tracing import tracer
+from services.log import get_logger
+
+logger = get_logger(__name__)
 
 
 class JobAPIClient(ABC):
     """Abstract base class for job API clients."""
 
+    service = 'job_api'  # Label for this provider's calls in /metrics
+
+    def record_call(self, outcome: str, started: float):
+        """Count one provider call (ok/empty/error/timeout) and its duration, and tag the call's span."""
+        metrics.external_call(self.service, outcome, time.perf_counter() - started)
+        span = tracer.current_span()
+        span.set_attribute('outcome', outcome)
+        if outcome in ('error', 'timeout'):
+            span.set_error(outcome)
+
     @abstractmethod
     def fetch_jobs(self, location: str, keywords: Optional[List[str]] = None, limit: int = 20) -> List[Dict]:
         """
@@ -50,13 +63,15 @@ class JobAPIClient(ABC):
             logger.warning("Rate limit exceeded")
             return False
         else:
-            logger.error(f"API error: {response.status_code}")
+            logger.error("API error", status=response.status_code)
             return False
 
 
 class ApifyJobStreetClient(JobAPIClient):
     """JobStreet API client via Apify scraper."""
 
+    service = 'jobstreet'
+
     def __init__(self, api_key: str, timeout: int = 120):
         self.api_key = api_key
         self.timeout = timeout
@@ -64,6 +79,7 @@ class ApifyJobStreetClient(JobAPIClient):
 
     def fetch_jobs(self, location: str, keywords: Optional[List[str]] = None, limit: int = 20) -> List[Dict]:
         """Fetch jobs from JobStreet via Apify."""
+        started = time.perf_counter()
         try:
             # Build search query - keep it simple for better results
             search_query = " ".join(keywords) if keywords else "software"
@@ -81,11 +97,8 @@ class ApifyJobStreetClient(JobAPIClient):
 
             url = f"{self.base_url}?token={self.api_key}"
 
-            print(f"[DEBUG] Fetching JobStreet jobs for {location} with query: {search_query}")
-            print(f"[DEBUG] API URL: {self.base_url}")
-            print(f"[DEBUG] Payload: {payload}")
-            print(f"[DEBUG] Timeout: {self.timeout} seconds")
-            logger.info(f"Fetching JobStreet jobs for {location} with query: {search_query}")
+            logger.info("Fetching JobStreet jobs", location=location, query=search_query)
+            logger.debug("JobStreet request", url=self.base_url, payload=payload, timeout=self.timeout)
 
             response = requests.post(
                 url,
@@ -94,44 +107,45 @@ class ApifyJobStreetClient(JobAPIClient):
                 timeout=self.timeout
             )
 
-            print(f"[DEBUG] Response status: {response.status_code}")
-            print(f"[DEBUG] Response headers: {response.headers}")
-
             if not self.validate_response(response):
-                print(f"[ERROR] Response validation failed: {response.text[:500]}")
+                logger.error("JobStreet response validation failed", status=response.status_code, body=response.text)
+                self.record_call('error', started)
                 return []
 
             data = response.json()
-            print(f"[DEBUG] Response type: {type(data)}")
-            print(f"[DEBUG] Response length: {len(data) if isinstance(data, list) else 'N/A'}")
-            print(f"[DEBUG] First item keys: {list(data[0].keys()) if data and isinstance(data, list) else 'N/A'}")
-            print(f"[DEBUG] First item sample: {data[0] if data and isinstance(data, list) else 'N/A'}")
+            logger.debug(
+                "JobStreet response",
+                status=response.status_code,
+                items=len(data) if isinstance(data, list) else None,
+                first_item=data[0] if data and isinstance(data, list) else None,
+                sample=0.1,
+            )
 
             jobs = []
+            failed = 0
 
             for item in data:
                 try:
                     job = self.transform_to_internal_format(item)
                     jobs.append(job)
                 except Exception as e:
-                    print(f"[ERROR] Failed to transform job: {e}")
-                    print(f"[ERROR] Job item: {item}")
-                    logger.warning(f"Failed to transform job: {e}")
+                    failed += 1
+                    logger.debug("Failed to transform JobStreet job", error=str(e), item=item, sample=0.1)
                     continue
 
-            print(f"[SUCCESS] Successfully fetched {len(jobs)} jobs from JobStreet")
-            logger.info(f"Successfully fetched {len(jobs)} jobs from JobStreet")
+            if failed:
+                logger.warning("Skipped JobStreet jobs that could not be transformed", failed=failed)
+            logger.info("Fetched JobStreet jobs", location=location, jobs=len(jobs))
+            self.record_call('ok' if jobs else 'empty', started)
             return jobs
 
         except requests.Timeout:
-            print(f"[ERROR] API request timed out after {self.timeout} seconds")
-            logger.error(f"API request timed out after {self.timeout} seconds")
+            logger.error("JobStreet request timed out", timeout=self.timeout)
+            self.record_call('timeout', started)
             return []
-        except Exception as e:
-            print(f"[ERROR] Error fetching jobs from Apify: {e}")
-            import traceback
-            traceback.print_exc()
-            logger.error(f"Error fetching jobs from Apify: {e}")
+        except Exception:
+            logger.exception("Error fetching jobs from JobStreet")
+            self.record_call('error', started)
             return []
 
     def transform_to_internal_format(self, external_job: Dict) -> Dict:
@@ -312,6 +326,8 @@ class ApifyJobStreetClient(JobAPIClient):
 class RapidAPIJobClient(JobAPIClient):
     """RapidAPI Jobs Search client."""
 
+    service = 'rapidapi'
+
     def __init__(self, api_key: str, timeout: int = 10):
         self.api_key = api_key
         self.timeout = timeout
@@ -319,6 +335,7 @@ class RapidAPIJobClient(JobAPIClient):
 
     def fetch_jobs(self, location: str, keywords: Optional[List[str]] = None, limit: int = 20) -> List[Dict]:
         """Fetch jobs from RapidAPI."""
+        started = time.perf_counter()
         try:
             query = " ".join(keywords) if keywords else "software developer"
 
@@ -333,7 +350,7 @@ class RapidAPIJobClient(JobAPIClient):
                 "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
             }
 
-            logger.info(f"Fetching jobs from RapidAPI for {location}")
+            logger.info("Fetching RapidAPI jobs", location=location)
 
             response = requests.get(
                 self.base_url,
@@ -343,24 +360,36 @@ class RapidAPIJobClient(JobAPIClient):
             )
 
             if not self.validate_response(response):
+                self.record_call('error', started)
                 return []
 
             data = response.json()
             jobs = []
 
+            failed = 0
+
             for item in data.get('data', [])[:limit]:
                 try:
                     job = self.transform_to_internal_format(item)
                     jobs.append(job)
                 except Exception as e:
-                    logger.warning(f"Failed to transform job: {e}")
+                    failed += 1
+                    logger.debug("Failed to transform RapidAPI job", error=str(e), item=item, sample=0.1)
                     continue
 
-            logger.info(f"Successfully fetched {len(jobs)} jobs from RapidAPI")
+            if failed:
+                logger.warning("Skipped RapidAPI jobs that could not be transformed", failed=failed)
+            logger.info("Fetched RapidAPI jobs", location=location, jobs=len(jobs))
+            self.record_call('ok' if jobs else 'empty', started)
             return jobs
 
-        except Exception as e:
-            logger.error(f"Error fetching jobs from RapidAPI: {e}")
+        except requests.Timeout:
+            logger.error("RapidAPI request timed out", timeout=self.timeout)
+            self.record_call('timeout', started)
+            return []
+        except Exception:
+            logger.exception("Error fetching jobs from RapidAPI")
+            self.record_call('error', started)
             return []
 
     def transform_to_internal_format(self, external_job: Dict) -> Dict:
@@ -388,6 +417,8 @@ class RapidAPIJobClient(JobAPIClient):
 class ApifyIndeedClient(JobAPIClient):
     """Indeed Jobs Scraper client via Apify (PPR actor)."""
 
+    service = 'indeed'
+
     def __init__(self, api_key: str, timeout: int = 120):
         self.api_key = api_key
         self.timeout = timeout
@@ -396,6 +427,7 @@ class ApifyIndeedClient(JobAPIClient):
 
     def fetch_jobs(self, location: str, keywords: Optional[List[str]] = None, limit: int = 20) -> List[Dict]:
         """Fetch jobs from Indeed via Apify."""
+        started = time.perf_counter()
         try:
             # Build search position from keywords
             position = " ".join(keywords) if keywords else "software developer"
@@ -414,10 +446,8 @@ class ApifyIndeedClient(JobAPIClient):
 
             url = f"{self.base_url}?token={self.api_key}"
 
-            print(f"[DEBUG] Fetching Indeed jobs for {location} with position: {position}")
-            print(f"[DEBUG] Indeed API URL: {self.base_url}")
-            print(f"[DEBUG] Indeed Payload: {payload}")
-            logger.info(f"Fetching Indeed jobs for {location} with position: {position}")
+            logger.info("Fetching Indeed jobs", location=location, position=position)
+            logger.debug("Indeed request", url=self.base_url, payload=payload, timeout=self.timeout)
 
             response = requests.post(
                 url,
@@ -426,48 +456,52 @@ class ApifyIndeedClient(JobAPIClient):
                 timeout=self.timeout
             )
 
-            print(f"[DEBUG] Indeed Response status: {response.status_code}")
-
             if not self.validate_response(response):
-                print(f"[ERROR] Indeed Response validation failed: {response.text[:500]}")
+                logger.error("Indeed response validation failed", status=response.status_code, body=response.text)
+                self.record_call('error', started)
                 return []
 
             data = response.json()
-            print(f"[DEBUG] Indeed Response type: {type(data)}")
-            print(f"[DEBUG] Indeed Response length: {len(data) if isinstance(data, list) else 'N/A'}")
-            if data and isinstance(data, list) and len(data) > 0:
-                print(f"[DEBUG] Indeed First item keys: {list(data[0].keys())}")
-                print(f"[DEBUG] Indeed First item sample: {data[0]}")
+            logger.debug(
+                "Indeed response",
+                status=response.status_code,
+                items=len(data) if isinstance(data, list) else None,
+                first_item=data[0] if data and isinstance(data, list) else None,
+                sample=0.1,
+            )
 
             jobs = []
+            errors = 0
+            failed = 0
 
             for item in data:
                 # Skip error responses
                 if 'error' in item:
-                    print(f"[DEBUG] Indeed returned error: {item['error']}")
+                    errors += 1
+                    logger.debug("Indeed returned error item", error=item['error'], sample=0.1)
                     continue
                     
                 try:
                     job = self.transform_to_internal_format(item)
                     jobs.append(job)
                 except Exception as e:
-                    print(f"[ERROR] Failed to transform Indeed job: {e}")
-                    logger.warning(f"Failed to transform Indeed job: {e}")
+                    failed += 1
+                    logger.debug("Failed to transform Indeed job", error=str(e), item=item, sample=0.1)
                     continue
 
-            print(f"[SUCCESS] Successfully fetched {len(jobs)} jobs from Indeed")
-            logger.info(f"Successfully fetched {len(jobs)} jobs from Indeed")
+            if errors or failed:
+                logger.warning("Skipped Indeed items", error_items=errors, failed=failed)
+            logger.info("Fetched Indeed jobs", location=location, jobs=len(jobs))
+            self.record_call('ok' if jobs else 'empty', started)
             return jobs
 
         except requests.Timeout:
-            print(f"[ERROR] Indeed API request timed out after {self.timeout} seconds")
-            logger.error(f"Indeed API request timed out after {self.timeout} seconds")
+            logger.error("Indeed request timed out", timeout=self.timeout)
+            self.record_call('timeout', started)
             return []
-        except Exception as e:
-            print(f"[ERROR] Error fetching jobs from Indeed Apify: {e}")
-            import traceback
-            traceback.print_exc()
-            logger.error(f"Error fetching jobs from Indeed Apify: {e}")
+        except Exception:
+            logger.exception("Error fetching jobs from Indeed")
+            self.record_call('error', started)
             return []
 
     def transform_to_internal_format(self, external_job: Dict) -> Dict:
@@ -683,56 +717,63 @@ class JobAPIOrchestrator:
 
         Tries primary API first, then falls back to other providers.
         """
-        # Check cache first
-        cache_key = f"{location}_{','.join(keywords or [])}_{limit}"
-        if self.settings.ENABLE_CACHE and cache_key in self.cache:
-            cache_entry = self.cache[cache_key]
-            if time.time() - cache_entry['timestamp'] < self.cache_ttl:
-                logger.info(f"Returning cached jobs for {location}")
-                return cache_entry['jobs']
-
-        # Try primary API
-        primary_api = self.settings.PRIMARY_JOB_API
-
-        if primary_api in self.clients:
-            jobs = self._fetch_with_retry(
-                self.clients[primary_api],
-                location,
-                keywords,
-                limit
-            )
+        attributes = {'job_api.location': location, 'job_api.keywords': keywords or [], 'job_api.limit': limit}
+        with tracer.span('job_api.fetch_jobs', **attributes) as span:
+            # Check cache first
+            cache_key = f"{location}_{','.join(keywords or [])}_{limit}"
+            if self.settings.ENABLE_CACHE:
+                cache_entry = self.cache.get(cache_key)
+                hit = cache_entry is not None and time.time() - cache_entry['timestamp'] < self.cache_ttl
+                metrics.cache('job_api', hit)
+                span.set_attribute('cache_hit', hit)
+                if hit:
+                    logger.debug("Returning cached jobs", location=location)
+                    return cache_entry['jobs']
+
+            # Try primary API
+            primary_api = self.settings.PRIMARY_JOB_API
+
+            if primary_api in self.clients:
+                jobs = self._fetch_with_retry(
+                    self.clients[primary_api],
+                    location,
+                    keywords,
+                    limit
+                )
 
-            if jobs:
-                # Cache results
-                if self.settings.ENABLE_CACHE:
-                    self.cache[cache_key] = {
-                        'jobs': jobs,
-                        'timestamp': time.time()
-                    }
-                return jobs
-
-        # Try fallback APIs
-        if self.settings.ENABLE_FALLBACK:
-            for api_name, client in self.clients.items():
-                if api_name != primary_api:
-                    logger.info(f"Trying fallback API: {api_name}")
-                    jobs = self._fetch_with_retry(client, location, keywords, limit)
-                    if jobs:
-                        return jobs
-
-        logger.warning("All APIs failed, returning empty list")
-        return []
+                if jobs:
+                    # Cache results
+                    if self.settings.ENABLE_CACHE:
+                        self.cache[cache_key] = {
+                            'jobs': jobs,
+                            'timestamp': time.time()
+                        }
+                    return jobs
+
+            # Try fallback APIs
+            if self.settings.ENABLE_FALLBACK:
+                for api_name, client in self.clients.items():
+                    if api_name != primary_api:
+                        logger.info("Trying fallback API", api=api_name)
+                        jobs = self._fetch_with_retry(client, location, keywords, limit)
+                        if jobs:
+                            return jobs
+
+            logger.warning("All APIs failed, returning empty list")
+            return []
 
     def _fetch_with_retry(self, client: JobAPIClient, location: str,
                          keywords: Optional[List[str]], limit: int) -> List[Dict]:
         """Fetch jobs with exponential backoff retry."""
         for attempt in range(self.settings.API_RETRY_COUNT):
             try:
-                jobs = client.fetch_jobs(location, keywords, limit)
+                # Clients tag this span with the call's outcome (record_call)
+                with tracer.span(f'{client.service}.fetch_jobs', kind='client', attempt=attempt + 1):
+                    jobs = client.fetch_jobs(location, keywords, limit)
                 if jobs:
                     return jobs
             except Exception as e:
-                logger.error(f"Attempt {attempt + 1} failed: {e}")
+                logger.error("Job API attempt failed", service=client.service, attempt=attempt + 1, error=str(e))
                 if attempt < self.settings.API_RETRY_COUNT - 1:
                     sleep_time = 2 ** attempt  # Exponential backoff
                     time.sleep(sleep_time)
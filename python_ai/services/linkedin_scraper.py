@@ -3,12 +3,15 @@ LinkedIn Profile Scraper Service
 Uses Apify's LinkedIn Profile Scraper to fetch public profile data.
 """
 import requests
-import logging
 import re
 from typing import Dict, List, Optional
 import time
 
-logger = logging.getLogger(__name__)
+from services.metrics import metrics
+from services.tracing import tracer
+from services.log import get_logger
+
+logger = get_logger(__name__)
 
 
 class LinkedInScraper:
@@ -63,56 +66,66 @@ class LinkedInScraper:
         if not self.is_valid_linkedin_url(linkedin_url):
             return {"error": "Invalid LinkedIn URL", "scraped": False}
         
-        logger.info(f"Scraping LinkedIn profile: {linkedin_url}")
+        logger.info("Scraping LinkedIn profile", url=linkedin_url)
         
-        try:
-            # Run the Apify actor
-            run_url = f"{self.base_url}/acts/{self.ACTOR_ID}/runs"
-            
-            payload = {
-                "profileUrls": [linkedin_url],
-                "proxyConfiguration": {
-                    "useApifyProxy": True
+        with tracer.span('linkedin.scrape_profile', kind='client', **{'linkedin.url': linkedin_url}) as span:
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                # Run the Apify actor
+                run_url = f"{self.base_url}/acts/{self.ACTOR_ID}/runs"
+                
+                payload = {
+                    "profileUrls": [linkedin_url],
+                    "proxyConfiguration": {
+                        "useApifyProxy": True
+                    }
                 }
-            }
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Start the actor run
-            response = requests.post(
-                run_url,
-                json=payload,
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code != 201:
-                logger.error(f"Failed to start LinkedIn scraper: {response.status_code}")
-                return {"error": f"Scraper failed to start: {response.status_code}", "scraped": False}
-            
-            run_data = response.json()
-            run_id = run_data.get("data", {}).get("id")
-            
-            if not run_id:
-                return {"error": "Failed to get run ID", "scraped": False}
-            
-            # Wait for the run to complete
-            result = self._wait_for_run(run_id)
-            
-            if result:
-                return self._transform_profile_data(result)
-            else:
-                return {"error": "Scraping timed out or failed", "scraped": False}
                 
-        except requests.Timeout:
-            logger.error("LinkedIn scraping timed out")
-            return {"error": "Request timed out", "scraped": False}
-        except Exception as e:
-            logger.error(f"LinkedIn scraping failed: {e}")
-            return {"error": str(e), "scraped": False}
+                headers = {
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                }
+                
+                # Start the actor run
+                response = requests.post(
+                    run_url,
+                    json=payload,
+                    headers=headers,
+                    timeout=30
+                )
+                
+                if response.status_code != 201:
+                    logger.error("Failed to start LinkedIn scraper", status=response.status_code, body=response.text)
+                    return {"error": f"Scraper failed to start: {response.status_code}", "scraped": False}
+                
+                run_data = response.json()
+                run_id = run_data.get("data", {}).get("id")
+                
+                if not run_id:
+                    return {"error": "Failed to get run ID", "scraped": False}
+                
+                # Wait for the run to complete
+                result = self._wait_for_run(run_id)
+                
+                if result:
+                    outcome = 'ok'
+                    return self._transform_profile_data(result)
+                else:
+                    return {"error": "Scraping timed out or failed", "scraped": False}
+                    
+            except requests.Timeout:
+                logger.error("LinkedIn scraping timed out")
+                outcome = 'timeout'
+                return {"error": "Request timed out", "scraped": False}
+            except Exception as e:
+                logger.error("LinkedIn scraping failed", error=str(e))
+                return {"error": str(e), "scraped": False}
+            finally:
+                span.set_attribute('outcome', outcome)
+                if outcome != 'ok':
+                    span.set_error(outcome)
+                metrics.external_call('linkedin', outcome, time.perf_counter() - started)
     
     def _wait_for_run(self, run_id: str, max_wait: int = 60) -> Optional[Dict]:
         """Wait for Apify actor run to complete and return results."""
@@ -121,34 +134,37 @@ class LinkedInScraper:
         
         headers = {"Authorization": f"Bearer {self.api_key}"}
         
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            try:
-                # Check run status
-                status_response = requests.get(status_url, headers=headers, timeout=10)
-                if status_response.status_code == 200:
-                    status_data = status_response.json()
-                    status = status_data.get("data", {}).get("status")
+        with tracer.span('linkedin.wait_for_run', **{'apify.run_id': run_id}) as span:
+            start_time = time.time()
+            while time.time() - start_time < max_wait:
+                try:
+                    # Check run status
+                    status_response = requests.get(status_url, headers=headers, timeout=10)
+                    if status_response.status_code == 200:
+                        status_data = status_response.json()
+                        status = status_data.get("data", {}).get("status")
+                        span.set_attribute('apify.status', status)
+                        
+                        if status == "SUCCEEDED":
+                            # Get results
+                            results_response = requests.get(dataset_url, headers=headers, timeout=10)
+                            if results_response.status_code == 200:
+                                results = results_response.json()
+                                if results and len(results) > 0:
+                                    return results[0]
+                            break
+                        elif status in ["FAILED", "ABORTED", "TIMED-OUT"]:
+                            logger.error("LinkedIn scraper run failed", status=status)
+                            span.set_error(f"Run {status}")
+                            break
                     
-                    if status == "SUCCEEDED":
-                        # Get results
-                        results_response = requests.get(dataset_url, headers=headers, timeout=10)
-                        if results_response.status_code == 200:
-                            results = results_response.json()
-                            if results and len(results) > 0:
-                                return results[0]
-                        break
-                    elif status in ["FAILED", "ABORTED", "TIMED-OUT"]:
-                        logger.error(f"LinkedIn scraper run failed with status: {status}")
-                        break
-                
-                time.sleep(3)  # Poll every 3 seconds
-                
-            except Exception as e:
-                logger.error(f"Error checking run status: {e}")
-                time.sleep(3)
-        
-        return None
+                    time.sleep(3)  # Poll every 3 seconds
+                    
+                except Exception as e:
+                    logger.error("Error checking LinkedIn run status", error=str(e))
+                    time.sleep(3)
+            
+            return None
     
     def _transform_profile_data(self, raw_data: Dict) -> Dict:
         """Transform raw Apify response to our internal format."""
@@ -215,7 +231,7 @@ class LinkedInScraper:
             }
             
         except Exception as e:
-            logger.error(f"Failed to transform LinkedIn data: {e}")
+            logger.error("Failed to transform LinkedIn data", error=str(e))
             return {"error": f"Failed to parse profile: {e}", "scraped": False}
     
     def calculate_profile_boost(self, profile_data: Dict) -> Dict:
@@ -0,0 +1,215 @@
+"""
+Structured Logging
+Leveled key-value logging for the API, services and models. Records are
+handed to a bounded queue and written by a listener thread, so log I/O
+never runs on a request thread; repetitive messages can be sampled and
+long values are truncated.
+"""
+
+import copy
+import json
+import queue
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from services.tracing import tracer
+
+# Keyword arguments that belong to logging itself rather than the record's fields
+_LOGGING_KWARGS = ('exc_info', 'stack_info', 'stacklevel', 'extra')
+
+_stats = {'dropped': 0, 'sampled_out': 0}
+_listener: Optional[QueueListener] = None
+_handler: Optional['DroppingQueueHandler'] = None
+
+
+def _truncate(value, limit: int):
+    if isinstance(value, (bool, int, float)) or value is None:
+        return value
+    text = value if isinstance(value, str) else str(value)
+    if len(text) > limit:
+        return text[:limit] + f'...[{len(text) - limit} more chars]'
+    return text
+
+
+class _Sampler:
+    """Keeps the first of every `every` records per message template"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def keep(self, key: str, rate: float) -> bool:
+        every = max(1, round(1 / rate)) if rate > 0 else 0
+        if every == 1:
+            return True
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return every > 0 and count % every == 0
+
+
+_sampler = _Sampler()
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    Logger taking key-value fields as keyword arguments:
+
+        log.info("Fetched jobs", provider='jobstreet', count=20)
+        log.debug("No profile provided", sample=0.01)   # keep ~1 in 100
+
+    `sample` drops a share of a message's records before any work is done
+    for them; kept records note the rate they were sampled at. Records
+    logged inside a traced request carry its trace_id.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(logging.getLogger(name), {})
+
+    def log(self, level, msg, *args, sample: Optional[float] = None, **kwargs):
+        if not self.isEnabledFor(level):
+            return
+        if sample is not None and sample < 1:
+            if not _sampler.keep(f'{self.logger.name}:{msg}', sample):
+                _stats['sampled_out'] += 1
+                return
+            kwargs['sample_rate'] = sample
+        msg, kwargs = self.process(msg, kwargs)
+        self.logger.log(level, msg, *args, **kwargs)
+
+    def process(self, msg, kwargs):
+        options = {key: kwargs.pop(key) for key in _LOGGING_KWARGS if key in kwargs}
+        extra = dict(options.get('extra') or {})
+        trace_id = tracer.current_span().trace_id
+        if trace_id:
+            kwargs['trace_id'] = trace_id
+        if kwargs:
+            extra['fields'] = kwargs
+        options['extra'] = extra
+        return msg, options
+
+    # LoggerAdapter's helpers route through log(); these keep `sample` and fields working for each level
+    def debug(self, msg, *args, **kwargs):
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        self.log(logging.ERROR, msg, *args, exc_info=exc_info, **kwargs)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, fields, exception"""
+
+    def __init__(self, max_chars: int = 512):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': _truncate(record.getMessage(), self.max_chars),
+        }
+        for key, value in (getattr(record, 'fields', None) or {}).items():
+            entry.setdefault(key, _truncate(value, self.max_chars))
+        if record.exc_text:
+            entry['exception'] = record.exc_text[-4 * self.max_chars:]
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable line with fields appended as key=value"""
+
+    def __init__(self, max_chars: int = 512):
+        super().__init__('%(asctime)s %(levelname)s %(name)s %(message)s')
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f'{key}={_truncate(value, self.max_chars)}' for key, value in fields.items())
+        return line
+
+    def formatException(self, exc_info) -> str:
+        return super().formatException(exc_info)[-4 * self.max_chars:]
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or raising"""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats['dropped'] += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render any traceback now (the objects may change later); formatting happens on the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level: str = 'INFO', fmt: str = 'json', max_chars: int = 512, queue_size: int = 10000):
+    """
+    Route the root logger through a bounded queue to stderr.
+
+    Args:
+        level: Root log level name
+        fmt: 'json' (one object per line) or 'text'
+        max_chars: Longest message or field value written; longer ones are truncated
+        queue_size: Records buffered before new ones are dropped
+    """
+    global _listener, _handler
+    stop_logging()
+
+    output = logging.StreamHandler()
+    output.setFormatter(JsonFormatter(max_chars) if fmt == 'json' else TextFormatter(max_chars))
+    log_queue = queue.Queue(maxsize=queue_size)
+    _handler = DroppingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, output, respect_handler_level=False)
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, DroppingQueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    root.setLevel(level.upper())
+    _listener.start()
+
+
+def stop_logging():
+    """Write queued records and stop the listener thread"""
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().removeHandler(_handler)
+    _listener = None
+    _handler = None
+
+
+def log_stats() -> Dict:
+    return {
+        'queued': _handler.queue.qsize() if _handler else 0,
+        **_stats,
+    }
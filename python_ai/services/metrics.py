@@ -0,0 +1,210 @@
+"""
+Latency Metrics
+Per-stage and per-endpoint latency histograms plus event counters, exposed
+in the Prometheus text format (GET /metrics) and, for the stages of one
+request, as a Server-Timing response header.
+"""
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; from sub-millisecond in-memory work up to the slowest scraper calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for key, value in values:
+            lines.append(f'{self.name}{_label_text(self.labelnames, key)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label combination"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(s[0]), s[1], s[2]) for key, s in self._series.items())
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                lines.append(f'{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_bucket{_label_text(self.labelnames, key, INF_LABEL)} {count}')
+            lines.append(f'{self.name}_sum{_label_text(self.labelnames, key)} {repr(total)}')
+            lines.append(f'{self.name}_count{_label_text(self.labelnames, key)} {count}')
+        return lines
+
+
+class RequestTimer:
+    """Stage timings of one HTTP request, collected for its Server-Timing header"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.endpoint = 'unmatched'
+        self.stages: Dict[str, float] = {}
+        self.finished = False
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        entries = [f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in self.stages.items()]
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+
+_current_request: ContextVar[Optional[RequestTimer]] = ContextVar('current_request', default=None)
+
+
+class Metrics:
+    """
+    Process-wide metrics registry for the API.
+
+    Stage timings inside a request are summed per stage and observed once
+    the response is ready, labelled with the matched route; stages that run
+    after that (streamed bodies) or outside any request are observed right
+    away. Each worker process keeps its own registry.
+    """
+
+    def __init__(self):
+        self.request_seconds = Histogram(
+            'nextstep_request_duration_seconds',
+            'Time to produce a response (streamed bodies excluded), by endpoint',
+            ('method', 'endpoint', 'status')
+        )
+        self.stage_seconds = Histogram(
+            'nextstep_stage_duration_seconds',
+            'Time spent in one stage of handling a request',
+            ('endpoint', 'stage')
+        )
+        self.cache_events = Counter(
+            'nextstep_cache_events_total',
+            'Cache lookups by cache and result (hit/miss)',
+            ('cache', 'result')
+        )
+        self.external_calls = Counter(
+            'nextstep_external_calls_total',
+            'Calls to external services by service and outcome (ok/empty/invalid/error/timeout)',
+            ('service', 'outcome')
+        )
+        self.external_seconds = Histogram(
+            'nextstep_external_call_duration_seconds',
+            'Duration of calls to external services',
+            ('service',)
+        )
+        self._collectors = [
+            self.request_seconds, self.stage_seconds, self.cache_events, self.external_calls, self.external_seconds
+        ]
+
+    def start_request(self) -> RequestTimer:
+        timer = RequestTimer()
+        _current_request.set(timer)
+        return timer
+
+    def finish_request(self, timer: RequestTimer, method: str, endpoint: str, status: int) -> str:
+        """Record the request and its stages; returns the Server-Timing header value"""
+        total = time.perf_counter() - timer.started
+        timer.endpoint = endpoint
+        timer.finished = True
+        self.request_seconds.observe(total, method=method, endpoint=endpoint, status=status)
+        for stage, seconds in timer.stages.items():
+            self.stage_seconds.observe(seconds, endpoint=endpoint, stage=stage)
+        return timer.server_timing(total)
+
+    def observe_stage(self, stage: str, seconds: float):
+        timer = _current_request.get()
+        if timer is not None and not timer.finished:
+            timer.add(stage, seconds)
+        else:
+            self.stage_seconds.observe(seconds, endpoint=timer.endpoint if timer else 'background', stage=stage)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block (which may await) as one stage of the current request"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - started)
+
+    def cache(self, cache: str, hit: bool):
+        self.cache_events.inc(cache=cache, result='hit' if hit else 'miss')
+
+    def external_call(self, service: str, outcome: str, seconds: float):
+        self.external_calls.inc(service=service, outcome=outcome)
+        self.external_seconds.observe(seconds, service=service)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for collector in self._collectors:
+            lines.extend(collector.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
@@ -0,0 +1,76 @@
+"""
+Single-Flight Call Coalescing
+Concurrent identical calls to a slow external service share one in-flight
+call and its result instead of each paying for their own.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+def flight_key(*parts, **params) -> str:
+    """
+    Canonical key for a call's parameters.
+
+    Strings are compared case- and whitespace-insensitively, keyword
+    arguments in any order; list order is kept.
+    """
+    def norm(value):
+        if isinstance(value, str):
+            return ' '.join(value.split()).lower()
+        if isinstance(value, (list, tuple)):
+            return [norm(item) for item in value]
+        if isinstance(value, dict):
+            return {str(k): norm(v) for k, v in value.items()}
+        return value
+
+    return json.dumps([norm(list(parts)), norm(params)], sort_keys=True, default=str)
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+
+    The first caller for a key starts the call; callers arriving while it is
+    in flight await the same result (or exception). Nothing is cached once
+    the call finishes. The call runs as its own task, so a caller that goes
+    away (e.g. a client disconnect) does not cancel it for the others.
+
+    Results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {
+            'calls': 0,
+            'started': 0,
+            'coalesced': 0,
+            'failed': 0,
+        }
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await func(), or the identical call already in flight for key"""
+        self._stats['calls'] += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            self._stats['started'] += 1
+            flight = asyncio.ensure_future(func())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self._stats['coalesced'] += 1
+        return await asyncio.shield(flight)
+
+    def _finished(self, key: Hashable, flight: asyncio.Task):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.cancelled() or flight.exception() is not None:
+            self._stats['failed'] += 1
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': len(self._flights),
+            **self._stats,
+        }
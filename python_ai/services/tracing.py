@@ -0,0 +1,359 @@
+"""
+Request Tracing
+Per-request trace ids and nested spans across the API, its integrations and
+the database, written to a local rotating file as OTLP/JSON so a slow
+request can be broken down after the fact without a live collector.
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import random
+import socket
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# OTLP enum values
+SPAN_KINDS = {'internal': 1, 'server': 2, 'client': 3, 'producer': 4, 'consumer': 5}
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+MAX_SPANS_PER_TRACE = 512  # Spans kept per trace; later ones are counted as dropped
+MAX_ATTRIBUTE_LENGTH = 512  # Longer string attributes are truncated
+EXPORT_BATCH = 256  # Spans written per OTLP/JSON line
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}  # OTLP/JSON encodes 64-bit ints as strings
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(item) for item in value]}}
+    return {'stringValue': str(value)[:MAX_ATTRIBUTE_LENGTH]}
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def parse_traceparent(header: Optional[str]):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None"""
+    parts = (header or '').strip().split('-')
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if parts[1] == '0' * 32 or parts[2] == '0' * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class _Trace:
+    """Spans of one trace held until its root ends and the sampling decision is made"""
+
+    __slots__ = ('trace_id', 'sampled', 'spans', 'dropped', 'done', 'keep')
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List['Span'] = []
+        self.dropped = 0
+        self.done = False
+        self.keep = False
+
+
+class Span:
+    """One timed operation; created by Tracer.span()"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'kind', 'attributes', 'start_ns', 'end_ns',
+                 'status', 'status_message', 'events')
+
+    def __init__(self, trace: _Trace, name: str, kind: str, parent_id: Optional[str], attributes: Dict):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = STATUS_UNSET
+        self.status_message = ''
+        self.events: List[Dict] = []
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def update_name(self, name: str):
+        self.name = name
+
+    def set_error(self, message: str):
+        """Mark the span failed (for errors a client catches and turns into an empty result)"""
+        self.status = STATUS_ERROR
+        self.status_message = str(message)[:MAX_ATTRIBUTE_LENGTH]
+
+    def record_exception(self, exc: BaseException):
+        self.set_error(f"{type(exc).__name__}: {exc}")
+        self.events.append({
+            'timeUnixNano': str(time.time_ns()),
+            'name': 'exception',
+            'attributes': _otlp_attributes({
+                'exception.type': type(exc).__name__,
+                'exception.message': str(exc),
+            }),
+        })
+
+    def to_otlp(self) -> Dict:
+        span = {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': SPAN_KINDS.get(self.kind, 1),
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': _otlp_attributes(self.attributes),
+            'status': {'code': self.status, **({'message': self.status_message} if self.status_message else {})},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.events:
+            span['events'] = self.events
+        return span
+
+
+class _NoopSpan:
+    """Stand-in yielded when nothing is being traced"""
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def update_name(self, name: str):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+    def record_exception(self, exc: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """
+    Span recorder with tail-based sampling.
+
+    Traces start at a root span (one per API request). Spans opened while a
+    trace is active nest under the current span, including in pools that
+    copy the caller's context (BlockingPool, AsyncJobDatabase). Outside a
+    trace, span() is a no-op, so library code can be instrumented freely.
+
+    A trace is written when its root ends if it was sampled (sample_rate,
+    or a sampled incoming traceparent) or if the root took at least
+    slow_ms. Spans that end after their root (streamed bodies, background
+    fetches) follow the trace's decision. Writing happens on a background
+    thread; a full queue drops spans instead of blocking requests.
+
+    Unconfigured, the tracer records nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path: Optional[str] = None
+        self.sample_rate = 0.0
+        self.slow_ms = 0.0
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._handler: Optional[RotatingFileHandler] = None
+        self._resource: Dict = {}
+        self._stats = {'traces': 0, 'sampled': 0, 'slow': 0, 'spans_written': 0, 'spans_dropped': 0}
+
+    def configure(self, path: str, sample_rate: float = 0.01, slow_ms: float = 1000,
+                  max_bytes: int = 50 * 1024 * 1024, backups: int = 5, service_name: str = 'nextstep-api',
+                  queue_size: int = 10000):
+        """
+        Start recording to path (rotated at max_bytes, keeping backups old files).
+
+        Args:
+            sample_rate: Fraction of traces written regardless of duration (0-1)
+            slow_ms: Traces whose root took at least this long are always written; 0 = off
+        """
+        self.close()
+        if not path or (sample_rate <= 0 and slow_ms <= 0):
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.slow_ms = slow_ms
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        self._resource = {
+            'attributes': _otlp_attributes({
+                'service.name': service_name,
+                'host.name': socket.gethostname(),
+                'process.pid': os.getpid(),
+            })
+        }
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._write_loop, name='trace-writer', daemon=True)
+        self._writer.start()
+        self.enabled = True
+
+    def current_span(self):
+        """The innermost active span, or a no-op span"""
+        return _current_span.get() or NOOP_SPAN
+
+    @contextmanager
+    def span(self, name: str, kind: str = 'internal', root: bool = False, traceparent: Optional[str] = None,
+             **attributes):
+        """
+        Open a span for the enclosed block (which may await).
+
+        Args:
+            name: Operation name
+            kind: 'internal', 'server' or 'client'
+            root: Start a new trace if none is active (API requests)
+            traceparent: Incoming W3C traceparent header to continue (root spans)
+            **attributes: Span attributes
+        """
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        starts_trace = False
+        if parent is not None:
+            if parent.trace.done and not parent.trace.keep:
+                # Late span of a trace that was not written
+                yield NOOP_SPAN
+                return
+            span = Span(parent.trace, name, kind, parent.span_id, attributes)
+        elif root:
+            starts_trace = True
+            incoming = parse_traceparent(traceparent)
+            if incoming:
+                trace = _Trace(incoming[0], incoming[2] or random.random() < self.sample_rate)
+                span = Span(trace, name, kind, incoming[1], attributes)
+            else:
+                trace = _Trace(secrets.token_hex(16), random.random() < self.sample_rate)
+                span = Span(trace, name, kind, None, attributes)
+            self._stats['traces'] += 1
+        else:
+            # No trace to attach to (startup, background loops, or a dropped trace)
+            yield NOOP_SPAN
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._finish(span, starts_trace)
+
+    def _finish(self, span: Span, is_root: bool):
+        trace = span.trace
+        if trace.done:
+            if trace.keep:
+                self._export([span])
+            return
+
+        if len(trace.spans) < MAX_SPANS_PER_TRACE:
+            trace.spans.append(span)
+        else:
+            trace.dropped += 1
+
+        if is_root:
+            trace.done = True
+            slow = self.slow_ms > 0 and (span.end_ns - span.start_ns) / 1e6 >= self.slow_ms
+            trace.keep = trace.sampled or slow
+            if trace.keep:
+                self._stats['sampled' if trace.sampled else 'slow'] += 1
+                if trace.dropped:
+                    span.set_attribute('trace.spans_dropped', trace.dropped)
+                self._export(trace.spans)
+            trace.spans = []
+
+    def _export(self, spans: List[Span]):
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except (queue.Full, AttributeError):
+                self._stats['spans_dropped'] += 1
+
+    def _write_loop(self):
+        q, handler = self._queue, self._handler
+        while True:
+            span = q.get()
+            if span is None:
+                break
+            batch = [span]
+            while len(batch) < EXPORT_BATCH:
+                try:
+                    span = q.get_nowait()
+                except queue.Empty:
+                    break
+                if span is None:
+                    q.put(None)  # Finish this batch, then stop
+                    break
+                batch.append(span)
+            line = json.dumps({
+                'resourceSpans': [{
+                    'resource': self._resource,
+                    'scopeSpans': [{
+                        'scope': {'name': 'nextstep'},
+                        'spans': [s.to_otlp() for s in batch],
+                    }],
+                }]
+            }, separators=(',', ':'))
+            # The handler rolls the file over at max_bytes and writes the line as is
+            handler.emit(logging.makeLogRecord({'msg': line}))
+            self._stats['spans_written'] += len(batch)
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'sample_rate': self.sample_rate,
+            'slow_ms': self.slow_ms,
+            'queued': self._queue.qsize() if self._queue else 0,
+            **self._stats,
+        }
+
+    def close(self):
+        """Write queued spans and stop the writer"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+            self._handler.close()
+        self.enabled = False
+        self._writer = None
+        self._queue = None
+        self._handler = None
+
+
+tracer = Tracer()
@@ -0,0 +1,122 @@
+"""
+Check that /health stays responsive while slow external calls are in flight.
+
+Replaces the LinkedIn scraper and job API orchestrator with stand-ins that
+block for several seconds (like Apify polling does), fires requests at them
+from background threads, and times /health meanwhile. The slow requests must
+still succeed (or time out with 504 where the pool timeout is shortened), and
+their work must have run on the integration pools.
+
+Usage:
+    python test_scripts/test_event_loop_responsiveness.py
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('DB_PATH', os.path.join(tempfile.mkdtemp(), 'jobs.db'))
+
+from fastapi.testclient import TestClient
+
+import api.main as main
+from services.linkedin_scraper import LinkedInScraper
+
+SLOW_CALL_SECONDS = 5
+HEALTH_BUDGET_SECONDS = 0.5
+
+
+class SlowLinkedInScraper(LinkedInScraper):
+    """Blocks like LinkedInScraper.scrape_profile while it polls Apify"""
+
+    def __init__(self):
+        super().__init__(api_key='test')
+
+    def scrape_profile(self, url):
+        time.sleep(SLOW_CALL_SECONDS)
+        return {'scraped': True, 'skills': ['python']}
+
+    def calculate_profile_boost(self, profile_data):
+        return {'boost_percentage': 5}
+
+
+class SlowOrchestrator:
+    """Blocks like JobAPIOrchestrator.fetch_jobs waiting on a scraper run"""
+
+    def fetch_jobs(self, **kwargs):
+        time.sleep(SLOW_CALL_SECONDS)
+        return []
+
+
+with TestClient(main.app) as client:
+    main.linkedin_scraper = SlowLinkedInScraper()
+    main.job_api_orchestrator = SlowOrchestrator()
+    main.settings.USE_REAL_JOBS = True
+    # The job fetch outlasts its pool's timeout, so /refresh-jobs answers 504 while the call finishes in the background
+    main.job_api_pool.timeout = SLOW_CALL_SECONDS / 2
+
+    # (name, request, expected status)
+    slow_requests = [
+        ('scrape-linkedin', lambda: client.post('/scrape-linkedin', json={
+            'linkedin_url': 'https://www.linkedin.com/in/someone'
+        }), 200),
+        ('match', lambda: client.post('/match', json={
+            'skills': ['python'], 'experience_years': 2,
+            'linkedin_url': 'https://www.linkedin.com/in/other'
+        }), 200),
+        ('refresh-jobs', lambda: client.post('/refresh-jobs', params={'city': 'Manila'}), 504),
+    ]
+    responses = {}
+
+    def send(name, request):
+        responses[name] = request()
+
+    threads = [threading.Thread(target=send, args=(name, request)) for name, request, _ in slow_requests]
+
+    print(f"Starting {len(threads)} requests that each block for {SLOW_CALL_SECONDS}s...")
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)  # Let them reach their integration pools
+
+    worst = 0.0
+    checks = 0
+    while any(thread.is_alive() for thread in threads):
+        t = time.perf_counter()
+        response = client.get('/health')
+        elapsed = time.perf_counter() - t
+        assert response.status_code == 200, response.text
+        worst = max(worst, elapsed)
+        checks += 1
+        time.sleep(0.2)
+
+    for thread in threads:
+        thread.join()
+
+    print(f"Slow requests finished after {time.perf_counter() - started:.1f}s")
+    print(f"/health answered {checks} times while they ran, slowest in {worst * 1000:.1f} ms")
+    pools = client.get('/db-status').json()['integrations']
+    print(f"Integration pools: {pools}")
+
+    failures = []
+    for name, _, expected in slow_requests:
+        response = responses.get(name)
+        status = response.status_code if response is not None else None
+        if status != expected:
+            failures.append(f"/{name} returned {status}, expected {expected}: {response.text if response else ''}")
+    for pool in ('linkedin', 'job_api'):
+        if pools[pool]['submitted'] == 0:
+            failures.append(f"No calls were submitted to the {pool} pool")
+    if failures:
+        print("\n❌ " + "\n❌ ".join(failures))
+        sys.exit(1)
+
+    if worst > HEALTH_BUDGET_SECONDS:
+        print(f"\n❌ /health took longer than {HEALTH_BUDGET_SECONDS}s; the event loop was blocked")
+        sys.exit(1)
+    print("\n[SUCCESS] /health stayed responsive")
@@ -7,6 +7,7 @@ Usage:
     python train_model.py                    # Train with default settings
     python train_model.py --samples 5000     # Train with 5000 samples
     python train_model.py --real-data data/  # Train with real data from directory
+    python train_model.py --from-db --catalog exports/catalog  # Train from a columnar export
 """
 
 import os
@@ -14,8 +15,10 @@ import sys
 import json
 import random
 import argparse
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -27,12 +30,17 @@ from data.data_generator import (
     populate_sample_database, 
     JobDatabase
 )
+from data.catalog_export import CatalogSnapshot
+from data.snapshots import SnapshotManager
+from config.settings import settings
 
 
 def train_with_database_jobs(
     db_path: str = 'jobs.db',
     output_dir: str = 'trained_models',
-    min_jobs: int = 10
+    min_jobs: int = 10,
+    catalog_path: Optional[str] = None,
+    use_snapshot: bool = True
 ):
     """
     Train the job matcher using real jobs from the database.
@@ -44,26 +52,39 @@ def train_with_database_jobs(
         db_path: Path to the SQLite database
         output_dir: Directory to save trained model
         min_jobs: Minimum jobs required to proceed with training
+        catalog_path: Read jobs from a columnar export instead of the database
+        use_snapshot: Read from a fresh read-only snapshot of the database so
+            training does not contend with the API for locks
     """
     print("=" * 60)
     print("JOB MATCHER AI - TRAINING WITH DATABASE JOBS")
     print("=" * 60)
     
-    # Connect to database and fetch real jobs
-    print(f"\n[1/5] Loading jobs from database ({db_path})...")
-    db = JobDatabase(db_path)
-    all_jobs = db.get_all_jobs(limit=1000)
+    # Connect to database (or a memory-mapped export) and fetch real jobs
+    if catalog_path:
+        print(f"\n[1/5] Loading jobs from catalog export ({catalog_path})...")
+        db = CatalogSnapshot(catalog_path)
+    elif use_snapshot:
+        snapshot = SnapshotManager(db_path, settings.SNAPSHOT_DIR, keep=settings.SNAPSHOT_KEEP).refresh()
+        print(f"\n[1/5] Loading jobs from snapshot of {db_path} ({snapshot['path']})...")
+        db = JobDatabase(snapshot['path'], read_only=True)
+    else:
+        print(f"\n[1/5] Loading jobs from database ({db_path})...")
+        db = JobDatabase(db_path)
+    real_filter = {'exclude_source': 'synthetic'}
     
-    # Separate by source
-    real_jobs = [j for j in all_jobs if j.get('job_source', 'synthetic') != 'synthetic']
-    synthetic_jobs = [j for j in all_jobs if j.get('job_source', 'synthetic') == 'synthetic']
+    # Count by source without loading rows
+    total_count = db.count_jobs()
+    real_count = db.count_jobs(real_filter)
+    synthetic_count = total_count - real_count
     
-    print(f"  ✓ Found {len(all_jobs)} total jobs")
-    print(f"    - Real jobs (Indeed/Apify): {len(real_jobs)}")
-    print(f"    - Synthetic jobs: {len(synthetic_jobs)}")
+    print(f"  ✓ Found {total_count} total jobs")
+    print(f"    - Real jobs (Indeed/Apify): {real_count}")
+    print(f"    - Synthetic jobs: {synthetic_count}")
     
     # Prefer real jobs, fall back to all jobs if not enough
-    training_jobs = real_jobs if len(real_jobs) >= min_jobs else all_jobs
+    training_filter = real_filter if real_count >= min_jobs else None
+    training_jobs = list(islice(db.iter_jobs(training_filter), 1000))
     
     if len(training_jobs) < min_jobs:
         print(f"\n  ⚠ Not enough jobs ({len(training_jobs)} < {min_jobs})")
@@ -188,7 +209,7 @@ def train_with_database_jobs(
     metadata = {
         'trained_at': datetime.now().isoformat(),
         'total_jobs': len(training_jobs),
-        'real_jobs': len(real_jobs),
+        'real_jobs': real_count,
         'training_samples': len(training_data),
         'hire_rate': hired_count / len(training_data),
         'vocabulary_size': len(matcher.embedder.vocabulary),
@@ -232,7 +253,7 @@ def train_with_database_jobs(
     print("\n" + "=" * 60)
     print("TRAINING COMPLETE!")
     print("=" * 60)
-    print(f"\nModel trained on {len(real_jobs)} real Indeed jobs + {len(synthetic_jobs)} synthetic jobs")
+    print(f"\nModel trained on {real_count} real Indeed jobs + {synthetic_count} synthetic jobs")
     print(f"Next: Run the API server and test with real resumes")
     
     return matcher
@@ -561,6 +582,7 @@ Examples:
   python train_model.py --samples 5000         # Train with 5000 samples
   python train_model.py --from-db              # Train with real jobs from database
   python train_model.py --from-db --db-path jobs.db  # Specify database path
+  python train_model.py --from-db --catalog exports/catalog  # Use a columnar export
   python train_model.py --real-data ./data/    # Train with real data from files
   python train_model.py --evaluate             # Evaluate existing model
         """
@@ -594,6 +616,14 @@ Examples:
         '--db-path', type=str, default='jobs.db',
         help='Path to the jobs database (default: jobs.db)'
     )
+    parser.add_argument(
+        '--catalog', type=str, default=None,
+        help='With --from-db, read jobs from a columnar export (see data/catalog_export.py)'
+    )
+    parser.add_argument(
+        '--no-snapshot', action='store_true',
+        help='With --from-db, read the live database instead of a read-only snapshot'
+    )
     parser.add_argument(
         '--populate-db', action='store_true',
         help='Also populate the job database with sample jobs'
@@ -606,7 +636,9 @@ Examples:
     elif args.from_db:
         train_with_database_jobs(
             db_path=args.db_path,
-            output_dir=args.output
+            output_dir=args.output,
+            catalog_path=args.catalog,
+            use_snapshot=not args.no_snapshot
         )
     elif args.real_data:
         train_with_real_data(args.real_data, args.output)
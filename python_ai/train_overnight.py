@@ -15,6 +15,7 @@ import sys
 import json
 import time
 import argparse
+from itertools import islice
 from pathlib import Path
 from datetime import datetime, timedelta
 
@@ -23,6 +24,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from models.job_matcher import JobMatcher
 from data.data_generator import JobDatabase
+from data.catalog_export import CatalogSnapshot
+from data.snapshots import SnapshotManager
 from services.job_api_service import JobAPIOrchestrator
 from config.settings import Settings
 from dotenv import load_dotenv
@@ -124,8 +127,16 @@ def fetch_jobs_for_all_industries(
     return results, total_fetched
 
 
+def snapshot_db(db_path: str = 'jobs.db') -> JobDatabase:
+    """Snapshot the live database and open the copy read-only, so training never blocks the API"""
+    manager = SnapshotManager(db_path, Settings.SNAPSHOT_DIR, keep=Settings.SNAPSHOT_KEEP)
+    info = manager.refresh()
+    print(f"[Snapshot] Training from {info['path']} ({info['jobs']} jobs, {info['duration_ms']} ms)")
+    return JobDatabase(info['path'], read_only=True)
+
+
 def intensive_training(
-    db: JobDatabase,
+    db,
     output_dir: str = 'trained_models',
     samples_per_job: int = 5,
     target_samples: int = 10000
@@ -133,17 +144,17 @@ def intensive_training(
     """
     Perform intensive training using all database jobs.
     Creates multiple candidate variations per job for better learning.
+    db may be a JobDatabase or a memory-mapped CatalogSnapshot.
     """
     print("\n" + "=" * 70)
     print("INTENSIVE MODEL TRAINING")
     print("=" * 70)
     
     # Get all jobs from database
-    all_jobs = db.get_all_jobs(limit=5000)
-    real_jobs = [j for j in all_jobs if j.get('job_source', 'synthetic') != 'synthetic']
+    real_jobs = list(islice(db.iter_jobs({'exclude_source': 'synthetic'}, include_description=True), 5000))
     
     print(f"\nDatabase contains:")
-    print(f"  - Total jobs: {len(all_jobs)}")
+    print(f"  - Total jobs: {db.count_jobs()}")
     print(f"  - Real jobs: {len(real_jobs)}")
     
     if len(real_jobs) < 10:
@@ -428,11 +439,14 @@ def intensive_training(
 def train_only_loop(
     training_samples: int = 50000,
     iterations: int = 10,
-    sleep_between: int = 5  # 1 minute between iterations
+    sleep_between: int = 5,  # 1 minute between iterations
+    catalog_path: str = None,
+    use_snapshot: bool = True
 ):
     """
     Run overnight training with existing data only (no API calls).
-    Each iteration uses different random resume compositions.
+    Each iteration uses different random resume compositions and, unless
+    use_snapshot is off, a fresh read-only snapshot of jobs.db.
     """
     print("\n" + "=" * 70)
     print("OVERNIGHT TRAINING (NO JOB FETCHING)")
@@ -442,7 +456,7 @@ def train_only_loop(
     print(f"Sleep between: {sleep_between}s")
     print("=" * 70)
     
-    db = JobDatabase('jobs.db')
+    db = CatalogSnapshot(catalog_path) if catalog_path else JobDatabase('jobs.db')
     best_accuracy = 0
     
     for iteration in range(1, iterations + 1):
@@ -456,8 +470,9 @@ def train_only_loop(
         random.seed(iteration * 1000 + int(time.time()) % 1000)
         
         # Train
+        train_db = snapshot_db() if use_snapshot and not catalog_path else db
         matcher = intensive_training(
-            db,
+            train_db,
             output_dir='trained_models',
             target_samples=training_samples
         )
@@ -490,10 +505,12 @@ def overnight_training_loop(
     jobs_per_industry: int = 50,
     training_samples: int = 20000,
     iterations: int = 3,
-    sleep_between: int = 300  # 5 minutes between iterations
+    sleep_between: int = 300,  # 5 minutes between iterations
+    use_snapshot: bool = True
 ):
     """
     Run overnight intensive training with multiple iterations.
+    Jobs are fetched into jobs.db; training reads a snapshot taken after each fetch.
     """
     print("\n" + "=" * 70)
     print("OVERNIGHT INTENSIVE TRAINING")
@@ -530,7 +547,7 @@ def overnight_training_loop(
         
         # Train intensively
         matcher = intensive_training(
-            db,
+            snapshot_db() if use_snapshot else db,
             output_dir='trained_models',
             target_samples=training_samples
         )
@@ -555,9 +572,9 @@ def overnight_training_loop(
     print(f"Total new jobs fetched: {total_jobs_fetched}")
     
     # Final stats
-    all_jobs = db.get_all_jobs(limit=10000)
-    real_jobs = [j for j in all_jobs if j.get('job_source', 'synthetic') != 'synthetic']
-    print(f"Total jobs in database: {len(all_jobs)} ({len(real_jobs)} real)")
+    total_count = db.count_jobs()
+    real_count = db.count_jobs({'exclude_source': 'synthetic'})
+    print(f"Total jobs in database: {total_count} ({real_count} real)")
 
 
 def view_model_knowledge(model_dir: str = 'trained_models'):
@@ -645,6 +662,7 @@ Examples:
   python train_overnight.py --intensive         # Full overnight training
   python train_overnight.py --fetch-only        # Only fetch jobs, no training
   python train_overnight.py --samples 50000     # Train with 50k samples
+  python train_overnight.py --quick --catalog exports/catalog  # Train from a columnar export
         """
     )
     
@@ -666,6 +684,10 @@ Examples:
                         help='Training iterations (default: 3)')
     parser.add_argument('--sleep', type=int, default=300,
                         help='Seconds between iterations (default: 300)')
+    parser.add_argument('--catalog', type=str, default=None,
+                        help='Train from a columnar export instead of jobs.db (--quick/--train-only)')
+    parser.add_argument('--no-snapshot', action='store_true',
+                        help='Train directly from jobs.db instead of a read-only snapshot')
     
     args = parser.parse_args()
     
@@ -673,7 +695,12 @@ Examples:
         view_model_knowledge()
     elif args.quick:
         # Quick training with existing data
-        db = JobDatabase('jobs.db')
+        if args.catalog:
+            db = CatalogSnapshot(args.catalog)
+        elif args.no_snapshot:
+            db = JobDatabase('jobs.db')
+        else:
+            db = snapshot_db()
         intensive_training(db, target_samples=args.samples)
         view_model_knowledge()
     elif args.train_only:
@@ -681,7 +708,9 @@ Examples:
         train_only_loop(
             training_samples=args.samples,
             iterations=args.iterations,
-            sleep_between=args.sleep
+            sleep_between=args.sleep,
+            catalog_path=args.catalog,
+            use_snapshot=not args.no_snapshot
         )
     elif args.fetch_only:
         # Only fetch jobs
@@ -698,7 +727,8 @@ Examples:
             jobs_per_industry=args.jobs_per_ind,
             training_samples=args.samples,
             iterations=args.iterations,
-            sleep_between=args.sleep
+            sleep_between=args.sleep,
+            use_snapshot=not args.no_snapshot
         )
     else:
         # Default: view model knowledge